@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import (CustomUser, Publisher, Article, Newsletter,
+                     NotificationOutbox)
+
+admin.site.register(CustomUser)
+admin.site.register(Publisher)
+admin.site.register(Article)
+admin.site.register(Newsletter)
+admin.site.register(NotificationOutbox)
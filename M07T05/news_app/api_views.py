@@ -0,0 +1,671 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Prefetch
+from django.shortcuts import get_object_or_404
+
+from rest_framework.decorators import (api_view, permission_classes,
+                                       authentication_classes)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.decorators import parser_classes
+from .functions import feed_cache, timeline
+from .functions.conditional import (list_validators, page_validators,
+                                    row_validators)
+from .functions.fieldsets import (NEWSLETTER_FIELDS, VIEWS, FieldsetError,
+                                  article_fieldset, article_view,
+                                  newsletter_fieldset, restrict_articles)
+from .functions.outbox import approve_many
+from .functions.pagination import (Page, check_page_params, page_links,
+                                   paginate)
+from .functions.search import SEARCH_KEYS, SearchError, search_articles
+from .functions.streaming import parse_stream_format, streaming_response
+from .models import Article, Publisher, Newsletter
+from .serializers import (ArticleSerializer, ArticleListSerializer,
+                          PublisherSerializer, NewsletterSerializer)
+
+# Related objects whose data article payloads embed; their versions are
+# part of the conditional GET validators.
+ARTICLE_EMBEDS = ("publisher", "author")
+
+
+def _is_reader(user):
+    """
+    Role check helper function for API endpoints.
+    """
+    return getattr(user, "role", "") == "reader"
+
+
+def _is_editor(user):
+    """
+    Role check helper function for API endpoints.
+    """
+    return getattr(user, "role", "") == "editor"
+
+
+def _is_journalist(user):
+    """
+    Role check helper function for API endpoints.
+    """
+    return getattr(user, "role", "") == "journalist"
+
+
+class _ListPage:
+    """
+    One response of a list endpoint: a keyset page of qs (see
+    functions.pagination), or with ?stream=json|ndjson every row (see
+    functions.streaming).
+
+    The body stays a plain list; the next/prev cursors are sent in the
+    Link, X-Next-Cursor and X-Prev-Cursor headers. The page is fetched
+    once, when validators() or respond() first needs it. error is a 400
+    response for a bad ?stream=, cursor or limit, decided before anything
+    is read.
+
+    serialize maps a list of rows to a list of dicts. Pass a bound
+    to_representation of one serializer (ArticleListSerializer, or a
+    many=True one) rather than building a serializer per call: a
+    serializer holding its instance is a reference cycle that would keep
+    each streamed chunk alive until a full GC.
+
+    versions(row) gives the parts of a row validators() builds the ETag
+    from (see conditional.page_validators). keys and parse are passed on
+    to paginate().
+    """
+
+    def __init__(self, request, qs, serialize, versions=None,
+                 keys=("created_at", "id"), parse=datetime.fromisoformat):
+        self.request = request
+        self.qs = qs
+        self.serialize = serialize
+        self.versions = versions
+        self.keys = keys
+        self.parse = parse
+        self.error = None
+        self.stream = None
+        self._page = None
+        params = request.query_params
+        try:
+            self.stream = parse_stream_format(params.get("stream"))
+            if not self.stream:
+                check_page_params(params.get("cursor"),
+                                  params.get("limit"), parse)
+        except ValueError as exc:
+            self.error = _bad_request(exc)
+
+    def page(self) -> Page:
+        if self._page is None:
+            params = self.request.query_params
+            self._page = paginate(self.qs, cursor=params.get("cursor"),
+                                  limit=params.get("limit"),
+                                  keys=self.keys, parse=self.parse)
+        return self._page
+
+    def validators(self):
+        return page_validators(self.request, self.page(), self.versions)
+
+    def respond(self):
+        if self.error is not None:
+            return self.error
+        if self.stream:
+            return streaming_response(self.qs, self.serialize, self.stream)
+        page = self.page()
+        return Response(self.serialize(page.items),
+                        headers=page_links(self.request, page))
+
+
+def _paginated(request, qs, serialize, keys=("created_at", "id"),
+               parse=datetime.fromisoformat):
+    """
+    Respond with one keyset page of qs, or stream it (see _ListPage).
+    """
+    return _ListPage(request, qs, serialize, keys=keys,
+                     parse=parse).respond()
+
+
+def _conditional(request, validators, respond):
+    """
+    Answer 304 Not Modified straight from validators when the client's
+    copy is current, so nothing is serialized. Otherwise build the
+    response with respond() and attach the validators to it.
+    """
+    not_modified = validators.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    response = respond()
+    if response.status_code == status.HTTP_200_OK:
+        validators.apply(response)
+    return response
+
+
+def _bad_request(exc):
+    return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+# Articles
+
+
+@api_view(["GET", "POST"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def api_articles(request):
+    """
+    GET /api/articles/
+      - Returns approved articles, newest first, one page at a time.
+      - ?limit=N&cursor=... (cursors come from the Link header).
+      - ?stream=json|ndjson streams the whole archive instead.
+      - Supports If-None-Match / If-Modified-Since (304 Not Modified).
+      - Pages are served from a shared cache (see functions.feed_cache).
+      - ?fields=a,b / ?exclude=a,b pick the fields; ?view=summary swaps
+        content for a short excerpt. Unused columns are never read.
+
+    POST /api/articles/
+      - Creates an article (journalists only).
+      - Supports image upload (multipart/form-data).
+    """
+    if request.method == "GET":
+        try:
+            fields = article_fieldset(request.query_params)
+        except FieldsetError as exc:
+            return _bad_request(exc)
+        qs = Article.objects.filter(approved=True)
+        fast = ArticleListSerializer(context={"request": request},
+                                     fields=fields)
+        stamps = ("updated_at", *(f"{name}__updated_at"
+                                  for name in ARTICLE_EMBEDS
+                                  if name in fields))
+        listing = _ListPage(
+            request, fast.prepare(qs, extra=stamps), fast.to_representation,
+            versions=lambda row: (row.id, *(getattr(row, stamp)
+                                            for stamp in stamps)))
+        if listing.error is not None:
+            return listing.error
+        if listing.stream:
+            return _conditional(
+                request, list_validators(request, qs, *ARTICLE_EMBEDS),
+                listing.respond)
+        return feed_cache.cached_feed(request, listing.validators,
+                                      listing.respond)
+
+    if not _is_journalist(request.user):
+        return Response({"error": "Journalists only."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    serializer = ArticleSerializer(data=request.data,
+                                   context={"request": request})
+    if serializer.is_valid():
+        article = serializer.save(author=request.user, approved=False)
+        return Response(ArticleSerializer(article,
+                                          context={"request": request}).data,
+                        status=status.HTTP_201_CREATED)
+
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["POST"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_articles_approve(request):
+    """
+    POST /api/articles/approve/
+      - Approve several articles at once (editors only).
+      - Body: {"ids": [1, 2, 3]}, at most API_BATCH_MAX_IDS ids.
+      - All pending articles are flipped in one UPDATE and subscribers get
+        one combined notification.
+      - Returns the approved ids and the skipped ones (already approved
+        or missing).
+    """
+    if not _is_editor(request.user):
+        return Response({"error": "Editors only."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    raw = (request.data.getlist("ids") if hasattr(request.data, "getlist")
+           else request.data.get("ids"))
+    if not isinstance(raw, list) or not raw:
+        return Response({"error": "ids must be a non-empty list."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        ids = sorted({int(i) for i in raw})
+    except (TypeError, ValueError):
+        return Response({"error": "ids must be integers."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.API_BATCH_MAX_IDS:
+        return Response(
+            {"error": f"At most {settings.API_BATCH_MAX_IDS} ids "
+                      "per request."},
+            status=status.HTTP_400_BAD_REQUEST)
+
+    approved = approve_many(ids)
+    skipped = sorted(set(ids) - set(approved))
+    return Response({"approved": approved, "skipped": skipped})
+
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_articles_subscribed(request):
+    """
+    GET /api/articles/subscribed/
+      - Returns approved articles from the reader's subscriptions.
+      - Readers only.
+      - Paginated (or streamed) like /api/articles/.
+      - Same ?fields= / ?exclude= / ?view= options as /api/articles/.
+      - Served from the reader's timeline when TIMELINE_ENABLED (see
+        functions.timeline).
+    """
+    if not _is_reader(request.user):
+        return Response({"error": "Readers only."},
+                        status=status.HTTP_403_FORBIDDEN)
+    try:
+        fields = article_fieldset(request.query_params)
+    except FieldsetError as exc:
+        return _bad_request(exc)
+
+    qs, keys = timeline.subscribed_articles(request.user)
+    fast = ArticleListSerializer(fields=fields)
+    return _paginated(request, fast.prepare(qs), fast.to_representation,
+                      keys=keys)
+
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_articles_search(request):
+    """
+    GET /api/articles/search/?q=words
+      - Full-text search over article titles and content, best match
+        first (see functions.search).
+      - Readers only find approved articles; editors and journalists
+        find every article, as in the article list.
+      - Paginated like /api/articles/ (cursors follow the ranking);
+        ?stream=json|ndjson streams every match, newest first.
+      - Same ?fields= / ?exclude= / ?view= options as /api/articles/.
+    """
+    try:
+        fields = article_fieldset(request.query_params)
+        qs = Article.objects.all()
+        if _is_reader(request.user):
+            qs = qs.filter(approved=True)
+        qs = search_articles(qs, request.query_params.get("q"))
+    except (FieldsetError, SearchError) as exc:
+        return _bad_request(exc)
+
+    fast = ArticleListSerializer(context={"request": request},
+                                 fields=fields)
+    return _paginated(request, fast.prepare(qs, extra=("rank",)),
+                      fast.to_representation, keys=SEARCH_KEYS,
+                      parse=float)
+
+
+def _batch_ids(raw):
+    """
+    Parse ?ids=1,2,3 into a list of distinct ids, in request order.
+    Raises ValueError if it is empty, malformed or longer than
+    API_BATCH_MAX_IDS.
+    """
+    try:
+        ids = list(dict.fromkeys(
+            int(part) for part in (raw or "").split(",") if part.strip()))
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers.")
+    if not ids:
+        raise ValueError("ids is required.")
+    if len(ids) > settings.API_BATCH_MAX_IDS:
+        raise ValueError(
+            f"At most {settings.API_BATCH_MAX_IDS} ids per request.")
+    return ids
+
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_articles_batch(request):
+    """
+    GET /api/articles/batch/?ids=1,2,3
+      - Fetch several articles in one request and one query, instead of
+        one /api/articles/<id>/ call each.
+      - At most API_BATCH_MAX_IDS ids.
+      - Same visibility as /api/articles/<id>/: readers only get approved
+        articles.
+      - Returns the articles in the order asked for, plus the ids that
+        do not exist or are not visible ("missing").
+      - Same ?fields= / ?exclude= / ?view= options as /api/articles/.
+    """
+    try:
+        ids = _batch_ids(request.query_params.get("ids"))
+        fields = article_fieldset(request.query_params)
+    except (ValueError, FieldsetError) as exc:
+        return _bad_request(exc)
+
+    qs = Article.objects.filter(id__in=ids)
+    if _is_reader(request.user):
+        qs = qs.filter(approved=True)
+    fast = ArticleListSerializer(context={"request": request},
+                                 fields=fields)
+    found = {row.id: row for row in fast.prepare(qs)}
+    return Response({
+        "articles": fast.to_representation(
+            [found[i] for i in ids if i in found]),
+        "missing": [i for i in ids if i not in found],
+    })
+
+
+@api_view(["GET", "PUT", "DELETE"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def api_article_detail(request, article_id: int):
+    """
+    GET /api/articles/<id>/
+      - Retrieve a single article.
+      - Readers can only retrieve approved articles.
+      - Supports If-None-Match / If-Modified-Since (304 Not Modified).
+      - Same ?fields= / ?exclude= / ?view= options as /api/articles/.
+
+    PUT /api/articles/<id>/
+      - Update article (editors/journalists).
+      - Journalists can only edit their own articles.
+      - Only editors can set approved=True (signals queue a notification).
+
+    DELETE /api/articles/<id>/
+      - Delete article (editors/journalists).
+      - Journalists can only delete their own articles.
+    """
+
+    qs = Article.objects.select_related("author", "publisher")
+    fields = None
+    if request.method == "GET":
+        try:
+            fields = article_fieldset(request.query_params)
+        except FieldsetError as exc:
+            return _bad_request(exc)
+        qs = restrict_articles(qs, fields)
+
+    article = get_object_or_404(qs, id=article_id)
+
+    if request.method == "GET":
+        if _is_reader(request.user) and not article.approved:
+            return Response({"error": "Not allowed."},
+                            status=status.HTTP_403_FORBIDDEN)
+        return _conditional(
+            request, row_validators(request, article, *ARTICLE_EMBEDS),
+            lambda: Response(ArticleSerializer(
+                article, fields=fields, context={"request": request}).data))
+
+    if request.method == "PUT":
+        if not (_is_editor(request.user) or _is_journalist(request.user)):
+            return Response({"error": "Editors/journalists only."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        if _is_journalist(
+             request.user) and article.author_id != request.user.id:
+            return Response({"error": "Not allowed."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ArticleSerializer(article, data=request.data,
+                                       partial=True, context={
+                                           "request": request})
+        if serializer.is_valid():
+            # Refuse before saving: an approving save, even one reverted
+            # afterwards, would already have queued the notification.
+            if (serializer.validated_data.get("approved")
+                    and not _is_editor(request.user)):
+                return Response({"error": "Only editors can approve."},
+                                status=status.HTTP_403_FORBIDDEN)
+
+            # A journalist's edit sends the article back for review.
+            if _is_journalist(request.user) and not _is_editor(request.user):
+                updated = serializer.save(approved=False)
+            else:
+                updated = serializer.save()
+
+            return Response(ArticleSerializer(updated,
+                                              context={
+                                                  "request": request}).data)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    article.delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# Publishers
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_publishers(request):
+    """
+    GET /api/publishers/
+      - Return a list of publishers, with their approved/pending article
+        and subscriber counters.
+      - Any authenticated role can view.
+      - Supports If-None-Match / If-Modified-Since (304 Not Modified).
+    """
+    qs = Publisher.objects.all().order_by("name")
+    return _conditional(
+        request, list_validators(request, qs),
+        lambda: Response(PublisherSerializer(
+            qs, many=True, fields=PublisherSerializer.Meta.fields).data))
+
+
+@api_view(["GET"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_publisher_detail(request, publisher_id: int):
+    """
+    GET /api/publishers/<id>/
+      - Retrieve a single publisher, with its counters.
+      - Any authenticated role can view.
+      - Supports If-None-Match / If-Modified-Since (304 Not Modified).
+    """
+    publisher = get_object_or_404(Publisher, id=publisher_id)
+    return _conditional(
+        request, row_validators(request, publisher),
+        lambda: Response(PublisherSerializer(
+            publisher, fields=PublisherSerializer.Meta.fields).data))
+
+
+# Newsletters
+
+def _newsletter_payload(newsletter: Newsletter, fields=None,
+                        article_fields=None):
+    """
+    Helper to serialize a newsletter loaded by _newsletter_queryset.
+
+    fields/article_fields restrict the newsletter and nested article
+    fields (see functions.fieldsets).
+    """
+    return NewsletterSerializer(
+        newsletter, fields=fields,
+        context={"article_fields": article_fields}).data
+
+
+def _newsletter_queryset(fields=NEWSLETTER_FIELDS, article_fields=None,
+                         approved_only=False):
+    """
+    Newsletters with everything serialization needs in a fixed number of
+    queries: the author is joined, and nested articles come from one
+    prefetch query that joins their author and publisher. Readers
+    (approved_only) get only approved articles, filtered in SQL.
+
+    Only what the fieldsets need is loaded: nested articles are
+    prefetched (with unused columns deferred) only if requested.
+    """
+    qs = Newsletter.objects.select_related("author")
+    if "description" not in fields:
+        qs = qs.defer("description")
+    if "articles" in fields:
+        articles = Article.objects.select_related("author", "publisher")
+        if approved_only:
+            articles = articles.filter(approved=True)
+        qs = qs.prefetch_related(Prefetch("articles", queryset=(
+            restrict_articles(articles, article_fields or VIEWS["full"]))))
+    return qs
+
+
+def _newsletter_versions(newsletter: Newsletter, with_articles: bool):
+    """
+    Validator parts of a newsletter loaded by _newsletter_queryset: its
+    own and its author's version and, if they are served, those of its
+    nested articles and what they embed.
+    """
+    parts = [newsletter.id, newsletter.updated_at,
+             newsletter.author.updated_at]
+    if with_articles:
+        for article in newsletter.articles.all():
+            parts += [article.id, article.updated_at,
+                      article.author.updated_at,
+                      article.publisher and article.publisher.updated_at]
+    return parts
+
+
+def _has_approved_articles():
+    """
+    Correlated EXISTS: the newsletter holds at least one approved
+    article. It probes the newsletter's rows of the m2m table and stops
+    at the first approved article, instead of joining every article and
+    de-duplicating newsletters with DISTINCT.
+    """
+    return Exists(Article.objects.filter(newsletters=OuterRef("pk"),
+                                         approved=True))
+
+
+def _newsletter_fieldsets(params):
+    """
+    (newsletter fields, nested article fields) for ?fields=, ?exclude=
+    (newsletter level) and ?view= (nested articles).
+    """
+    return newsletter_fieldset(params), article_view(params)
+
+
+@api_view(["GET", "POST"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_newsletters(request):
+    """
+    GET /api/newsletters/
+      - Return newsletters, newest first, paginated (or streamed) like
+        /api/articles/.
+      - Readers see newsletters with only approved nested articles.
+      - Supports If-None-Match / If-Modified-Since (304 Not Modified).
+      - ?fields= / ?exclude= pick newsletter fields (leaving out articles
+        skips loading them); ?view=summary nests article excerpts
+        instead of their content.
+
+    POST /api/newsletters/
+      - Create newsletter (journalists only).
+    """
+    if request.method == "GET":
+        try:
+            fields, article_fields = _newsletter_fieldsets(
+                request.query_params)
+        except FieldsetError as exc:
+            return _bad_request(exc)
+        is_reader = _is_reader(request.user)
+        qs = _newsletter_queryset(fields, article_fields, is_reader)
+        if is_reader:
+            qs = qs.filter(_has_approved_articles())
+        listing = _ListPage(
+            request, qs, lambda items: [
+                _newsletter_payload(n, fields, article_fields)
+                for n in items],
+            versions=lambda n: _newsletter_versions(n, "articles" in fields))
+        if listing.error is not None:
+            return listing.error
+        if listing.stream:
+            return _conditional(
+                request, list_validators(request, qs, "author", "articles",
+                                         "articles__author",
+                                         "articles__publisher"),
+                listing.respond)
+        return _conditional(request, listing.validators(), listing.respond)
+
+    if not _is_journalist(request.user):
+        return Response({"error": "Journalists only."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    serializer = NewsletterSerializer(data=request.data)
+    if serializer.is_valid():
+        newsletter = serializer.save(author=request.user)
+
+        serializer.save()
+        return Response(_newsletter_payload(
+            _newsletter_queryset().get(pk=newsletter.pk)),
+            status=status.HTTP_201_CREATED)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["GET", "PUT", "DELETE"])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def api_newsletter_detail(request, newsletter_id: int):
+    """
+    GET /api/newsletters/<id>/
+      - Retrieve a newsletter.
+      - Readers see only approved articles nested.
+      - Same ?fields= / ?exclude= / ?view= options as the list.
+
+    PUT /api/newsletters/<id>/
+      - Update newsletter (editors/journalists).
+      - Journalists can only update their own newsletters.
+
+    DELETE /api/newsletters/<id>/
+      - Delete newsletter (editors/journalists).
+      - Journalists can only delete their own newsletters.
+    """
+    if request.method == "GET":
+        try:
+            fields, article_fields = _newsletter_fieldsets(
+                request.query_params)
+        except FieldsetError as exc:
+            return _bad_request(exc)
+        is_reader = _is_reader(request.user)
+        qs = _newsletter_queryset(fields, article_fields, is_reader)
+        if is_reader:
+            qs = qs.annotate(has_approved_articles=_has_approved_articles())
+        newsletter = get_object_or_404(qs, id=newsletter_id)
+
+        if is_reader:
+            if not newsletter.has_approved_articles:
+                return Response(
+                    {"error": "No approved articles in this newsletter."},
+                    status=status.HTTP_404_NOT_FOUND)
+        return Response(_newsletter_payload(
+            newsletter, fields, article_fields))
+
+    newsletter = get_object_or_404(Newsletter, id=newsletter_id)
+
+    if request.method == "PUT":
+        if not (_is_editor(request.user) or _is_journalist(request.user)):
+            return Response({"error": "Editors/journalists only."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        if _is_journalist(
+             request.user) and newsletter.author_id != request.user.id:
+            return Response({"error": "Not allowed."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        serializer = NewsletterSerializer(
+            newsletter, data=request.data, partial=True)
+        if serializer.is_valid():
+            updated = serializer.save()
+            return Response(_newsletter_payload(
+                _newsletter_queryset().get(pk=updated.pk)))
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    if not (_is_editor(request.user) or _is_journalist(request.user)):
+        return Response({"error": "Editors/journalists only."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    if _is_journalist(
+         request.user) and newsletter.author_id != request.user.id:
+        return Response({"error": "Not allowed."},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    newsletter.delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
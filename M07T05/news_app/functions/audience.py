@@ -0,0 +1,180 @@
+import heapq
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import Article, AudienceIndex, CustomUser
+from . import counters
+
+JOURNALIST = AudienceIndex.KIND_JOURNALIST
+PUBLISHER = AudienceIndex.KIND_PUBLISHER
+
+
+def pack(ids: array) -> bytes:
+    """
+    Serialize a sorted id array as little-endian int64 values.
+    """
+    if sys.byteorder != "little":
+        ids = array("q", ids)
+        ids.byteswap()
+    return ids.tobytes()
+
+
+def unpack(data) -> array:
+    """
+    Inverse of pack().
+    """
+    ids = array("q")
+    ids.frombytes(bytes(data or b""))
+    if sys.byteorder != "little":
+        ids.byteswap()
+    return ids
+
+
+def merge_ids(ids: array, added: Iterable[int] = (),
+              removed: Iterable[int] = ()) -> array:
+    """
+    Return a new sorted, duplicate-free array with ids added/removed.
+    """
+    removed = set(removed)
+    merged = array("q")
+    for value in union_sorted(ids, sorted(set(added))):
+        if value not in removed:
+            merged.append(value)
+    return merged
+
+
+def union_sorted(*arrays: Iterable[int]) -> Iterator[int]:
+    """
+    Lazily merge sorted id sequences, yielding each id once.
+    """
+    last = None
+    for value in heapq.merge(*arrays):
+        if value != last:
+            yield value
+            last = value
+
+
+def _update(kind: str, target_ids: Iterable[int], added: Iterable[int] = (),
+            removed: Iterable[int] = ()) -> None:
+    """
+    Apply the same member change to several index rows.
+
+    Rows are locked for the read-modify-write, so concurrent subscription
+    changes to one target are serialized instead of losing updates. The
+    exact size change is applied to the target's subscriber_count.
+    """
+    added, removed = list(added), list(removed)
+    with transaction.atomic():
+        for target_id in target_ids:
+            entry, _ = AudienceIndex.objects.select_for_update(
+            ).get_or_create(kind=kind, target_id=target_id)
+            ids = merge_ids(unpack(entry.members), added, removed)
+            counters.subscribers_changed(kind, target_id,
+                                         len(ids) - entry.size)
+            entry.members = pack(ids)
+            entry.size = len(ids)
+            entry.save(update_fields=["members", "size"])
+
+
+def add_subscribers(kind: str, target_ids: Iterable[int],
+                    reader_ids: Iterable[int]) -> None:
+    _update(kind, target_ids, added=reader_ids)
+
+
+def remove_subscribers(kind: str, target_ids: Iterable[int],
+                       reader_ids: Iterable[int]) -> None:
+    _update(kind, target_ids, removed=reader_ids)
+
+
+def _through_source(kind: str):
+    """
+    Return (through model, target column, reader column) for an index kind.
+    """
+    if kind == JOURNALIST:
+        return (CustomUser.subscribed_journalists.through,
+                "to_customuser_id", "from_customuser_id")
+    return (CustomUser.subscribed_publishers.through,
+            "publisher_id", "customuser_id")
+
+
+def subscriptions(reader_id: int) -> dict[str, list[int]]:
+    """
+    Targets a user is subscribed to, by index kind.
+    """
+    targets = {}
+    for kind in (JOURNALIST, PUBLISHER):
+        through, target_col, reader_col = _through_source(kind)
+        targets[kind] = list(through.objects.filter(
+            **{reader_col: reader_id}).values_list(target_col, flat=True))
+    return targets
+
+
+def drop(kind: str, target_id: int) -> None:
+    """
+    Delete the index row of a journalist or publisher that is gone.
+    """
+    AudienceIndex.objects.filter(kind=kind, target_id=target_id).delete()
+
+
+def user_deleted(user_id: int, subscribed: dict[str, list[int]]) -> None:
+    """
+    Remove a deleted user from the audiences in subscribed (see
+    subscriptions(), read before the delete) and drop the user's own
+    journalist row. Deleting a user removes its subscription rows without
+    m2m_changed, so the receivers above never see it.
+    """
+    with transaction.atomic():
+        for kind, target_ids in subscribed.items():
+            _update(kind, target_ids, removed=[user_id])
+        drop(JOURNALIST, user_id)
+
+
+def rebuild(kind: str, target_id: int) -> int:
+    """
+    Recompute one index row from the subscription table. Returns its size.
+    """
+    through, target_col, reader_col = _through_source(kind)
+    ids = array("q", through.objects.filter(
+        **{target_col: target_id}).order_by(reader_col).values_list(
+        reader_col, flat=True).distinct())
+    AudienceIndex.objects.update_or_create(
+        kind=kind, target_id=target_id,
+        defaults={"members": pack(ids), "size": len(ids)})
+    counters.subscribers_set(kind, target_id, len(ids))
+    return len(ids)
+
+
+def members(kind: str, target_id: int) -> array:
+    """
+    Sorted subscriber ids of a journalist or publisher.
+    """
+    data = AudienceIndex.objects.filter(
+        kind=kind, target_id=target_id).values_list(
+        "members", flat=True).first()
+    return unpack(data)
+
+
+def audience_size(kind: str, target_id: int) -> int:
+    """
+    Number of subscribers, read from the index without touching members.
+    """
+    return AudienceIndex.objects.filter(
+        kind=kind, target_id=target_id).values_list(
+        "size", flat=True).first() or 0
+
+
+def article_audience(article: Article) -> Iterator[int]:
+    """
+    Ids of readers following the article's journalist or publisher,
+    deduplicated, in ascending order. Costs a single query.
+    """
+    condition = Q(kind=JOURNALIST, target_id=article.author_id)
+    if article.publisher_id:
+        condition |= Q(kind=PUBLISHER, target_id=article.publisher_id)
+    rows = AudienceIndex.objects.filter(condition).values_list(
+        "members", flat=True)
+    return union_sorted(*(unpack(data) for data in rows))
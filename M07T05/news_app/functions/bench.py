@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Article, CustomUser, Publisher
+from . import audience
+
+SEED_BATCH_SIZE = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run a block inside a transaction that is always rolled back, so
+    synthetic benchmark data never leaks into the database.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+@contextmanager
+def measure(stats: dict, key: str, memory: bool = True,
+            queries: bool = False):
+    """
+    Record wall time (seconds) and, if memory is set, peak traced memory
+    (bytes) of a block into stats[key]. Memory tracing slows allocation
+    heavy code considerably, so leave it off for seeding. With queries
+    set, the number of SQL queries run on the default connection is
+    recorded too (savepoint bookkeeping is not counted).
+    """
+    captured = CaptureQueriesContext(connection)
+    if queries:
+        captured.__enter__()
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats[key] = {"seconds": round(time.perf_counter() - started, 4)}
+        if memory:
+            stats[key]["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if queries:
+            captured.__exit__(None, None, None)
+            stats[key]["queries"] = sum(
+                1 for q in captured.captured_queries
+                if "SAVEPOINT" not in q["sql"])
+
+
+class _AcceptHandler(BaseHTTPRequestHandler):
+    """
+    Accepts every post like the X API does and counts them.
+    """
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.posts += 1
+        self.send_response(201)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def stub_x_endpoint():
+    """
+    Point the X client at a local HTTP server that accepts every post,
+    for the duration of the block. Yields the server; server.posts counts
+    the requests it received.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _AcceptHandler)
+    server.posts = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    env = {"X_BEARER_TOKEN": "bench",
+           "X_TWEET_ENDPOINT":
+               f"http://127.0.0.1:{server.server_address[1]}/2/tweets"}
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        yield server
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        server.shutdown()
+        server.server_close()
+
+
+def seed_audience(subscribers: int, prefix: str = "bench"):
+    """
+    Create a journalist, a publisher, a pending article and `subscribers`
+    readers. Every reader follows the publisher, and every other reader
+    also follows the journalist, so the two audiences overlap by half.
+
+    Rows are bulk inserted (no password hashing, no signals) in batches of
+    SEED_BATCH_SIZE, and the audience index is rebuilt once at the end.
+    Returns the pending article.
+    """
+    journalist = CustomUser.objects.create(
+        username=f"{prefix}-journalist", role=CustomUser.ROLE_JOURNALIST)
+    publisher = Publisher.objects.create(name=f"{prefix}-publisher")
+    article = Article.objects.create(
+        title=f"{prefix} article", content="Benchmark body. " * 200,
+        author=journalist, publisher=publisher, approved=False)
+
+    follows_publisher = CustomUser.subscribed_publishers.through
+    follows_journalist = CustomUser.subscribed_journalists.through
+
+    for start in range(0, subscribers, SEED_BATCH_SIZE):
+        stop = min(start + SEED_BATCH_SIZE, subscribers)
+        readers = CustomUser.objects.bulk_create([
+            CustomUser(username=f"{prefix}-r{i}",
+                       email=f"{prefix}-r{i}@bench.local",
+                       password="!", role=CustomUser.ROLE_READER)
+            for i in range(start, stop)
+        ])
+        if readers[0].pk is None:
+            readers = list(CustomUser.objects.filter(
+                username__in=[r.username for r in readers]))
+        follows_publisher.objects.bulk_create([
+            follows_publisher(customuser_id=r.pk, publisher_id=publisher.pk)
+            for r in readers
+        ])
+        follows_journalist.objects.bulk_create([
+            follows_journalist(from_customuser_id=r.pk,
+                               to_customuser_id=journalist.pk)
+            for r in readers[::2]
+        ])
+
+    audience.rebuild(audience.JOURNALIST, journalist.pk)
+    audience.rebuild(audience.PUBLISHER, publisher.pk)
+    return article
+
+
+def seed_articles(count: int, prefix: str = "bench", text=None):
+    """
+    Create a journalist with `count` approved articles, one second apart,
+    published by one publisher and bulk inserted in batches of
+    SEED_BATCH_SIZE. text(i), if given, returns the (title, content) of
+    article i. Returns the journalist.
+    """
+    journalist = CustomUser.objects.create(
+        username=f"{prefix}-author", role=CustomUser.ROLE_JOURNALIST)
+    publisher = Publisher.objects.create(name=f"{prefix}-press")
+    start = timezone.now() - timedelta(seconds=count)
+    for first in range(0, count, SEED_BATCH_SIZE):
+        batch = []
+        for i in range(first, min(first + SEED_BATCH_SIZE, count)):
+            title, content = (text(i) if text
+                              else (f"{prefix} {i}", "Benchmark body."))
+            batch.append(Article(
+                title=title, content=content, author=journalist,
+                publisher=publisher, approved=True,
+                created_at=start + timedelta(seconds=i),
+                approved_at=start + timedelta(seconds=i)))
+        # bulk_create() skips save(), which fills these.
+        for article in batch:
+            article.refresh_excerpt()
+        Article.objects.bulk_create(batch)
+    return journalist
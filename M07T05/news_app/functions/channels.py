@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db import connections
+
+from .timing import stage, submit_in_context
+
+# A time budget in seconds, or a callable computing it from the articles.
+Timeout = float | Callable[[list], float]
+
+# name -> (callable, default timeout), in registration order.
+_registry: dict[str, tuple[Callable, Timeout]] = {}
+# name -> predicate; channels whose predicate is false are not run.
+_enabled: dict[str, Callable[[], bool]] = {}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class RetryLater(RuntimeError):
+    """
+    Raised by a channel that could not deliver for a transient reason.
+    retry_after is the number of seconds to wait before retrying, None
+    if unknown. Any other exception is a failure too, but a channel
+    should not raise for rejections that a retry cannot fix.
+    """
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class ChannelResult:
+    """
+    Outcome of one notification channel.
+
+    unknown is set when the channel ran out of time while running: it may
+    still complete in the background, so it must not be run again.
+    retry_after comes from a RetryLater the channel raised.
+    """
+    name: str
+    ok: bool
+    elapsed: float
+    detail: Any = None
+    error: str = ""
+    unknown: bool = False
+    retry_after: float | None = None
+
+
+def register_channel(name: str, timeout: Timeout,
+                     enabled: Callable[[], bool] | None = None):
+    """
+    Decorator registering a notification channel.
+
+    A channel is called with the list of approved articles and must raise
+    on failure. Its return value is kept as ChannelResult.detail. The
+    timeout is in seconds, or a callable returning the budget for a list
+    of articles; it can be overridden per channel in
+    NOTIFY_CHANNEL_TIMEOUTS.
+    enabled, if given, is checked on every run; a disabled channel is
+    neither run nor reported.
+    """
+    def decorator(func):
+        _registry[name] = (func, timeout)
+        if enabled is not None:
+            _enabled[name] = enabled
+        return func
+    return decorator
+
+
+def registered_channels() -> list[str]:
+    return list(_registry)
+
+
+def _is_enabled(name: str) -> bool:
+    predicate = _enabled.get(name)
+    return predicate is None or predicate()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.NOTIFY_CHANNEL_WORKERS,
+                thread_name_prefix="notify")
+        return _pool
+
+
+def _call(name: str, func: Callable, articles: list) -> ChannelResult:
+    started = time.perf_counter()
+    try:
+        with stage(f"channel.{name}"):
+            detail = func(articles)
+    except Exception as exc:
+        return ChannelResult(name, False, time.perf_counter() - started,
+                             error=f"{type(exc).__name__}: {exc}",
+                             retry_after=getattr(exc, "retry_after", None))
+    return ChannelResult(name, True, time.perf_counter() - started,
+                         detail=detail)
+
+
+def _call_in_worker(name: str, func: Callable, articles: list
+                    ) -> ChannelResult:
+    try:
+        return _call(name, func, articles)
+    finally:
+        # Worker threads get their own DB connections; don't leak them.
+        connections.close_all()
+
+
+def run_channels(articles: list, skip: Iterable[str] = ()
+                 ) -> dict[str, ChannelResult]:
+    """
+    Run every registered channel (except those in skip) for the articles.
+
+    Channels run concurrently on a shared pool of NOTIFY_CHANNEL_WORKERS
+    threads, so total time tracks the slowest channel rather than the sum.
+    A channel that exceeds its time budget is reported as failed. If it
+    was still queued it is cancelled and never runs; if it was already
+    running its thread is left to finish in the background and the result
+    is marked unknown, since it may yet deliver. One channel failing does
+    not affect the others. With NOTIFY_CHANNEL_WORKERS = 0 channels run
+    inline, one after another, and time budgets are not enforced.
+    """
+    skip = set(skip)
+    timeouts = getattr(settings, "NOTIFY_CHANNEL_TIMEOUTS", {})
+    selected = [(name, func, timeouts.get(name, default))
+                for name, (func, default) in _registry.items()
+                if name not in skip and _is_enabled(name)]
+    selected = [(name, func, timeout(articles) if callable(timeout)
+                 else timeout)
+                for name, func, timeout in selected]
+
+    if settings.NOTIFY_CHANNEL_WORKERS <= 0:
+        return {name: _call(name, func, articles)
+                for name, func, _ in selected}
+
+    pool = _get_pool()
+    started = time.perf_counter()
+    futures = [(name, timeout,
+                submit_in_context(pool, _call_in_worker, name, func,
+                                  articles))
+               for name, func, timeout in selected]
+
+    results = {}
+    for name, timeout, future in sorted(futures, key=lambda f: f[1]):
+        remaining = max(0.0, started + timeout - time.perf_counter())
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeout:
+            running = not future.cancel()
+            results[name] = ChannelResult(
+                name, False, time.perf_counter() - started,
+                error=f"Timed out after {timeout:g}s"
+                      + (" while running" if running else ""),
+                unknown=running)
+    return {name: results[name] for name, _, _ in selected}
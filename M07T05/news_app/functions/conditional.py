@@ -0,0 +1,99 @@
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class Validators:
+    """
+    ETag and Last-Modified for a response, computed without serializing.
+    """
+
+    def __init__(self, *parts, last_modified=None):
+        digest = hashlib.md5(
+            "|".join(map(str, parts)).encode(), usedforsecurity=False)
+        self.etag = f'"{digest.hexdigest()}"'
+        self.last_modified = last_modified
+
+    @property
+    def timestamp(self) -> int | None:
+        if self.last_modified is None:
+            return None
+        return int(self.last_modified.timestamp())
+
+    def not_modified(self, request):
+        """
+        A 304 response if the request's If-None-Match/If-Modified-Since
+        still match, else None.
+        """
+        return get_conditional_response(request, etag=self.etag,
+                                        last_modified=self.timestamp)
+
+    def apply(self, response):
+        response["ETag"] = self.etag
+        if self.last_modified is not None:
+            response["Last-Modified"] = http_date(self.timestamp)
+        return response
+
+
+def list_validators(request, qs: QuerySet, *related: str) -> Validators:
+    """
+    Validators for a whole list, from one aggregate query over qs: row
+    count, highest id and latest updated_at (also of each related path
+    whose data the response embeds, e.g. "publisher" and "author" for
+    articles). Adding, editing or deleting a row changes at least one of
+    them. The query string and the caller's role are part of the ETag,
+    since both change what the list contains.
+
+    The aggregate reads every row of qs, so use it only for responses
+    that do too (streams, unpaginated lists); pages use page_validators.
+    """
+    aggregates = {"rows": Count("id", distinct=True), "top": Max("id"),
+                  "latest": Max("updated_at")}
+    names = [f"related_{i}" for i in range(len(related))]
+    for name, path in zip(names, related):
+        aggregates[name] = Max(f"{path}__updated_at")
+    agg = qs.aggregate(**aggregates)
+
+    stamps = [agg["latest"]] + [agg[name] for name in names]
+    latest = max((s for s in stamps if s is not None), default=None)
+    return Validators(request.get_full_path(),
+                      getattr(request.user, "role", ""),
+                      *agg.values(), last_modified=latest)
+
+
+def page_validators(request, page, versions) -> Validators:
+    """
+    Validators for one page of a list, from the rows it serves instead of
+    the whole list: versions(row) gives a row's parts (its id and
+    updated_at, and those of the objects it embeds), and the page's
+    cursors are included since they are sent as headers. A changed,
+    added or removed row on the page changes them, and computing them
+    costs nothing beyond the page query. Last-Modified is the latest
+    datetime among the parts.
+    """
+    parts = [part for row in page.items for part in versions(row)]
+    latest = max((part for part in parts if isinstance(part, datetime)),
+                 default=None)
+    return Validators(request.get_full_path(),
+                      getattr(request.user, "role", ""), page.next,
+                      page.prev, *parts, last_modified=latest)
+
+
+def row_validators(request, instance, *related: str) -> Validators:
+    """
+    Validators for a detail endpoint: the row's own version and that of
+    each related object the response embeds (attribute names, e.g.
+    "publisher"; unset ones are skipped).
+    """
+    stamps = [instance.updated_at]
+    for name in related:
+        obj = getattr(instance, name)
+        if obj is not None:
+            stamps.append(obj.updated_at)
+    return Validators(request.get_full_path(),
+                      getattr(request.user, "role", ""), instance.pk,
+                      *(stamp.isoformat() for stamp in stamps),
+                      last_modified=max(stamps))
@@ -0,0 +1,167 @@
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Article, AudienceIndex, CustomUser, Publisher
+
+APPROVED = "approved_article_count"
+PENDING = "pending_article_count"
+SUBSCRIBERS = "subscriber_count"
+
+# Counted (author_id, publisher_id, approved) state of an article.
+State = tuple[int, int | None, bool]
+
+
+def _owner(kind: str):
+    return CustomUser if kind == AudienceIndex.KIND_JOURNALIST else Publisher
+
+
+def _apply(deltas: dict) -> None:
+    """
+    Apply {(model, pk): Counter(field=delta)} as one F() UPDATE per row.
+    Publishers also get updated_at bumped, since their API responses
+    (and ETags) include the counters.
+    """
+    now = timezone.now()
+    for (model, pk), fields in deltas.items():
+        changes = {name: F(name) + delta
+                   for name, delta in fields.items() if delta}
+        if not changes:
+            continue
+        if model is Publisher:
+            changes["updated_at"] = now
+        model.objects.filter(pk=pk).update(**changes)
+
+
+def _count(deltas: dict, state: State, sign: int) -> None:
+    author_id, publisher_id, approved = state
+    field = APPROVED if approved else PENDING
+    deltas[(CustomUser, author_id)][field] += sign
+    if publisher_id is not None:
+        deltas[(Publisher, publisher_id)][field] += sign
+
+
+def article_changed(old: State | None, new: State | None) -> None:
+    """
+    Move an article's contribution to the counters from state old to
+    state new. None stands for "not counted" (created or deleted).
+    Costs nothing if the counted state did not change.
+    """
+    if old == new:
+        return
+    deltas = defaultdict(Counter)
+    if old is not None:
+        _count(deltas, old, -1)
+    if new is not None:
+        _count(deltas, new, +1)
+    _apply(deltas)
+
+
+def articles_approved(rows: Iterable[tuple[int, int | None]]) -> None:
+    """
+    Count pending articles, given as (author_id, publisher_id) rows, as
+    approved.
+    """
+    deltas = defaultdict(Counter)
+    for author_id, publisher_id in rows:
+        _count(deltas, (author_id, publisher_id, False), -1)
+        _count(deltas, (author_id, publisher_id, True), +1)
+    _apply(deltas)
+
+
+def article_approved(article_id: int) -> None:
+    """
+    Count one pending article as approved without loading it: each
+    counter UPDATE finds its journalist or publisher row with a subquery
+    on the article, so the article is read inside those statements.
+    """
+    moved = {APPROVED: F(APPROVED) + 1, PENDING: F(PENDING) - 1}
+    CustomUser.objects.filter(articles__id=article_id).update(**moved)
+    Publisher.objects.filter(articles__id=article_id).update(
+        updated_at=timezone.now(), **moved)
+
+
+def subscribers_changed(kind: str, target_id: int, delta: int) -> None:
+    if delta:
+        _apply({(_owner(kind), target_id): Counter({SUBSCRIBERS: delta})})
+
+
+def subscribers_set(kind: str, target_id: int, size: int) -> None:
+    _owner(kind).objects.filter(pk=target_id).update(**{SUBSCRIBERS: size})
+
+
+def _counted(qs, **filters) -> Coalesce:
+    """
+    Correlated COUNT(*) of qs rows matching filters (which refer to the
+    outer row with OuterRef), 0 when there are none.
+    """
+    return Coalesce(Subquery(
+        qs.filter(**filters).order_by().annotate(
+            n=Count("*")).values("n")[:1],
+        output_field=IntegerField()), 0)
+
+
+def _recount_targets(model, article_col: str, through, target_col: str,
+                     chunk_size: int, ids: list[int] | None = None) -> int:
+    """
+    Recompute the counters of every publisher (or journalist), or of
+    those in ids, one set-based UPDATE per chunk of chunk_size primary
+    keys.
+    """
+    if ids is None:
+        qs = model.objects.all()
+        if model is CustomUser:
+            qs = qs.filter(role=CustomUser.ROLE_JOURNALIST)
+        ids = list(qs.order_by("pk").values_list("pk", flat=True))
+
+    per_article = Article.objects.values(article_col)
+    per_subscriber = through.objects.values(target_col)
+    counts = {
+        APPROVED: _counted(per_article, approved=True,
+                           **{article_col: OuterRef("pk")}),
+        PENDING: _counted(per_article, approved=False,
+                          **{article_col: OuterRef("pk")}),
+        SUBSCRIBERS: _counted(per_subscriber,
+                              **{target_col: OuterRef("pk")}),
+    }
+    if model is Publisher:
+        counts["updated_at"] = timezone.now()
+    for start in range(0, len(ids), chunk_size):
+        model.objects.filter(pk__in=ids[start:start + chunk_size]).update(
+            **counts)
+    return len(ids)
+
+
+def _recount_publishers(chunk_size: int, ids=None) -> int:
+    return _recount_targets(
+        Publisher, "publisher_id", CustomUser.subscribed_publishers.through,
+        "publisher_id", chunk_size, ids)
+
+
+def _recount_journalists(chunk_size: int, ids=None) -> int:
+    return _recount_targets(
+        CustomUser, "author_id", CustomUser.subscribed_journalists.through,
+        "to_customuser_id", chunk_size, ids)
+
+
+def recount_article_owners(author_id: int,
+                           publisher_id: int | None) -> None:
+    """
+    Recount the journalist and publisher of an article whose previous
+    counted state is unknown (it was saved without being loaded).
+    """
+    _recount_journalists(1, [author_id])
+    if publisher_id is not None:
+        _recount_publishers(1, [publisher_id])
+
+
+def recount(chunk_size: int = 1000) -> dict:
+    """
+    Rebuild every publisher and journalist counter from the article and
+    subscription tables. Returns the number of rows recounted per kind.
+    """
+    return {"publishers": _recount_publishers(chunk_size),
+            "journalists": _recount_journalists(chunk_size)}
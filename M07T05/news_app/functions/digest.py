@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Article, CustomUser
+from .fanout import FanoutResult, send_fanout
+from .notify import article_block
+
+PERIODS = {
+    CustomUser.DELIVERY_HOURLY: timedelta(hours=1),
+    CustomUser.DELIVERY_DAILY: timedelta(days=1),
+}
+
+
+def _pending_pairs(mode: str, now):
+    """
+    (reader id, email, article id) for every article approved since each
+    digest reader's last_digest_at, through either a journalist or a
+    publisher subscription, in one UNION query.
+
+    The window is only ever advanced by a delivered digest, never
+    derived from now, so a reader whose digests keep failing still gets
+    everything once one goes through. Readers without a cursor (put into
+    a digest mode by a bulk update) get nothing until one is set.
+    """
+    readers = CustomUser.objects.filter(
+        delivery_mode=mode, last_digest_at__isnull=False).exclude(email="")
+
+    pairs = None
+    for via in ("subscribed_journalists__articles",
+                "subscribed_publishers__articles"):
+        qs = readers.filter(**{
+            f"{via}__approved": True,
+            f"{via}__approved_at__gt": F("last_digest_at"),
+            f"{via}__approved_at__lte": now,
+        }).values_list("id", "email", f"{via}__id")
+        pairs = qs if pairs is None else pairs.union(qs)
+    return pairs
+
+
+def send_digests(mode: str, now=None) -> dict:
+    """
+    Send one digest email per reader in the given delivery mode.
+
+    Readers are grouped by the exact set of new articles they follow, so
+    each distinct digest is rendered once and fanned out to its readers in
+    batches. SMTP traffic scales with readers x digests, not with
+    readers x articles. Returns counts of readers, digests and emails.
+
+    Only readers whose email was delivered have last_digest_at moved to
+    now; the others get the same articles again in their next digest.
+    """
+    now = now or timezone.now()
+
+    articles_by_reader = defaultdict(set)
+    emails = {}
+    for reader_id, email, article_id in _pending_pairs(mode, now).iterator():
+        articles_by_reader[reader_id].add(article_id)
+        emails[reader_id] = email
+
+    groups = defaultdict(list)
+    for reader_id, article_ids in articles_by_reader.items():
+        groups[frozenset(article_ids)].append(reader_id)
+
+    wanted = set().union(*groups) if groups else set()
+    articles = Article.objects.filter(id__in=wanted).select_related(
+        "author", "publisher").defer("content").in_bulk()
+    blocks = {pk: article_block(article) for pk, article in articles.items()}
+
+    result = FanoutResult()
+    delivered = []
+    label = "Hourly" if mode == CustomUser.DELIVERY_HOURLY else "Daily"
+    for article_ids, reader_ids in groups.items():
+        ordered = sorted(article_ids,
+                         key=lambda pk: articles[pk].approved_at,
+                         reverse=True)
+        subject = (f"{label} digest: {len(ordered)} new "
+                   f"article{'s' if len(ordered) > 1 else ''}")
+        body = "\n---\n\n".join(blocks[pk] for pk in ordered)
+        readers_of = defaultdict(list)
+        for reader_id in reader_ids:
+            readers_of[emails[reader_id]].append(reader_id)
+        result.merge(send_fanout(
+            readers_of, subject, body,
+            on_delivered=lambda sent: delivered.extend(
+                reader_id for email in sent
+                for reader_id in readers_of[email])))
+
+    if delivered:
+        CustomUser.objects.filter(id__in=delivered).update(
+            last_digest_at=now)
+
+    return {"readers": len(articles_by_reader), "digests": len(groups),
+            **result.as_dict()}
@@ -0,0 +1,135 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .timing import stage, submit_in_context
+
+
+@dataclass
+class FanoutResult:
+    """
+    Outcome of a fan-out run.
+    """
+    sent: int = 0
+    failed: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Messages delivered per second.
+        """
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: "FanoutResult") -> None:
+        """
+        Add another run's counts and time to this one.
+        """
+        self.sent += other.sent
+        self.failed += other.failed
+        self.chunks += other.chunks
+        self.elapsed += other.elapsed
+
+    def as_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "elapsed": round(self.elapsed, 4),
+            "throughput": round(self.throughput, 1),
+        }
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Yield lists of at most size items without materializing the input.
+    """
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _send_chunk(recipients: list[str], subject: str, body: str,
+                from_email: str) -> tuple[int, int]:
+    """
+    Send one message per recipient over a single SMTP connection.
+
+    The connection is opened with fail_silently=True so one bad address
+    does not abort the rest of the chunk; messages the backend could not
+    deliver are reported as failed. Returns (sent, failed).
+    """
+    connection = get_connection(fail_silently=True)
+    messages = [
+        EmailMessage(subject=subject, body=body, from_email=from_email,
+                     to=[email], connection=connection)
+        for email in recipients
+    ]
+    try:
+        with stage("smtp"):
+            sent = connection.send_messages(messages) or 0
+    except Exception:
+        sent = 0
+    finally:
+        connection.close()
+    return sent, len(messages) - sent
+
+
+def send_fanout(recipients: Iterable[str], subject: str, body: str,
+                from_email: str | None = None, chunk_size: int | None = None,
+                workers: int | None = None,
+                on_delivered: Callable[[list[str]], None] | None = None
+                ) -> FanoutResult:
+    """
+    Email the same subject/body to every recipient individually.
+
+    Recipients are consumed lazily in chunks of chunk_size
+    (EMAIL_FANOUT_CHUNK_SIZE). Each chunk is sent over one connection with
+    send_messages(). With workers > 1 (EMAIL_FANOUT_WORKERS), chunks are
+    sent on that many parallel connections; at most two chunks per worker
+    are held in memory at a time.
+
+    on_delivered, if given, is called with the recipients of every chunk
+    that was delivered in full, so callers can tell who got the email.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    chunk_size = chunk_size or settings.EMAIL_FANOUT_CHUNK_SIZE
+    workers = workers or settings.EMAIL_FANOUT_WORKERS
+
+    result = FanoutResult()
+    started = time.perf_counter()
+
+    def record(chunk, sent_failed):
+        result.sent += sent_failed[0]
+        result.failed += sent_failed[1]
+        result.chunks += 1
+        if on_delivered is not None and not sent_failed[1]:
+            on_delivered(chunk)
+
+    if workers <= 1:
+        for chunk in chunked(recipients, chunk_size):
+            record(chunk, _send_chunk(chunk, subject, body, from_email))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # future -> the chunk it sends
+            pending = {}
+            for chunk in chunked(recipients, chunk_size):
+                if len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(pending.pop(future), future.result())
+                pending[submit_in_context(pool, _send_chunk, chunk, subject,
+                                          body, from_email)] = chunk
+            for future, chunk in pending.items():
+                record(chunk, future.result())
+
+    result.elapsed = time.perf_counter() - started
+    return result
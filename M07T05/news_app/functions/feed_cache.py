@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .replica import primary_reads
+
+GENERATION_KEY = "feed:generation"
+HITS_KEY = "feed:hits"
+MISSES_KEY = "feed:misses"
+
+# Headers of a feed page that are stored and replayed with its body.
+CACHED_HEADERS = ("Link", "X-Next-Cursor", "X-Prev-Cursor")
+
+
+def _cache():
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+def _generation() -> int:
+    """
+    Current feed generation. Every invalidation bumps it, orphaning all
+    cached pages at once. It starts from the clock, so a generation lost
+    to eviction never resurrects pages cached under an old one.
+    """
+    cache = _cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _bump() -> None:
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+
+
+def invalidate() -> None:
+    """
+    Drop every cached feed page.
+
+    Bumped now, so this request never serves a stale page, and again on
+    commit, so a page re-cached by a concurrent request from the not yet
+    committed state is dropped too.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def _count(key: str) -> None:
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def stats() -> dict:
+    values = _cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0}
+
+
+def reset_stats() -> None:
+    _cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+def cached_feed(request, make_validators, respond):
+    """
+    Serve a feed page from the shared cache, or build and cache it.
+
+    make_validators() returns the page's Validators and respond() the
+    uncached Response; neither runs on a hit. Only 200 responses are
+    cached, keyed on the absolute URL (page, limit and host all change
+    the body) under the current generation, for at most
+    FEED_CACHE_TIMEOUT seconds. A hit whose If-None-Match or
+    If-Modified-Since still matches becomes a 304 without touching the
+    database. Responses carry X-Cache: HIT or MISS.
+
+    A miss reads from the primary even in a request routed to the read
+    replica (see functions.replica): right after an invalidation the
+    replica may not have the change yet, and a page built from it would
+    be cached under the new generation and served until the next one.
+    """
+    cache = _cache()
+    url = request.build_absolute_uri()
+    key = (f"feed:{_generation()}:"
+           f"{hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()}")
+
+    entry = cache.get(key)
+    if entry is not None:
+        _count(HITS_KEY)
+        validators = entry["validators"]
+        response = validators.not_modified(request)
+        if response is None:
+            response = validators.apply(
+                Response(entry["data"], headers=entry["headers"]))
+        response["X-Cache"] = "HIT"
+        return response
+
+    _count(MISSES_KEY)
+    with primary_reads():
+        validators = make_validators()
+        response = validators.not_modified(request)
+        if response is None:
+            response = respond()
+    if response.status_code == 200:
+        validators.apply(response)
+        cache.set(key, {
+            "data": response.data,
+            "headers": {name: response[name] for name in CACHED_HEADERS
+                        if response.has_header(name)},
+            "validators": validators,
+        }, settings.FEED_CACHE_TIMEOUT)
+    response["X-Cache"] = "MISS"
+    return response
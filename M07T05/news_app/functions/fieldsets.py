@@ -0,0 +1,75 @@
+from django.db.models import QuerySet
+
+# Every field an article representation can have, in output order.
+ARTICLE_FIELDS = ("id", "title", "content", "excerpt", "author",
+                  "publisher", "image", "created_at", "approved")
+NEWSLETTER_FIELDS = ("id", "title", "description", "created_at", "author",
+                     "articles")
+
+VIEWS = {
+    "full": tuple(f for f in ARTICLE_FIELDS if f != "excerpt"),
+    "summary": tuple(f for f in ARTICLE_FIELDS if f != "content"),
+}
+
+
+class FieldsetError(ValueError):
+    pass
+
+
+def _split(raw: str | None) -> list[str]:
+    return [name.strip() for name in (raw or "").split(",") if name.strip()]
+
+
+def _select(params, allowed: tuple, base: tuple) -> tuple[str, ...]:
+    fields, exclude = _split(params.get("fields")), _split(
+        params.get("exclude"))
+    unknown = sorted(set(fields + exclude) - set(allowed))
+    if unknown:
+        raise FieldsetError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Choose from: {', '.join(allowed)}.")
+    chosen = set(fields) if fields else set(base)
+    chosen -= set(exclude)
+    return tuple(f for f in allowed if f in chosen)
+
+
+def article_view(params) -> tuple[str, ...]:
+    """
+    The base article fieldset for ?view= (full or summary).
+    """
+    view = params.get("view") or "full"
+    if view not in VIEWS:
+        raise FieldsetError(
+            f"view must be one of: {', '.join(sorted(VIEWS))}.")
+    return VIEWS[view]
+
+
+def article_fieldset(params) -> tuple[str, ...]:
+    """
+    Article fields requested by ?view=, ?fields= and ?exclude=.
+
+    ?view= picks the base set (full: everything but excerpt; summary: an
+    excerpt instead of content); ?fields= replaces it and ?exclude=
+    removes from it. Raises FieldsetError for unknown names.
+    """
+    return _select(params, ARTICLE_FIELDS, article_view(params))
+
+
+def newsletter_fieldset(params) -> tuple[str, ...]:
+    """
+    Top-level newsletter fields requested by ?fields= and ?exclude=.
+    """
+    return _select(params, NEWSLETTER_FIELDS, NEWSLETTER_FIELDS)
+
+
+def restrict_articles(qs: QuerySet, fields: tuple) -> QuerySet:
+    """
+    Defer the article columns the fieldset does not need (the columns
+    permission checks and validators rely on are always loaded).
+    """
+    needed = {"id", "approved", "author", "created_at", "updated_at"}
+    needed.update(fields)
+    deferred = [f for f in ("title", "content", "excerpt", "word_count",
+                            "image", "approved_at")
+                if f not in needed]
+    return qs.defer(*deferred) if deferred else qs
@@ -0,0 +1,209 @@
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.urls import reverse
+
+from ..models import CustomUser, Article
+from .audience import article_audience
+from .fanout import FanoutResult, chunked, send_fanout
+from .channels import (ChannelResult, RetryLater, register_channel,
+                       run_channels)
+from .timing import stage
+from .x_post import get_client, post_to_x
+
+# Reader ids resolved per query when streaming subscriber emails.
+SUBSCRIBER_CHUNK_SIZE = 2000
+
+
+def _reader_emails(reader_ids: Iterable[int],
+                   chunk_size: int = SUBSCRIBER_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Stream the emails of the given readers who want instant delivery,
+    chunk_size ids per query. Digest readers are served by send_digests.
+    """
+    for ids in chunked(reader_ids, chunk_size):
+        with stage("audience"):
+            emails = list(CustomUser.objects.filter(
+                id__in=ids, delivery_mode=CustomUser.DELIVERY_INSTANT
+            ).exclude(email="").values_list("email", flat=True))
+        yield from emails
+
+
+def _subscriber_emails(article: Article,
+                       chunk_size: int = SUBSCRIBER_CHUNK_SIZE
+                       ) -> Iterator[str]:
+    """
+    Stream subscriber emails for a newly approved article.
+
+    Subscribers include:
+    - readers subscribed to the journalist
+    - readers subscribed to the publisher (if publisher article)
+
+    The deduplicated reader ids come from the audience index (one query),
+    and their emails are looked up chunk_size ids at a time, so memory
+    stays flat however large the audience.
+    """
+    with stage("audience"):
+        reader_ids = article_audience(article)
+    return _reader_emails(reader_ids, chunk_size)
+
+
+def article_absolute_url(article: Article) -> str:
+    """
+    Build absolute article detail link for emails/social posts.
+    Signals do not have access to request.build_absolute_uri,
+    so we use settings.SITE_BASE_URL.
+    """
+    path = reverse("article_detail", kwargs={"article_id": article.id})
+    return f"{settings.SITE_BASE_URL}{path}"
+
+
+def _scope(article: Article) -> str:
+    return article.publisher.name if article.publisher else "Independent"
+
+
+def article_block(article: Article) -> str:
+    """
+    Email text describing one article: metadata, excerpt and link.
+    """
+    with stage("reverse"):
+        link = article_absolute_url(article)
+    return (
+        f"Title: {article.title}\n"
+        f"Author: {article.author.username}\n"
+        f"Publisher: {_scope(article)}\n\n"
+        f"Excerpt:\n{article.excerpt}\n\n"
+        f"Read more: {link}\n"
+    )
+
+
+def _x_text(article: Article) -> str:
+    return (f"NEW: {article.title} — {article.author.username} "
+            f"({_scope(article)}) {article_absolute_url(article)}")
+
+
+def _raise_if_nothing_sent(result: FanoutResult) -> None:
+    """
+    Raise RetryLater if no email could be delivered at all: with every
+    message failing, the SMTP server is unreachable or refusing, which a
+    later attempt can fix. Partial failures are only reported, since a
+    retry would resend to everyone who already got the email.
+    """
+    if result.failed and not result.sent:
+        raise RetryLater(
+            f"Email delivery failed for all {result.failed} subscribers.")
+
+
+def _send_merged(articles: list[Article]) -> FanoutResult:
+    """
+    Email subscribers about several articles approved together.
+
+    Audiences of all articles are merged so each reader receives one
+    email listing every approved article they follow. Readers following
+    the same set of articles share one rendered body, sent through a
+    single fan-out.
+    """
+    followed = defaultdict(list)
+    for position, article in enumerate(articles):
+        for reader_id in article_audience(article):
+            followed[reader_id].append(position)
+
+    groups = defaultdict(list)
+    for reader_id, positions in followed.items():
+        groups[tuple(positions)].append(reader_id)
+    del followed
+
+    result = FanoutResult()
+    for positions, reader_ids in groups.items():
+        picked = [articles[p] for p in positions]
+        if len(picked) == 1:
+            subject = f"New Article: {picked[0].title}"
+        else:
+            subject = f"{len(picked)} new articles from your subscriptions"
+        body = "\n---\n\n".join(article_block(a) for a in picked)
+        result.merge(send_fanout(_reader_emails(reader_ids), subject, body))
+    return result
+
+
+@register_channel("email", timeout=300)
+def email_channel(articles: list[Article]) -> dict:
+    """
+    Send each instant-delivery subscriber their own email with excerpt
+    and link; several articles are merged into one email per reader.
+    """
+    if len(articles) == 1:
+        article = articles[0]
+        result = send_fanout(_subscriber_emails(article),
+                             f"New Article: {article.title}",
+                             article_block(article))
+    else:
+        result = _send_merged(articles)
+    _raise_if_nothing_sent(result)
+    return result.as_dict()
+
+
+def _x_budget(articles: list[Article]) -> float:
+    """
+    Time budget of the X channel: the worst case of one post per article
+    under the client's timeout and retry settings, so a slow X is not
+    cut off mid-batch.
+    """
+    client = get_client()
+    per_post = client.worst_case_seconds() if client is not None else 0.0
+    return len(articles) * per_post + 1.0
+
+
+@register_channel("x", timeout=_x_budget)
+def x_channel(articles: list[Article]) -> dict:
+    """
+    Post each article to X and report how many posts were accepted and
+    which articles X rejected. Rejections (bad token, duplicates) are
+    final and never retried. The channel fails, with RetryLater, only if
+    nothing was posted and some post was held back for a transient reason
+    (rate limit, open circuit breaker, X unavailable); the outbox retries
+    once that has passed. Partial success is not retried, since a retry
+    would repeat the posts that went through.
+    """
+    posted, rejected, deferred = 0, [], []
+    for article in articles:
+        text = _x_text(article)
+        with stage("x"):
+            result = post_to_x(text)
+        if result:
+            posted += 1
+        elif getattr(result, "transient", False):
+            deferred.append(result)
+        else:
+            rejected.append(article.id)
+    if deferred and not posted:
+        waits = [r.retry_after for r in deferred if r.retry_after is not None]
+        raise RetryLater(f"X deferred {len(deferred)} posts: "
+                         f"{deferred[0].error}",
+                         retry_after=max(waits) if waits else None)
+    return {"posted": posted, "rejected": rejected,
+            "deferred": len(deferred)}
+
+
+def notify_on_approval(article: Article, skip: Iterable[str] = ()
+                       ) -> dict[str, ChannelResult]:
+    """
+    Notify subscribers when an article is approved:
+    - send each subscriber their own email with excerpt + link
+    - post update to X (optional)
+
+    Every registered channel runs concurrently with its own time budget
+    (see run_channels); channels named in skip are left out, e.g. those
+    that already succeeded on an earlier outbox attempt.
+    """
+    return run_channels([article], skip)
+
+
+def notify_on_bulk_approval(articles: list[Article],
+                            skip: Iterable[str] = ()
+                            ) -> dict[str, ChannelResult]:
+    """
+    Notify subscribers about several articles approved together: one
+    merged email per reader, one X post per article.
+    """
+    return run_channels(articles, skip)
@@ -0,0 +1,228 @@
+import json
+import logging
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Article, NotificationOutbox
+from . import counters, feed_cache, timeline
+from .channels import RetryLater
+from .notify import notify_on_approval, notify_on_bulk_approval
+from .timing import StageTimings, collect_stages
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_approval(article_id: int) -> NotificationOutbox:
+    """
+    Record that subscribers must be notified about an approved article.
+
+    Called right after the approving UPDATE, so the INSERT shares its
+    transaction: either both are committed or neither is.
+    """
+    return NotificationOutbox.objects.create(
+        kind=NotificationOutbox.KIND_ARTICLE_APPROVED,
+        article_id=article_id,
+    )
+
+
+def approve(article_id: int) -> bool:
+    """
+    Approve an article with a compare-and-set UPDATE.
+
+    Only the caller whose UPDATE ... WHERE approved = false actually flips
+    the row queues a notification and adds the article to subscriber
+    timelines, so concurrent approvals cannot notify twice. Returns True
+    if this call performed the approval.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        won = Article.objects.filter(
+            pk=article_id, approved=False).update(
+            approved=True, approved_at=now, updated_at=now) == 1
+        if won:
+            counters.article_approved(article_id)
+            enqueue_approval(article_id)
+            timeline.add_approved([article_id])
+            feed_cache.invalidate()
+    return won
+
+
+def approve_many(article_ids: Iterable[int]) -> list[int]:
+    """
+    Approve every still-pending article in article_ids at once.
+
+    The pending rows are locked, flipped with a single UPDATE and handed
+    to the outbox as one batched notification job, so readers following
+    several of the authors get one combined email. Returns the ids this
+    call approved; ids that were already approved or do not exist are
+    skipped.
+    """
+    with transaction.atomic():
+        rows = list(
+            Article.objects.select_for_update()
+            .filter(id__in=list(article_ids), approved=False)
+            .order_by("id").values_list("id", "author_id", "publisher_id"))
+        if not rows:
+            return []
+
+        approved = [article_id for article_id, _, _ in rows]
+        now = timezone.now()
+        Article.objects.filter(id__in=approved).update(
+            approved=True, approved_at=now, updated_at=now)
+        counters.articles_approved(
+            (author_id, publisher_id) for _, author_id, publisher_id in rows)
+        if len(approved) == 1:
+            enqueue_approval(approved[0])
+        else:
+            NotificationOutbox.objects.create(
+                kind=NotificationOutbox.KIND_ARTICLES_APPROVED,
+                article_ids=approved,
+            )
+        timeline.add_approved(approved)
+        feed_cache.invalidate()
+    return approved
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """
+    Delay before the next retry: OUTBOX_BACKOFF_SECONDS doubled per
+    failed attempt, capped at OUTBOX_BACKOFF_MAX_SECONDS.
+    """
+    base = settings.OUTBOX_BACKOFF_SECONDS
+    cap = settings.OUTBOX_BACKOFF_MAX_SECONDS
+    return timedelta(seconds=min(cap, base * (2 ** max(attempts - 1, 0))))
+
+
+def _claim_due(batch_size: int) -> list[int]:
+    """
+    Lease a batch of due rows to this worker.
+
+    Rows are locked with SKIP LOCKED (where the backend supports it) and
+    their next_attempt_at is pushed forward by OUTBOX_LEASE_SECONDS, so
+    parallel workers never pick up the same row, and a crashed worker's
+    rows become due again once the lease expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationOutbox.STATUS_PENDING,
+                    next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if ids:
+            NotificationOutbox.objects.filter(id__in=ids).update(
+                next_attempt_at=now + timedelta(
+                    seconds=settings.OUTBOX_LEASE_SECONDS))
+    return ids
+
+
+def _deliver(entry: NotificationOutbox) -> None:
+    """
+    Run the notification channels for a single outbox row. Articles
+    that are no longer approved are left out; a row with none left is
+    done without notifying anyone.
+
+    Channels that succeed are recorded on the row, so a retry only
+    re-runs the ones that failed. So are channels that timed out while
+    running: they may still deliver, and running them again could send
+    everything twice. Raises RetryLater if any other channel failed;
+    its retry_after is set when every failed channel said how long to
+    wait (X rate limit, open circuit breaker).
+    """
+    if entry.kind == NotificationOutbox.KIND_ARTICLE_APPROVED:
+        if not entry.article.approved:
+            return
+        results = notify_on_approval(entry.article,
+                                     skip=entry.completed_channels)
+    elif entry.kind == NotificationOutbox.KIND_ARTICLES_APPROVED:
+        articles = list(Article.objects.filter(
+            id__in=entry.article_ids, approved=True).select_related(
+            "author", "publisher").defer("content").order_by("-created_at"))
+        if not articles:
+            return
+        results = notify_on_bulk_approval(articles,
+                                          skip=entry.completed_channels)
+    else:
+        return
+
+    for name, r in results.items():
+        if r.unknown:
+            logger.warning("outbox %s: channel %s not retried: %s",
+                           entry.pk, name, r.error)
+    entry.completed_channels = entry.completed_channels + [
+        name for name, r in results.items() if r.ok or r.unknown]
+    failed = {name: r for name, r in results.items()
+              if not r.ok and not r.unknown}
+    if failed:
+        waits = [r.retry_after for r in failed.values()]
+        raise RetryLater(
+            "; ".join(f"{name}: {r.error}" for name, r in failed.items()),
+            retry_after=None if None in waits else max(waits))
+
+
+def drain_outbox(batch_size: int = 100,
+                 max_attempts: int | None = None) -> dict:
+    """
+    Deliver every outbox row that is currently due.
+
+    Failed deliveries are rescheduled after the wait the failed channels
+    asked for, or with exponential backoff if they did not say; after
+    max_attempts failures a row is marked failed and left for inspection.
+    Returns counts of sent, retried and failed rows, plus "stages": the
+    time spent per pipeline stage (audience, smtp, x, ...) across all
+    deliveries. Each delivery's stages are also logged at DEBUG level.
+    """
+    if max_attempts is None:
+        max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+
+    stats = {"sent": 0, "retried": 0, "failed": 0}
+    totals = StageTimings()
+    while True:
+        ids = _claim_due(batch_size)
+        if not ids:
+            stats["stages"] = totals.as_dict()
+            return stats
+
+        entries = NotificationOutbox.objects.filter(id__in=ids).select_related(
+            "article__author", "article__publisher").defer(
+            "article__content").order_by("id")
+        for entry in entries:
+            try:
+                with collect_stages() as timings:
+                    try:
+                        _deliver(entry)
+                    finally:
+                        totals.merge(timings)
+                        logger.debug("outbox %s stages %s", entry.pk,
+                                     json.dumps(timings.as_dict()))
+            except Exception as exc:
+                entry.attempts += 1
+                entry.last_error = f"{type(exc).__name__}: {exc}"
+                if entry.attempts >= max_attempts:
+                    entry.status = NotificationOutbox.STATUS_FAILED
+                    stats["failed"] += 1
+                else:
+                    retry_after = getattr(exc, "retry_after", None)
+                    delay = (backoff_delay(entry.attempts)
+                             if retry_after is None
+                             else timedelta(seconds=retry_after))
+                    entry.next_attempt_at = timezone.now() + delay
+                    stats["retried"] += 1
+                entry.save(update_fields=["attempts", "last_error", "status",
+                                          "next_attempt_at",
+                                          "completed_channels"])
+                continue
+
+            entry.attempts += 1
+            entry.status = NotificationOutbox.STATUS_SENT
+            entry.sent_at = timezone.now()
+            entry.last_error = ""
+            entry.save(update_fields=["attempts", "status", "sent_at",
+                                      "last_error", "completed_channels"])
+            stats["sent"] += 1
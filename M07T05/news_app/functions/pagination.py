@@ -0,0 +1,146 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils.http import urlencode
+
+NEXT = "n"
+PREV = "p"
+
+
+class CursorError(ValueError):
+    pass
+
+
+@dataclass
+class Page:
+    """
+    One page of a keyset-paginated listing, newest first.
+    """
+    items: list
+    next: str | None = None
+    prev: str | None = None
+
+
+def encode_cursor(created_at: datetime | float, pk: int,
+                  direction: str) -> str:
+    """
+    Opaque cursor for the row (created_at, pk). created_at may also be a
+    float sort key, such as a search rank.
+    """
+    value = (created_at.isoformat() if isinstance(created_at, datetime)
+             else repr(created_at))
+    raw = f"{direction}|{value}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, parse=datetime.fromisoformat
+                  ) -> tuple[str, datetime, int]:
+    """
+    Return (direction, created_at, pk) from an opaque cursor, created_at
+    read with parse (float for float sort keys).
+    Raises CursorError if the cursor was not produced by encode_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        direction, created_at, pk = raw.decode().split("|")
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+        return direction, parse(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError("Invalid cursor.")
+
+
+def _limit(raw) -> int:
+    if raw in (None, ""):
+        return settings.API_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise CursorError("limit must be an integer.")
+    if limit < 1:
+        raise CursorError("limit must be positive.")
+    return min(limit, settings.API_MAX_PAGE_SIZE)
+
+
+def check_page_params(cursor: str | None, limit=None,
+                      parse=datetime.fromisoformat) -> None:
+    """
+    Raise CursorError if paginate() would reject cursor or limit, without
+    touching the database.
+    """
+    _limit(limit)
+    if cursor:
+        decode_cursor(cursor, parse)
+
+
+def paginate(qs: QuerySet, cursor: str | None = None,
+             limit=None, keys: tuple[str, str] = ("created_at", "id"),
+             parse=datetime.fromisoformat) -> Page:
+    """
+    Return one page of qs ordered by (created_at, id) descending.
+
+    Pages are selected with WHERE (created_at, id) < (t, id) rather than
+    OFFSET, so with an index on (..., created_at, id) every page costs
+    the same as the first. limit defaults to API_PAGE_SIZE and is capped
+    at API_MAX_PAGE_SIZE. One extra row is fetched to know whether there
+    is a further page.
+
+    keys names the columns to order and filter on when they hold the
+    same values as created_at/id but live elsewhere, e.g. on a joined
+    timeline row whose index covers them. Rows carry the first key under
+    its last component (created_at for entry__created_at). Another sort
+    key, such as a search rank, can replace created_at; parse then reads
+    its cursor value back.
+    """
+    limit = _limit(limit)
+    time_key, id_key = keys
+    attr = time_key.rsplit("__", 1)[-1]
+    direction = NEXT
+    if cursor:
+        direction, created_at, pk = decode_cursor(cursor, parse)
+        op = "lt" if direction == NEXT else "gt"
+        qs = qs.filter(Q(**{f"{time_key}__{op}": created_at})
+                       | Q(**{time_key: created_at, f"{id_key}__{op}": pk}))
+
+    if direction == NEXT:
+        rows = list(qs.order_by(f"-{time_key}", f"-{id_key}")[:limit + 1])
+    else:
+        rows = list(qs.order_by(time_key, id_key)[:limit + 1])
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows.reverse()
+
+    page = Page(rows)
+    if rows:
+        first, last = rows[0], rows[-1]
+        if more if direction == NEXT else cursor:
+            page.next = encode_cursor(getattr(last, attr), last.id, NEXT)
+        if cursor and (more if direction == PREV else True):
+            page.prev = encode_cursor(getattr(first, attr), first.id, PREV)
+    return page
+
+
+def page_links(request, page: Page) -> dict:
+    """
+    Response headers advertising the neighbouring pages: a standard Link
+    header (rel="next"/"prev") plus the bare cursors.
+    """
+    params = request.query_params.copy()
+    headers, links = {}, []
+    for rel, cursor in (("next", page.next), ("prev", page.prev)):
+        if not cursor:
+            continue
+        params["cursor"] = cursor
+        url = request.build_absolute_uri(
+            f"{request.path}?{urlencode(params, doseq=True)}")
+        links.append(f'<{url}>; rel="{rel}"')
+        headers[f"X-{rel.capitalize()}-Cursor"] = cursor
+    if links:
+        headers["Link"] = ", ".join(links)
+    return headers
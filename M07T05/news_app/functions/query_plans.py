@@ -0,0 +1,126 @@
+import json
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+
+from ..models import Article, CustomUser, TimelineEntry
+from ..serializers import ArticleListSerializer
+from .search import SEARCH_KEYS, search_articles
+from .timeline import (TIMELINE_KEYS, fanout_on_read_articles,
+                       timeline_articles)
+
+
+@dataclass
+class HotQuery:
+    """
+    A query on a hot path, built the way its view builds it.
+
+    allow_sort marks queries whose ORDER BY cannot come from an index
+    (an OR across two indexes); they must still not scan a whole table.
+    """
+    name: str
+    qs: QuerySet
+    allow_sort: bool = False
+
+
+def hot_queries(reader: CustomUser) -> list[HotQuery]:
+    """
+    The article queries behind article_list, editor_queue, api_articles,
+    api_articles_subscribed and api_articles_search, plus timeline
+    backfills, for one reader.
+    """
+    page = settings.API_PAGE_SIZE + 1
+    listed = Article.objects.select_related(
+        "author", "publisher").defer("content").order_by("-created_at")
+    fast = ArticleListSerializer()
+    # An empty IN () list is never sent to the database; keep one id.
+    journalists = list(reader.subscribed_journalists.values_list(
+        "pk", flat=True)) or [0]
+    return [
+        HotQuery("article_list (reader)", listed.filter(approved=True)[:13]),
+        HotQuery("article_list (staff)", listed[:13]),
+        HotQuery("editor_queue", listed.filter(approved=False)),
+        HotQuery("api_articles", fast.prepare(
+            Article.objects.filter(approved=True)).order_by(
+            "-created_at", "-id")[:page]),
+        HotQuery("api_articles_subscribed (timeline)", fast.prepare(
+            timeline_articles(reader)).order_by(
+            *(f"-{key}" for key in TIMELINE_KEYS))[:page]),
+        HotQuery("api_articles_subscribed (fan-out on read)", fast.prepare(
+            fanout_on_read_articles(reader)).order_by(
+            "-created_at", "-id")[:page], allow_sort=True),
+        # Ranked results are sorted after matching; there is no index
+        # order to follow.
+        HotQuery("api_articles_search", fast.prepare(search_articles(
+            Article.objects.filter(approved=True), "news"),
+            extra=("rank",)).order_by(
+            *(f"-{key}" for key in SEARCH_KEYS))[:page], allow_sort=True),
+        HotQuery("timeline backfill", Article.objects.filter(
+            approved=True, author_id__in=journalists).values_list(
+            "id", "created_at")),
+    ]
+
+
+def analyze(using: str = "default") -> None:
+    """
+    Refresh the optimizer statistics of the tables hot queries read, so
+    plans reflect the data rather than empty-table defaults.
+    """
+    connection = connections[using]
+    tables = [model._meta.db_table for model in (Article, TimelineEntry)]
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute(f"ANALYZE TABLE {', '.join(tables)}")
+            cursor.fetchall()
+        elif connection.vendor == "sqlite":
+            cursor.execute("ANALYZE")
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def _mysql_problems(qs: QuerySet) -> tuple[list[str], list[str]]:
+    scans, sorts = [], []
+    for node in _walk(json.loads(qs.explain(format="json"))):
+        if node.get("access_type") == "ALL":
+            scans.append(f"full scan of {node.get('table_name')}")
+        if node.get("using_filesort"):
+            sorts.append("filesort")
+    return scans, sorts
+
+
+def _sqlite_problems(qs: QuerySet) -> tuple[list[str], list[str]]:
+    scans, sorts = [], []
+    for line in qs.explain().splitlines():
+        detail = line.split(maxsplit=3)[-1]
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            scans.append(f"full scan: {detail}")
+        if detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            sorts.append(detail)
+    return scans, sorts
+
+
+def plan_problems(hot: HotQuery) -> list[str]:
+    """
+    What is wrong with the query's plan: full table scans and, unless
+    allow_sort, sorts not served by an index. Empty means the plan is
+    fine. Raises NotImplementedError for backends other than MySQL and
+    SQLite.
+    """
+    vendor = connections[hot.qs.db].vendor
+    if vendor == "mysql":
+        scans, sorts = _mysql_problems(hot.qs)
+    elif vendor == "sqlite":
+        scans, sorts = _sqlite_problems(hot.qs)
+    else:
+        raise NotImplementedError(f"No plan checks for {vendor}.")
+    return scans + ([] if hot.allow_sort else sorts)
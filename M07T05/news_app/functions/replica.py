@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = "default"
+REPLICA = "replica"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Set on responses to requests that wrote; its holder reads the primary.
+PIN_COOKIE = "db_primary"
+
+
+@dataclass
+class _RequestState:
+    read_alias: str
+    wrote: bool = False
+
+
+# State of the request being served; None outside requests.
+_state: ContextVar[_RequestState | None] = ContextVar(
+    "replica_request_state", default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the current request's reads to the primary inside the block.
+    For data other requests are served from later, such as cached feed
+    pages: a lagging replica would have them keep stale rows.
+    """
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    saved = state.read_alias
+    state.read_alias = PRIMARY
+    try:
+        yield
+    finally:
+        state.read_alias = saved
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of safe requests to the replica.
+
+    Reads go to REPLICA only while ReplicaMiddleware serves a GET, HEAD
+    or OPTIONS request, and only until that request writes: from then
+    on, and inside transactions, they go to the primary, so a request
+    always sees its own writes. Writes, and every query made outside a
+    request (management commands, the outbox worker), use the primary.
+    """
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (state is None or state.wrote
+                or connections[PRIMARY].in_atomic_block):
+            return PRIMARY
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication.
+        return db != REPLICA
+
+
+class ReplicaMiddleware:
+    """
+    Tracks the request for ReplicaRouter. Place it first in MIDDLEWARE,
+    so the session and auth lookups are routed too.
+
+    Unsafe requests read from the primary. So do clients holding
+    PIN_COOKIE, which is set for DB_REPLICA_PIN_SECONDS after a request
+    wrote: the page a form redirects to shows the change even if the
+    replica lags.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _read_alias(self, request) -> str:
+        if (not replica_configured() or request.method not in SAFE_METHODS
+                or PIN_COOKIE in request.COOKIES):
+            return PRIMARY
+        return REPLICA
+
+    def __call__(self, request):
+        state = _RequestState(self._read_alias(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if (state.wrote and replica_configured()
+                and settings.DB_REPLICA_PIN_SECONDS):
+            response.set_cookie(PIN_COOKIE, "1",
+                                max_age=settings.DB_REPLICA_PIN_SECONDS,
+                                httponly=True, samesite="Lax")
+        return response
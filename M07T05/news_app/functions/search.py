@@ -0,0 +1,192 @@
+import re
+from typing import Iterable
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+from ..models import Article, ArticleSearchEntry
+
+# Words of a query that are searched for; the rest are ignored.
+MAX_TERMS = 8
+# How much more a match in the title counts than one in the body.
+TITLE_WEIGHT = 4.0
+
+# Ordering/cursor columns of ranked search results, best first.
+SEARCH_KEYS = ("rank", "id")
+
+ARTICLE_TABLE = Article._meta.db_table
+FTS_TABLE = ArticleSearchEntry._meta.db_table
+
+_WORD = re.compile(r"\w+")
+
+# vendor -> backend, filled by register_backend.
+_backends: dict[str, "SearchBackend"] = {}
+
+
+class SearchError(ValueError):
+    pass
+
+
+class BM25(Func):
+    """
+    FTS5 bm25() relevance of the matched row; lower is better.
+    """
+    function = "bm25"
+    output_field = FloatField()
+
+
+def terms(query: str | None) -> list[str]:
+    """
+    The words of a search query, at most MAX_TERMS. Operators and
+    punctuation are dropped, so user input never reaches the backend's
+    query syntax. Raises SearchError if no word is left.
+    """
+    words = _WORD.findall(query or "")[:MAX_TERMS]
+    if not words:
+        raise SearchError("q is required.")
+    return words
+
+
+def register_backend(vendor: str):
+    """
+    Class decorator registering the search backend of a database vendor.
+    """
+    def decorator(cls):
+        _backends[vendor] = cls()
+        return cls
+    return decorator
+
+
+class SearchBackend:
+    """
+    Fallback for databases without a registered backend: every term must
+    appear in the title or content (icontains), and all matches rank the
+    same. There is no index to maintain.
+
+    Backends annotate "rank" (higher is better) on the matching articles
+    and keep their index in step with the article table.
+    """
+    def search(self, qs: QuerySet, words: list[str]) -> QuerySet:
+        for word in words:
+            qs = qs.filter(Q(title__icontains=word)
+                           | Q(content__icontains=word))
+        return qs.annotate(rank=Value(0.0, output_field=FloatField()))
+
+    def index(self, connection, article_ids: list[int]) -> None:
+        """
+        (Re)index the current title and content of the given articles.
+        """
+
+    def remove(self, connection, article_ids: list[int]) -> None:
+        pass
+
+    def rebuild(self, connection) -> int:
+        """
+        Rebuild the whole index. Returns the number of articles indexed,
+        0 if the database maintains the index itself.
+        """
+        return 0
+
+
+@register_backend("sqlite")
+class SQLiteFTS5(SearchBackend):
+    """
+    FTS5 shadow table (FTS_TABLE, created by migration 0015) holding a
+    copy of each article's title and content under the article id, kept
+    in sync by Article signals. Articles are joined to their matching
+    entries (ArticleSearchEntry), so every match is scored once, by
+    bm25() with title matches weighted TITLE_WEIGHT.
+    """
+    def _match(self, words: list[str]) -> str:
+        # Each word as a quoted string: implicit AND, no operators.
+        return " ".join(f'"{word}"' for word in words)
+
+    def search(self, qs: QuerySet, words: list[str]) -> QuerySet:
+        return qs.filter(
+            search_entry__document__match=self._match(words)).annotate(
+            rank=-BM25(F("search_entry__document"), Value(TITLE_WEIGHT),
+                       Value(1.0)))
+
+    def index(self, connection, article_ids: list[int]) -> None:
+        placeholders = ", ".join(["%s"] * len(article_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})",
+                article_ids)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content) "
+                f"SELECT id, title, content FROM {ARTICLE_TABLE} "
+                f"WHERE id IN ({placeholders})", article_ids)
+
+    def remove(self, connection, article_ids: list[int]) -> None:
+        placeholders = ", ".join(["%s"] * len(article_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})",
+                article_ids)
+
+    def rebuild(self, connection) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content) "
+                f"SELECT id, title, content FROM {ARTICLE_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+            return Article.objects.using(connection.alias).count()
+
+
+@register_backend("mysql")
+class MySQLFulltext(SearchBackend):
+    """
+    FULLTEXT index over (title, content) (article_fulltext_idx, created
+    by migration 0015), maintained by InnoDB itself. Every word is
+    required (boolean mode, "+word"), as with FTS5; matches are ranked by
+    MATCH ... AGAINST relevance. InnoDB only indexes committed rows, so
+    articles are searchable once their transaction commits.
+    """
+    def _against(self, words: list[str]) -> str:
+        # terms() leaves only word characters, so no other operators.
+        return " ".join(f"+{word}" for word in words)
+
+    def search(self, qs: QuerySet, words: list[str]) -> QuerySet:
+        rank = RawSQL(
+            f"MATCH ({ARTICLE_TABLE}.title, {ARTICLE_TABLE}.content) "
+            f"AGAINST (%s IN BOOLEAN MODE)",
+            [self._against(words)], output_field=FloatField())
+        return qs.annotate(rank=rank).filter(rank__gt=0)
+
+
+def backend(using: str = "default") -> SearchBackend:
+    return _backends.get(connections[using].vendor, SearchBackend())
+
+
+def search_articles(qs: QuerySet, query: str | None) -> QuerySet:
+    """
+    The articles of qs matching query, annotated with rank (higher is
+    better); order by SEARCH_KEYS descending. Visibility filters belong
+    on qs. Raises SearchError for an empty query.
+    """
+    return backend(qs.db).search(qs, terms(query))
+
+
+def articles_saved(article_ids: Iterable[int],
+                   using: str = "default") -> None:
+    article_ids = list(article_ids)
+    if article_ids:
+        backend(using).index(connections[using], article_ids)
+
+
+def articles_deleted(article_ids: Iterable[int],
+                     using: str = "default") -> None:
+    article_ids = list(article_ids)
+    if article_ids:
+        backend(using).remove(connections[using], article_ids)
+
+
+def rebuild(using: str = "default") -> int:
+    """
+    Reindex every article. Returns the number of articles indexed.
+    """
+    return backend(using).rebuild(connections[using])
@@ -0,0 +1,29 @@
+import math
+
+# Length of the excerpt stored on each article (see Article.excerpt).
+EXCERPT_LENGTH = 240
+WORDS_PER_MINUTE = 200
+
+
+def build_excerpt(text: str, limit: int = EXCERPT_LENGTH) -> str:
+    """
+    Build an excerpt: the text cut at the last word boundary before
+    limit characters, with "..." appended when it was cut.
+
+    Default length is 240 characters.
+    """
+    cleaned = (text or "").strip()
+    if len(cleaned) <= limit:
+        return cleaned
+    return cleaned[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def count_words(text: str) -> int:
+    return len((text or "").split())
+
+
+def reading_minutes(word_count: int) -> int:
+    """
+    Minutes needed to read word_count words, rounded up; 0 for none.
+    """
+    return math.ceil(word_count / WORDS_PER_MINUTE)
@@ -0,0 +1,226 @@
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import FilteredRelation, Q, QuerySet
+
+from ..models import Article, AudienceIndex, CustomUser, TimelineEntry
+from .audience import JOURNALIST, PUBLISHER, union_sorted, unpack
+from .fanout import chunked
+
+# Article column holding the target of each audience kind.
+_ARTICLE_COLUMN = {JOURNALIST: "author_id", PUBLISHER: "publisher_id"}
+
+# Ordering/cursor columns of a timeline-backed subscribed feed.
+TIMELINE_KEYS = ("entry__created_at", "entry__article_id")
+
+
+def enabled() -> bool:
+    return settings.TIMELINE_ENABLED
+
+
+def _insert(rows: Iterable[tuple[int, int, object]]) -> int:
+    """
+    Bulk insert (reader_id, article_id, created_at) rows, skipping those
+    already present. Rows of readers that no longer exist are dropped:
+    the audience index may still list a user deleted meanwhile, and the
+    insert would fail on the reader foreign key. Returns the number of
+    rows written or skipped.
+    """
+    count = 0
+    for batch in chunked(rows, settings.TIMELINE_BATCH_SIZE):
+        existing = set(CustomUser.objects.filter(
+            id__in={reader_id for reader_id, _, _ in batch}).values_list(
+            "id", flat=True))
+        entries = [TimelineEntry(reader_id=reader_id, article_id=article_id,
+                                 created_at=created_at)
+                   for reader_id, article_id, created_at in batch
+                   if reader_id in existing]
+        TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+        count += len(entries)
+    return count
+
+
+def _split_targets(kind: str, target_ids: Iterable[int]
+                   ) -> tuple[dict[int, bytes], set[int]]:
+    """
+    Return ({target_id: packed members}, large target ids). Targets over
+    TIMELINE_MAX_AUDIENCE are flagged fanout_on_read and reported as
+    large; they are no longer fanned out on write.
+    """
+    small, large = {}, set()
+    rows = AudienceIndex.objects.filter(
+        kind=kind, target_id__in=list(target_ids)).values_list(
+        "target_id", "size", "fanout_on_read", "members")
+    for target_id, size, on_read, members in rows:
+        if on_read or size > settings.TIMELINE_MAX_AUDIENCE:
+            large.add(target_id)
+        else:
+            small[target_id] = members
+    if large:
+        AudienceIndex.objects.filter(
+            kind=kind, target_id__in=large, fanout_on_read=False).update(
+            fanout_on_read=True)
+    return small, large
+
+
+def fan_out(articles: list[Article]) -> dict:
+    """
+    Copy newly approved articles into their subscribers' timelines.
+
+    Each article goes to the readers of its journalist and publisher, one
+    row per reader, read from the audience index. Targets with more than
+    TIMELINE_MAX_AUDIENCE subscribers are skipped and flagged instead, and
+    their readers fall back to fan-out on read, which bounds the rows one
+    approval writes.
+
+    Called in the approving transaction (see add_approved), so the
+    subscribed feed never lags behind the approval.
+    """
+    journalists, _ = _split_targets(JOURNALIST,
+                                    {a.author_id for a in articles})
+    publishers, _ = _split_targets(
+        PUBLISHER, {a.publisher_id for a in articles if a.publisher_id})
+
+    rows = 0
+    for article in articles:
+        sources = [journalists.get(article.author_id),
+                   publishers.get(article.publisher_id)]
+        readers = union_sorted(*(unpack(data) for data in sources
+                                 if data is not None))
+        rows += _insert((reader_id, article.id, article.created_at)
+                        for reader_id in readers)
+    return {"rows": rows}
+
+
+def add_approved(article_ids: Iterable[int]) -> dict:
+    """
+    fan_out() for articles approved in the current transaction by a
+    queryset UPDATE (see functions.outbox). Does nothing unless
+    TIMELINE_ENABLED.
+    """
+    if not enabled():
+        return {"rows": 0}
+    return fan_out(list(Article.objects.filter(
+        id__in=list(article_ids)).only("author", "publisher",
+                                       "created_at")))
+
+
+def backfill(kind: str, target_ids: Iterable[int],
+             reader_ids: Iterable[int]) -> int:
+    """
+    Add the approved articles of newly followed targets to the readers'
+    timelines. Returns the number of rows written.
+    """
+    target_ids = list(target_ids)
+    _, large = _split_targets(kind, target_ids)
+    targets = [target_id for target_id in target_ids
+               if target_id not in large]
+    reader_ids = list(reader_ids)
+    if not targets or not reader_ids:
+        return 0
+    articles = Article.objects.filter(
+        approved=True, **{f"{_ARTICLE_COLUMN[kind]}__in": targets}
+    ).values_list("id", "created_at").iterator(
+        chunk_size=settings.TIMELINE_BATCH_SIZE)
+    return _insert((reader_id, article_id, created_at)
+                   for article_id, created_at in articles
+                   for reader_id in reader_ids)
+
+
+def prune(kind: str, target_ids: Iterable[int],
+          reader_ids: Iterable[int]) -> int:
+    """
+    Remove the articles of unfollowed targets from the readers'
+    timelines, keeping those still reachable through another
+    subscription. Call after the subscription rows are gone.
+    """
+    column = f"article__{_ARTICLE_COLUMN[kind]}__in"
+    target_ids = list(target_ids)
+    deleted = 0
+    for reader in CustomUser.objects.filter(id__in=list(reader_ids)):
+        still_followed = (
+            Q(article__author_id__in=list(
+                reader.subscribed_journalists.values_list("pk", flat=True)))
+            | Q(article__publisher_id__in=list(
+                reader.subscribed_publishers.values_list("pk", flat=True))))
+        deleted += TimelineEntry.objects.filter(
+            reader=reader, **{column: target_ids}).exclude(
+            still_followed).delete()[0]
+    return deleted
+
+
+def reads_timeline(reader: CustomUser) -> bool:
+    """
+    Whether the reader's subscribed feed can be served from their
+    timeline: timelines are enabled and none of the targets they follow
+    fell back to fan-out on read.
+    """
+    if not enabled():
+        return False
+    return not AudienceIndex.objects.filter(fanout_on_read=True).filter(
+        Q(kind=JOURNALIST,
+          target_id__in=reader.subscribed_journalists.values("pk"))
+        | Q(kind=PUBLISHER,
+            target_id__in=reader.subscribed_publishers.values("pk"))
+    ).exists()
+
+
+def timeline_articles(reader: CustomUser) -> QuerySet:
+    """
+    Approved articles in the reader's timeline; order by TIMELINE_KEYS.
+    """
+    return Article.objects.annotate(entry=FilteredRelation(
+        "timeline_entries",
+        condition=Q(timeline_entries__reader=reader),
+    )).filter(entry__isnull=False, approved=True)
+
+
+def fanout_on_read_articles(reader: CustomUser) -> QuerySet:
+    """
+    Approved articles of the journalists and publishers the reader
+    follows, read from the article table.
+    """
+    return Article.objects.filter(approved=True).filter(
+        Q(publisher__in=reader.subscribed_publishers.all())
+        | Q(author__in=reader.subscribed_journalists.all()))
+
+
+def subscribed_articles(reader: CustomUser
+                        ) -> tuple[QuerySet, tuple[str, str]]:
+    """
+    Approved articles from the reader's subscriptions, with the columns
+    to order and paginate them by.
+
+    From the timeline when possible (one range scan on
+    timeline_reader_created_idx), otherwise from the article table.
+    """
+    if reads_timeline(reader):
+        return timeline_articles(reader), TIMELINE_KEYS
+    return fanout_on_read_articles(reader), ("created_at", "id")
+
+
+def rebuild(reader_ids: Iterable[int] | None = None) -> int:
+    """
+    Recompute timelines from the subscription tables: all of them (and
+    every fanout_on_read flag) by default, or just the given readers'.
+    Returns the number of rows written.
+    """
+    readers = CustomUser.objects.filter(role=CustomUser.ROLE_READER)
+    entries = TimelineEntry.objects.all()
+    if reader_ids is None:
+        AudienceIndex.objects.filter(fanout_on_read=True).update(
+            fanout_on_read=False)
+    else:
+        readers = readers.filter(id__in=list(reader_ids))
+        entries = entries.filter(reader__in=readers)
+    entries.delete()
+
+    rows = 0
+    for reader in readers.iterator():
+        journalists = reader.subscribed_journalists.values_list(
+            "pk", flat=True)
+        publishers = reader.subscribed_publishers.values_list(
+            "pk", flat=True)
+        rows += backfill(JOURNALIST, journalists, [reader.pk])
+        rows += backfill(PUBLISHER, publishers, [reader.pk])
+    return rows
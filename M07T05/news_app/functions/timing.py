@@ -0,0 +1,76 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+_current = ContextVar("notify_stage_timings", default=None)
+
+
+class StageTimings:
+    """
+    Accumulated wall time and call count per named pipeline stage.
+
+    Safe to update from the worker threads of run_channels/send_fanout,
+    which run in a copy of the caller's context (see submit_in_context).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds = {}
+        self.calls = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def merge(self, other: "StageTimings") -> None:
+        for name, seconds in other.seconds.items():
+            with self._lock:
+                self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+                self.calls[name] = (self.calls.get(name, 0)
+                                    + other.calls[name])
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {name: {"seconds": round(seconds, 6),
+                           "calls": self.calls[name]}
+                    for name, seconds in sorted(self.seconds.items())}
+
+
+@contextmanager
+def collect_stages():
+    """
+    Collect stage() timings recorded inside the block.
+    """
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a block as the named stage. Costs almost nothing when no
+    collect_stages() block is active.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def submit_in_context(pool, func, *args):
+    """
+    pool.submit() that runs func in a copy of the current context, so
+    stage timings recorded in worker threads reach the active collector.
+    """
+    return pool.submit(copy_context().run, func, *args)
@@ -0,0 +1,243 @@
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_ENDPOINT = "https://api.x.com/2/tweets"
+
+
+@dataclass
+class PostResult:
+    """
+    Outcome of XClient.post(); true only if the post was accepted.
+
+    transient is set when the post may succeed later (rate limit, open
+    circuit breaker, server errors); retry_after is then the number of
+    seconds to wait, if known. Anything else not posted was rejected for
+    good (bad token, duplicate, X not configured).
+    """
+    posted: bool
+    transient: bool = False
+    retry_after: float | None = None
+    error: str = ""
+
+    def __bool__(self) -> bool:
+        return self.posted
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `threshold` failures in a row the circuit opens and calls are
+    skipped for `reset_timeout` seconds. The first call after that is let
+    through as a trial: success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 60.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this call through, re-open if it fails.
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def seconds_until_retry(self) -> float:
+        """
+        Seconds until the open circuit lets a trial call through.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout
+                       - time.monotonic())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class XClient:
+    """
+    Client for the X (Twitter) post endpoint.
+
+    - Reuses pooled keep-alive connections through one requests.Session.
+    - Retries connection errors and 5xx responses with jittered
+      exponential backoff.
+    - Honours x-rate-limit-remaining / x-rate-limit-reset: once the quota
+      is exhausted (or a 429 is returned) calls are skipped until reset.
+    - Skips calls entirely while the circuit breaker is open.
+
+    post() never raises; it returns a PostResult telling an accepted post
+    from a permanent rejection and from a transient failure.
+    """
+
+    def __init__(self, token: str, endpoint: str = DEFAULT_ENDPOINT,
+                 timeout: float = 5.0, max_retries: int = 2,
+                 backoff: float = 0.5, pool_size: int = 10,
+                 breaker: CircuitBreaker | None = None):
+        self.token = token
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limited_until = 0.0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        })
+
+    def _track_rate_limit(self, response) -> None:
+        """
+        Block further calls until x-rate-limit-reset when the quota is used
+        up or the request was rejected with 429.
+        """
+        remaining = response.headers.get("x-rate-limit-remaining")
+        reset = response.headers.get("x-rate-limit-reset")
+        exhausted = response.status_code == 429 or remaining == "0"
+        if not exhausted:
+            return
+        try:
+            until = float(reset)
+        except (TypeError, ValueError):
+            until = time.time() + 60
+        self.rate_limited_until = max(self.rate_limited_until, until)
+
+    def worst_case_seconds(self) -> float:
+        """
+        Longest a post() can take: every attempt using up its connect and
+        read timeouts, plus the longest backoff between attempts.
+        """
+        attempts = self.max_retries + 1
+        return (attempts * 2 * self.timeout
+                + self.backoff * (2 ** self.max_retries - 1))
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def post(self, text: str) -> PostResult:
+        wait = self.rate_limited_until - time.time()
+        if wait > 0:
+            return PostResult(False, transient=True, retry_after=wait,
+                              error="rate limited")
+        if not self.breaker.allow():
+            return PostResult(False, transient=True,
+                              retry_after=self.breaker.seconds_until_retry(),
+                              error="circuit breaker open")
+
+        payload = {"text": text[:280]}
+        for attempt in range(self.max_retries + 1):
+            try:
+                r = self.session.post(self.endpoint, json=payload,
+                                      timeout=self.timeout)
+            except requests.RequestException:
+                r = None
+
+            if r is not None:
+                self._track_rate_limit(r)
+                if r.status_code in (200, 201):
+                    self.breaker.record_success()
+                    return PostResult(True)
+                if r.status_code == 429:
+                    return PostResult(
+                        False, transient=True,
+                        retry_after=max(0.0, self.rate_limited_until
+                                        - time.time()),
+                        error="rate limited (429)")
+                if r.status_code < 500:
+                    # Client errors (bad token, duplicate) will not
+                    # succeed on retry and say nothing about X's health.
+                    return PostResult(False,
+                                      error=f"rejected ({r.status_code})")
+
+            if attempt < self.max_retries:
+                self._sleep_before_retry(attempt)
+
+        self.breaker.record_failure()
+        return PostResult(False, transient=True, error="X unavailable")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> XClient | None:
+    """
+    Return the shared XClient, or None if X_BEARER_TOKEN is not set.
+
+    Configuration is read from the environment:
+    - X_BEARER_TOKEN, X_TWEET_ENDPOINT
+    - X_TIMEOUT, X_MAX_RETRIES, X_BACKOFF_SECONDS
+    - X_BREAKER_THRESHOLD, X_BREAKER_RESET_SECONDS
+    """
+    global _client
+    token = os.getenv("X_BEARER_TOKEN", "").strip()
+    if not token:
+        return None
+
+    endpoint = os.getenv("X_TWEET_ENDPOINT", DEFAULT_ENDPOINT).strip()
+    with _client_lock:
+        if (_client is None or _client.token != token
+                or _client.endpoint != endpoint):
+            _client = XClient(
+                token=token,
+                endpoint=endpoint,
+                timeout=float(os.getenv("X_TIMEOUT", "5")),
+                max_retries=int(os.getenv("X_MAX_RETRIES", "2")),
+                backoff=float(os.getenv("X_BACKOFF_SECONDS", "0.5")),
+                breaker=CircuitBreaker(
+                    threshold=int(os.getenv("X_BREAKER_THRESHOLD", "5")),
+                    reset_timeout=float(
+                        os.getenv("X_BREAKER_RESET_SECONDS", "60")),
+                ),
+            )
+        return _client
+
+
+def post_to_x(text: str) -> PostResult:
+    """
+    Post a short status update to X (Twitter).
+
+    Uses:
+    - X_BEARER_TOKEN (env)
+    - X_TWEET_ENDPOINT (env; defaults to v2 endpoint)
+
+    If credentials are missing, nothing is posted and the result is false.
+    Posting goes through the shared pooled client (see XClient), so a slow
+    or failing X API costs at most one bounded attempt sequence, and no
+    time at all while the circuit breaker is open.
+    """
+    client = get_client()
+    if client is None:
+        return PostResult(False, error="X not configured")
+    return client.post(text)
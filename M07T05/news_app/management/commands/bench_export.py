@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from news_app.functions.bench import measure, rolled_back, seed_articles
+from news_app.functions.streaming import stream_rows
+from news_app.models import Article
+from news_app.serializers import ArticleSerializer
+
+
+class Command(BaseCommand):
+    """
+    Compare peak memory of a full archive export, serialized in one go
+    versus streamed with ?stream=json.
+
+    For each size, a synthetic archive is seeded inside a transaction
+    that is rolled back afterwards, and the time and peak Python memory of
+    both approaches are reported as one JSON object per line.
+    """
+    help = "Benchmark streaming vs in-memory article exports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+",
+                            default=[10_000, 100_000],
+                            help="Archive sizes to benchmark.")
+
+    def handle(self, *args, **options):
+        serialize = ArticleSerializer(many=True).to_representation
+        for size in options["sizes"]:
+            stats = {"articles": size}
+            with rolled_back():
+                with measure(stats, "seed", memory=False):
+                    seed_articles(size)
+                qs = Article.objects.filter(approved=True).select_related(
+                    "author", "publisher").order_by("-created_at", "-id")
+
+                with measure(stats, "streamed"):
+                    written = sum(len(part) for part in stream_rows(
+                        qs, serialize))
+                stats["streamed"]["bytes"] = written
+
+                with measure(stats, "in_memory"):
+                    serialize(qs)
+
+            self.stdout.write(json.dumps(stats))
@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from news_app.functions.bench import measure, rolled_back, seed_articles
+from news_app.functions.pagination import NEXT, encode_cursor, paginate
+from news_app.models import Article
+
+
+class Command(BaseCommand):
+    """
+    Compare keyset and OFFSET pagination of the approved article archive.
+
+    A synthetic archive is seeded inside a transaction that is rolled back
+    afterwards. For pages at increasing depth, the command reports the
+    time and query count of fetching the page by cursor and by OFFSET, as
+    one JSON object per line.
+    """
+    help = "Benchmark keyset vs OFFSET pagination of /api/articles/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=1_000_000,
+                            help="Approved articles to seed.")
+        parser.add_argument("--limit", type=int, default=50,
+                            help="Page size.")
+        parser.add_argument("--depths", type=float, nargs="+",
+                            default=[0, 0.5, 0.99],
+                            help="Page positions as a fraction of the "
+                                 "archive.")
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        with rolled_back():
+            stats = {"articles": options["articles"]}
+            with measure(stats, "seed", memory=False):
+                seed_articles(options["articles"])
+            self.stdout.write(json.dumps(stats))
+
+            qs = Article.objects.filter(approved=True).select_related(
+                "author", "publisher")
+            ordered = qs.order_by("-created_at", "-id")
+            for depth in options["depths"]:
+                offset = int(options["articles"] * depth)
+                cursor = None
+                if offset:
+                    created_at, pk = ordered.values_list(
+                        "created_at", "id")[offset - 1]
+                    cursor = encode_cursor(created_at, pk, NEXT)
+
+                stats = {"position": offset, "limit": limit}
+                with measure(stats, "keyset", memory=False, queries=True):
+                    keyset = paginate(qs, cursor=cursor, limit=limit).items
+                with measure(stats, "offset", memory=False, queries=True):
+                    paged = list(ordered[offset:offset + limit])
+                stats["same_rows"] = ([a.id for a in keyset]
+                                      == [a.id for a in paged])
+                self.stdout.write(json.dumps(stats))
@@ -0,0 +1,122 @@
+import json
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from news_app.functions import search
+from news_app.functions.bench import measure, rolled_back, seed_articles
+from news_app.functions.pagination import paginate
+from news_app.models import Article, CustomUser, Publisher
+from news_app.serializers import ArticleListSerializer
+
+PREFIX = "bench-search"
+
+# Query classes by vocabulary rank: common words match a large share of
+# the corpus, rare ones a handful of articles.
+QUERY_CLASSES = {
+    "common": (0, 20),
+    "mid": (200, 2_000),
+    "rare": (10_000, 20_000),
+}
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    """
+    Measure full-text search latency on a synthetic corpus.
+
+    Articles draw their words from a vocabulary with Zipf-like
+    frequencies, so queries range from words in most articles to words
+    in a few. Each query fetches the first page of /api/articles/search/
+    (search, ranking, serialization); the command reports p50/p95/p99
+    latency per query class as one JSON object per line.
+
+    The corpus is seeded inside a transaction that is rolled back
+    afterwards, except on MySQL: InnoDB FULLTEXT indexes only cover
+    committed rows, so there it is committed and deleted at the end.
+    """
+    help = "Benchmark full-text article search latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=1_000_000,
+                            help="Articles to seed.")
+        parser.add_argument("--words", type=int, default=60,
+                            help="Words per article body.")
+        parser.add_argument("--vocabulary", type=int, default=20_000,
+                            help="Distinct words in the corpus.")
+        parser.add_argument("--queries", type=int, default=100,
+                            help="Queries per class.")
+
+    def _text(self, vocabulary: int, words: int):
+        rng = random.Random(0)
+        weights = [1 / (rank + 1) for rank in range(vocabulary)]
+        cumulative, total = [], 0.0
+        for weight in weights:
+            total += weight
+            cumulative.append(total)
+        vocab = [f"term{rank}" for rank in range(vocabulary)]
+
+        def text(i):
+            body = rng.choices(vocab, cum_weights=cumulative, k=words)
+            return " ".join(body[:6]).capitalize(), " ".join(body)
+        return text
+
+    @contextmanager
+    def _corpus(self, options, stats):
+        text = self._text(options["vocabulary"], options["words"])
+        if connection.vendor != "mysql":
+            with rolled_back():
+                with measure(stats, "seed", memory=False):
+                    seed_articles(options["articles"], PREFIX, text)
+                    search.rebuild()
+                yield
+            return
+        with measure(stats, "seed", memory=False):
+            journalist = seed_articles(options["articles"], PREFIX, text)
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {Article._meta.db_table} "
+                    f"WHERE author_id = %s", [journalist.pk])
+            CustomUser.objects.filter(pk=journalist.pk).delete()
+            Publisher.objects.filter(name=f"{PREFIX}-press").delete()
+
+    def handle(self, *args, **options):
+        rng = random.Random(1)
+        fast = ArticleListSerializer(fields=("id", "title", "excerpt"))
+        stats = {"articles": options["articles"],
+                 "backend": type(search.backend()).__name__}
+        with self._corpus(options, stats):
+            self.stdout.write(json.dumps(stats))
+            for name, (low, high) in QUERY_CLASSES.items():
+                high = min(high, options["vocabulary"])
+                samples = []
+                for _ in range(options["queries"]):
+                    query = f"term{rng.randrange(low, high)}"
+                    if rng.random() < 0.3:
+                        query += f" term{rng.randrange(low, high)}"
+                    started = time.perf_counter()
+                    qs = search.search_articles(
+                        Article.objects.filter(approved=True), query)
+                    page = paginate(fast.prepare(qs, extra=("rank",)),
+                                    limit=settings.API_PAGE_SIZE,
+                                    keys=search.SEARCH_KEYS, parse=float)
+                    fast.to_representation(page.items)
+                    samples.append(time.perf_counter() - started)
+                self.stdout.write(json.dumps({
+                    "queries": name,
+                    **{key: round(_percentile(samples, q), 4)
+                       for key, q in (("p50", 0.5), ("p95", 0.95),
+                                      ("p99", 0.99))},
+                    "max": round(max(samples), 4),
+                }))
@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.test import RequestFactory
+
+from news_app.functions.bench import measure, rolled_back, seed_articles
+from news_app.models import Article
+from news_app.serializers import ArticleListSerializer, ArticleSerializer
+
+
+class Command(BaseCommand):
+    """
+    Compare ArticleSerializer with the flat ArticleListSerializer on
+    listing pages of growing size.
+
+    Each size is seeded inside a transaction that is rolled back
+    afterwards. Both timings include the query, and the command checks
+    that both produce identical JSON. One JSON object per line.
+    """
+    help = "Benchmark the fast article listing serializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+",
+                            default=[100, 1_000, 10_000],
+                            help="Rows per listing.")
+        parser.add_argument("--repeat", type=int, default=3,
+                            help="Runs per size; the best is reported.")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/api/articles/",
+                                       HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        context = {"request": request}
+        for size in options["sizes"]:
+            stats = {"rows": size}
+            with rolled_back():
+                seed_articles(size)
+                # Half the rows carry an image, so URLs are built too.
+                Article.objects.alias(parity=F("id") % 2).filter(
+                    parity=0).update(image="article_images/bench.jpg")
+                qs = Article.objects.filter(approved=True).order_by(
+                    "-created_at", "-id")
+
+                runs = {"model_serializer": [], "list_serializer": []}
+                for _ in range(options["repeat"]):
+                    timing = {}
+                    with measure(timing, "model_serializer", memory=False):
+                        slow = ArticleSerializer(
+                            qs.select_related("author", "publisher"),
+                            many=True, context=context).data
+                    with measure(timing, "list_serializer", memory=False):
+                        fast = ArticleListSerializer(context=context)
+                        quick = fast.to_representation(fast.prepare(qs))
+                    for key in runs:
+                        runs[key].append(timing[key]["seconds"])
+
+            for key, seconds in runs.items():
+                stats[key] = min(seconds)
+            stats["speedup"] = round(
+                stats["model_serializer"] / stats["list_serializer"], 1)
+            stats["identical"] = json.dumps(slow) == json.dumps(quick)
+            self.stdout.write(json.dumps(stats))
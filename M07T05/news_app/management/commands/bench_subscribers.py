@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from news_app.functions.bench import measure, rolled_back, seed_audience
+from news_app.functions.notify import _subscriber_emails
+
+
+class Command(BaseCommand):
+    """
+    Benchmark subscriber resolution for growing audience sizes.
+
+    For each size, a synthetic audience is seeded inside a transaction
+    that is rolled back afterwards. The command then reports the time and
+    peak Python memory needed to stream every subscriber email, as one
+    JSON object per line.
+    """
+    help = "Benchmark streaming subscriber resolution."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+",
+                            default=[10_000, 100_000, 1_000_000],
+                            help="Audience sizes to benchmark.")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Rows fetched per round trip.")
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            stats = {"subscribers": size}
+            with rolled_back():
+                with measure(stats, "seed", memory=False):
+                    article = seed_audience(size)
+
+                resolved = 0
+                with measure(stats, "resolve"):
+                    for _ in _subscriber_emails(
+                            article, chunk_size=options["chunk_size"]):
+                        resolved += 1
+                stats["resolved"] = resolved
+
+            self.stdout.write(json.dumps(stats))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news_app.functions import query_plans
+from news_app.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    EXPLAIN the hot article queries against the configured database.
+
+    Prints each plan (with -v 2) and fails if any query does a full
+    table scan or sorts without an index (see functions.query_plans).
+    Run it against production-sized data after schema changes.
+    """
+    help = "Check the query plans of the hot article queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reader", type=int,
+                            help="Reader whose subscribed feed is checked "
+                                 "(default: the first reader).")
+        parser.add_argument("--analyze", action="store_true",
+                            help="Refresh table statistics first.")
+
+    def handle(self, *args, **options):
+        readers = CustomUser.objects.filter(role=CustomUser.ROLE_READER)
+        if options["reader"]:
+            readers = readers.filter(pk=options["reader"])
+        reader = readers.order_by("pk").first()
+        if reader is None:
+            raise CommandError("No reader to check the subscribed feed for.")
+        if options["analyze"]:
+            query_plans.analyze()
+
+        failed = []
+        for hot in query_plans.hot_queries(reader):
+            problems = query_plans.plan_problems(hot)
+            self.stdout.write(f"{hot.name}: "
+                              f"{'; '.join(problems) if problems else 'ok'}")
+            if options["verbosity"] >= 2:
+                self.stdout.write(hot.qs.explain())
+            if problems:
+                failed.append(hot.name)
+        if failed:
+            raise CommandError(f"Bad plans: {', '.join(failed)}")
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from news_app.functions import feed_cache
+
+
+class Command(BaseCommand):
+    """
+    Print the approved-feed cache hit/miss counters as JSON.
+    """
+    help = "Show (and optionally reset) feed cache hit/miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true",
+                            help="Zero the counters after printing.")
+        parser.add_argument("--clear", action="store_true",
+                            help="Also drop every cached feed page.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(feed_cache.stats()))
+        if options["reset"]:
+            feed_cache.reset_stats()
+        if options["clear"]:
+            feed_cache.invalidate()
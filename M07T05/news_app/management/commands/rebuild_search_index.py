@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from news_app.functions import search
+
+
+class Command(BaseCommand):
+    """
+    Reindex every article for full-text search.
+
+    Signals keep the SQLite FTS5 table current; run this after bulk
+    imports or raw SQL changes. MySQL maintains its FULLTEXT index
+    itself, so there is nothing to rebuild there.
+    """
+    help = "Rebuild the full-text article search index."
+
+    def handle(self, *args, **options):
+        rows = search.rebuild()
+        self.stdout.write(f"Indexed {rows} articles.")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from news_app.functions import timeline
+
+
+class Command(BaseCommand):
+    """
+    Recompute reader timelines from the subscription tables.
+
+    Run it after turning TIMELINE_ENABLED on (subscription changes are
+    not tracked while it is off), or to move targets flagged
+    fanout_on_read back to fan-out on write once TIMELINE_MAX_AUDIENCE
+    has been raised.
+    """
+    help = "Rebuild the materialized subscribed-feed timelines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reader", type=int, action="append",
+                            dest="readers",
+                            help="Only rebuild this reader (repeatable).")
+
+    def handle(self, *args, **options):
+        rows = timeline.rebuild(options["readers"])
+        self.stdout.write(f"Wrote {rows} timeline rows.")
@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from news_app.functions import counters
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the publisher and journalist counters (approved and pending
+    articles, subscribers) from the article and subscription tables.
+
+    Signals keep the counters current; run this to repair drift, e.g.
+    after bulk imports or raw SQL changes.
+    """
+    help = "Recompute denormalized publisher/journalist counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Rows updated per statement.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(
+            counters.recount(chunk_size=options["chunk_size"])))
@@ -0,0 +1,41 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_app.functions.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    """
+    Drain the notification outbox.
+
+    Runs forever by default, polling for due rows every --interval seconds.
+    Use --once to drain what is currently due and exit (e.g. from cron).
+    With -v 2 the time spent per pipeline stage is printed as JSON.
+    """
+    help = "Send queued subscriber notifications (email and X)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Drain due rows once and exit.")
+        parser.add_argument("--batch-size", type=int, default=100,
+                            help="Rows claimed per batch.")
+        parser.add_argument("--interval", type=float, default=5.0,
+                            help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument("--max-attempts", type=int, default=None,
+                            help="Failures before a row is marked failed.")
+
+    def handle(self, *args, **options):
+        while True:
+            stats = drain_outbox(batch_size=options["batch_size"],
+                                 max_attempts=options["max_attempts"])
+            if stats["sent"] or stats["retried"] or stats["failed"]:
+                self.stdout.write(
+                    f"sent={stats['sent']} retried={stats['retried']} "
+                    f"failed={stats['failed']}")
+                if options["verbosity"] >= 2:
+                    self.stdout.write(json.dumps(stats["stages"]))
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
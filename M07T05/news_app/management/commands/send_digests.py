@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from news_app.functions.digest import PERIODS, send_digests
+
+
+class Command(BaseCommand):
+    """
+    Send hourly or daily digest emails to readers who opted into them.
+
+    Schedule it from cron, e.g. `send_digests --mode hourly` every hour
+    and `send_digests --mode daily` once a day.
+    """
+    help = "Send digest emails of newly approved articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=sorted(PERIODS),
+                            required=True,
+                            help="Which digest readers to serve.")
+
+    def handle(self, *args, **options):
+        stats = send_digests(options["mode"])
+        self.stdout.write(
+            f"readers={stats['readers']} digests={stats['digests']} "
+            f"sent={stats['sent']} failed={stats['failed']}")
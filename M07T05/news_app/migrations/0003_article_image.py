@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-01-30 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0002_seed_publishers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='article_images/'),
+        ),
+    ]
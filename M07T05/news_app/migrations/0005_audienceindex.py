@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:06
+
+from array import array
+import sys
+
+from django.db import migrations, models
+
+
+def build_audience_index(apps, schema_editor):
+    """
+    Populate the audience index from the existing subscription tables.
+
+    Ids are packed the same way as news_app.functions.audience.pack().
+    """
+    CustomUser = apps.get_model("news_app", "CustomUser")
+    AudienceIndex = apps.get_model("news_app", "AudienceIndex")
+
+    sources = [
+        ("journalist", CustomUser.subscribed_journalists.through,
+         "to_customuser_id", "from_customuser_id"),
+        ("publisher", CustomUser.subscribed_publishers.through,
+         "publisher_id", "customuser_id"),
+    ]
+    for kind, through, target_col, reader_col in sources:
+        audiences = {}
+        rows = through.objects.order_by(target_col, reader_col).values_list(
+            target_col, reader_col)
+        for target_id, reader_id in rows.iterator():
+            audiences.setdefault(target_id, array("q")).append(reader_id)
+
+        entries = []
+        for target_id, ids in audiences.items():
+            if sys.byteorder != "little":
+                ids.byteswap()
+            entries.append(AudienceIndex(kind=kind, target_id=target_id,
+                                         members=ids.tobytes(),
+                                         size=len(ids)))
+        AudienceIndex.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0004_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudienceIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('journalist', 'Journalist'), ('publisher', 'Publisher')], max_length=16)),
+                ('target_id', models.BigIntegerField()),
+                ('members', models.BinaryField(default=bytes)),
+                ('size', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='audienceindex',
+            constraint=models.UniqueConstraint(fields=('kind', 'target_id'), name='audience_index_target_uniq'),
+        ),
+        migrations.RunPython(build_audience_index,
+                             reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0005_audienceindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='article_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='article',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_entries', to='news_app.article'),
+        ),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='kind',
+            field=models.CharField(choices=[('article_approved', 'Article approved'), ('articles_approved', 'Articles approved in bulk')], default='article_approved', max_length=32),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:11
+
+from django.db import migrations, models
+
+
+def backfill_approved_at(apps, schema_editor):
+    """
+    Approval time was not recorded before; use created_at for articles
+    that are already approved so digests never pick them up as new.
+    """
+    Article = apps.get_model("news_app", "Article")
+    Article.objects.filter(approved=True, approved_at__isnull=True).update(
+        approved_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0006_bulk_approval_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='delivery_mode',
+            field=models.CharField(choices=[('instant', 'Instant email per article'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='instant', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='last_digest_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_approved_at,
+                             reverse_code=migrations.RunPython.noop),
+    ]
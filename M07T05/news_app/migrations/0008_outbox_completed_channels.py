@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0007_delivery_mode_and_approved_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='completed_channels',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
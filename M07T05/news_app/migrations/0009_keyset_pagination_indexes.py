@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0008_outbox_completed_channels'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['approved', 'created_at', 'id'], name='article_approved_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['created_at', 'id'], name='newsletter_created_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:47
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _counted(qs, **filters):
+    return Coalesce(Subquery(
+        qs.filter(**filters).order_by().annotate(
+            n=Count("*")).values("n")[:1],
+        output_field=IntegerField()), 0)
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Populate the counters from the article and subscription tables, the
+    same way news_app.functions.counters.recount() does.
+    """
+    Article = apps.get_model("news_app", "Article")
+    CustomUser = apps.get_model("news_app", "CustomUser")
+    Publisher = apps.get_model("news_app", "Publisher")
+
+    targets = [
+        (Publisher.objects.all(), "publisher_id",
+         CustomUser.subscribed_publishers.through, "publisher_id"),
+        (CustomUser.objects.filter(role="journalist"), "author_id",
+         CustomUser.subscribed_journalists.through, "to_customuser_id"),
+    ]
+    for qs, article_col, through, target_col in targets:
+        per_article = Article.objects.values(article_col)
+        qs.update(
+            approved_article_count=_counted(
+                per_article, approved=True, **{article_col: OuterRef("pk")}),
+            pending_article_count=_counted(
+                per_article, approved=False, **{article_col: OuterRef("pk")}),
+            subscriber_count=_counted(
+                through.objects.values(target_col),
+                **{target_col: OuterRef("pk")}),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0012_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='approved_article_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='pending_article_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='subscriber_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='publisher',
+            name='approved_article_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='publisher',
+            name='pending_article_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='publisher',
+            name='subscriber_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters,
+                             reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-15 11:51
+
+from django.db import migrations, models
+
+EXCERPT_LENGTH = 240
+
+
+def fill_excerpts(apps, schema_editor):
+    """
+    Compute excerpt and word_count for existing articles, the same way
+    Article.refresh_excerpt() does.
+    """
+    Article = apps.get_model("news_app", "Article")
+
+    batch = []
+    for article in Article.objects.only("id", "content").iterator(
+            chunk_size=500):
+        cleaned = (article.content or "").strip()
+        if len(cleaned) > EXCERPT_LENGTH:
+            cleaned = cleaned[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "..."
+        article.excerpt = cleaned
+        article.word_count = len((article.content or "").split())
+        batch.append(article)
+        if len(batch) == 500:
+            Article.objects.bulk_update(batch, ["excerpt", "word_count"])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ["excerpt", "word_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0013_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=243),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-15 12:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import news_app.models
+
+FTS_TABLE = "news_app_article_fts"
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the full-text index news_app.functions.search reads: a
+    FULLTEXT index on MySQL, an FTS5 table filled from the existing
+    articles on SQLite. Other databases get none.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE news_app_article "
+            "ADD FULLTEXT INDEX article_fulltext_idx (title, content)")
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, content, tokenize='porter unicode61')")
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, content) "
+            f"SELECT id, title, content FROM news_app_article")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE news_app_article DROP INDEX article_fulltext_idx")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0014_article_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.CreateModel(
+            name='ArticleSearchEntry',
+            fields=[
+                ('article', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='news_app.article')),
+                ('title', models.TextField()),
+                ('content', models.TextField()),
+                ('document', news_app.models.SearchDocumentField(db_column='news_app_article_fts')),
+            ],
+            options={
+                'db_table': 'news_app_article_fts',
+                'managed': False,
+            },
+        ),
+    ]
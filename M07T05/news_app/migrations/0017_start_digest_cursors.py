@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def start_digest_cursors(apps, schema_editor):
+    """
+    Give digest readers who never had a digest a cursor one period back,
+    the window send_digests used to derive for them on every run.
+    """
+    CustomUser = apps.get_model("news_app", "CustomUser")
+    now = timezone.now()
+    for mode, period in (("hourly", timedelta(hours=1)),
+                         ("daily", timedelta(days=1))):
+        CustomUser.objects.filter(
+            delivery_mode=mode, last_digest_at__isnull=True).update(
+            last_digest_at=now - period)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_app', '0016_customuser_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(start_digest_cursors,
+                             migrations.RunPython.noop),
+    ]
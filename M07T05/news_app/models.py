@@ -0,0 +1,570 @@
+from django.db import models, router, transaction
+from django.utils import timezone
+from django.contrib.auth.models import AbstractUser
+
+from .functions.text import (EXCERPT_LENGTH, build_excerpt, count_words,
+                             reading_minutes)
+
+# Denormalized counters of publishers and journalists. They are written
+# only with F() updates (see functions.counters), never by save().
+COUNTER_FIELDS = ("approved_article_count", "pending_article_count",
+                  "subscriber_count")
+# Article fields those counters depend on.
+COUNTED_ARTICLE_FIELDS = ("author", "publisher", "approved")
+
+
+class CounterFieldsMixin:
+    """
+    Keeps a plain save() of an existing row from writing its (possibly
+    stale) counter values back over concurrent F() updates.
+    """
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not kwargs.get("force_insert")
+                and kwargs.get("update_fields") is None):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in COUNTER_FIELDS
+                and f.attname not in deferred]
+        super().save(*args, **kwargs)
+
+
+class CustomUser(CounterFieldsMixin, AbstractUser):
+    """
+    Custom user with role-based behavior and subscription fields.
+
+    Roles (required):
+    - Reader: can view articles/newsletters and subscribe to
+              publishers/journalists.
+    - Editor: can review/approve and manage content.
+    - Journalist: can create and manage articles/newsletters.
+
+    Reader subscriptions:
+    - subscribed_publishers: Many to many of Publisher subscriptions.
+    - subscribed_journalists: Many to many to journalists (users).
+    - delivery_mode: instant emails, or an hourly/daily digest sent by
+      the send_digests management command.
+    - last_digest_at: the digest cursor; the next digest covers articles
+      approved after it. save() starts it when a reader switches to a
+      digest mode, unless the caller sets it.
+
+    Journalists carry counters of their approved and pending articles and
+    of their subscribers (COUNTER_FIELDS).
+    """
+    ROLE_READER = "reader"
+    ROLE_EDITOR = "editor"
+    ROLE_JOURNALIST = "journalist"
+
+    ROLE_CHOICES = (
+        (ROLE_READER, "Reader"),
+        (ROLE_EDITOR, "Editor"),
+        (ROLE_JOURNALIST, "Journalist"),
+    )
+
+    DELIVERY_INSTANT = "instant"
+    DELIVERY_HOURLY = "hourly"
+    DELIVERY_DAILY = "daily"
+
+    DELIVERY_CHOICES = (
+        (DELIVERY_INSTANT, "Instant email per article"),
+        (DELIVERY_HOURLY, "Hourly digest"),
+        (DELIVERY_DAILY, "Daily digest"),
+    )
+
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES,
+                            default=ROLE_READER)
+
+    delivery_mode = models.CharField(max_length=10, choices=DELIVERY_CHOICES,
+                                     default=DELIVERY_INSTANT)
+    last_digest_at = models.DateTimeField(null=True, blank=True)
+
+    approved_article_count = models.IntegerField(default=0)
+    pending_article_count = models.IntegerField(default=0)
+    subscriber_count = models.IntegerField(default=0)
+
+    # Bumped on every save: API responses embed usernames and roles, and
+    # their validators follow this.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    subscribed_publishers = models.ManyToManyField(
+        "Publisher",
+        blank=True,
+        related_name="subscribers",
+    )
+
+    subscribed_journalists = models.ManyToManyField(
+        "self",
+        blank=True,
+        symmetrical=False,
+        related_name="subscribed_by_readers",
+    )
+
+    DIGEST_MODES = (DELIVERY_HOURLY, DELIVERY_DAILY)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember role, delivery_mode and last_digest_at as loaded, so
+        signals can tell a journalist was demoted and save() when a
+        reader switches to a digest.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_loaded()
+
+    def _remember_loaded(self) -> None:
+        for name in ("role", "delivery_mode", "last_digest_at"):
+            setattr(self, f"_loaded_{name}", self.__dict__.get(name))
+
+    def save(self, *args, **kwargs):
+        """
+        Start the digest cursor at now when the reader moves from instant
+        emails (or is created) into a digest mode: everything approved
+        before was already emailed, or predates the reader. Switching
+        between hourly and daily keeps the cursor.
+        """
+        mode = self.__dict__.get("delivery_mode")
+        switched = self._state.adding or getattr(
+            self, "_loaded_delivery_mode", None) not in self.DIGEST_MODES
+        cursor_set = self.__dict__.get("last_digest_at") != getattr(
+            self, "_loaded_last_digest_at", None)
+        if mode in self.DIGEST_MODES and switched and not cursor_set:
+            self.last_digest_at = timezone.now()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "last_digest_at"}
+        super().save(*args, **kwargs)
+        self._remember_loaded()
+
+    def __str__(self):
+        return f"{self.username} ({self.role})"
+
+
+class Publisher(CounterFieldsMixin, models.Model):
+    """
+    Publisher model.
+
+    A publisher can have multiple editors and journalists. It carries
+    counters of its approved and pending articles and of its subscribers
+    (COUNTER_FIELDS).
+    """
+    name = models.CharField(max_length=150, unique=True)
+    description = models.TextField(blank=True)
+
+    editors = models.ManyToManyField(
+        CustomUser,
+        blank=True,
+        related_name="publisher_editor_roles",
+        limit_choices_to={"role": CustomUser.ROLE_EDITOR},
+    )
+
+    journalists = models.ManyToManyField(
+        CustomUser,
+        blank=True,
+        related_name="publisher_journalist_roles",
+        limit_choices_to={"role": CustomUser.ROLE_JOURNALIST},
+    )
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    approved_article_count = models.IntegerField(default=0)
+    pending_article_count = models.IntegerField(default=0)
+    subscriber_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
+class Article(models.Model):
+    """
+    Article model representing a news article submission.
+
+    Required fields:
+    - title, content, author, created_at, approved, publisher.
+
+    Association rule:
+    - Every article is authored by a journalist.
+    - publisher is optional:
+      * publisher is null => independent article
+      * publisher set => publisher content
+
+    excerpt and word_count are derived from content when it changes (see
+    save()), so listings can defer content.
+    """
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    # build_excerpt() output: EXCERPT_LENGTH characters plus "...".
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH + 3, blank=True,
+                               editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="articles",
+        limit_choices_to={"role": CustomUser.ROLE_JOURNALIST},
+    )
+
+    publisher = models.ForeignKey(
+        Publisher,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="articles",
+    )
+
+    image = models.ImageField(upload_to="article_images/",
+                              blank=True, null=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    approved = models.BooleanField(default=False)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    # Bumped on every save; queryset .update() calls must set it too.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the approved archive (newest first),
+            # the reader article list and the editor queue.
+            models.Index(fields=["approved", "created_at", "id"],
+                         name="article_approved_created_idx"),
+            # Unfiltered newest-first listing (editors/journalists).
+            models.Index(fields=["created_at", "id"],
+                         name="article_created_idx"),
+            # Approved articles of given journalists/publishers, newest
+            # first: the subscribed feed without timelines and timeline
+            # backfills.
+            models.Index(fields=["author", "approved", "created_at"],
+                         name="article_author_approved_idx"),
+            models.Index(fields=["publisher", "approved", "created_at"],
+                         name="article_publisher_approved_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the approved value as loaded, so signals can detect the
+        False -> True transition without re-reading the row, what the
+        counters count the article as, and the title and content as
+        loaded.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_approved = instance.__dict__.get("approved")
+        instance._loaded_counted = instance.counted_state()
+        instance._remember_text()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        if "approved" in self.__dict__:
+            self._loaded_approved = self.approved
+        self._loaded_counted = self.counted_state()
+        self._remember_text()
+
+    def _remember_text(self, fields=("title", "content")) -> None:
+        for name in fields:
+            setattr(self, f"_loaded_{name}", self.__dict__.get(name))
+
+    def text_changed(self, fields=("title", "content")) -> bool:
+        """
+        Whether any of fields differs from the value it was loaded with
+        (always true for an unsaved article). Deferred fields that were
+        never assigned count as unchanged.
+        """
+        for name in fields:
+            value = self.__dict__.get(name)
+            if value is None:
+                continue
+            if (self._state.adding
+                    or value != getattr(self, f"_loaded_{name}", None)):
+                return True
+        return False
+
+    def refresh_excerpt(self) -> None:
+        """
+        Recompute excerpt and word_count from content.
+        """
+        self.excerpt = build_excerpt(self.content, limit=EXCERPT_LENGTH)
+        self.word_count = count_words(self.content)
+
+    def save(self, *args, **kwargs):
+        """
+        Refresh excerpt and word_count when content changed since the
+        article was loaded; other saves leave them alone.
+
+        The save and its signal receivers run in one transaction: the
+        approval compare-and-set (pre_save), the row UPDATE and the outbox
+        INSERT (post_save) are committed together or not at all, also for
+        a plain save() outside transaction.atomic.
+
+        A save that writes author, publisher or approved first reads what
+        the row holds for them, locked until the transaction ends, into
+        _loaded_counted: the instance may be stale, and post_save moves
+        the counters from that state to the saved one.
+        """
+        update_fields = kwargs.get("update_fields")
+        if ((update_fields is None or "content" in update_fields)
+                and self.text_changed(("content",))):
+            self.refresh_excerpt()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt",
+                                           "word_count"}
+        using = kwargs.get("using") or router.db_for_write(type(self),
+                                                           instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            if not self._state.adding and (update_fields is None or any(
+                    name in update_fields
+                    for name in (*COUNTED_ARTICLE_FIELDS, "author_id",
+                                 "publisher_id"))):
+                self._loaded_counted = (
+                    type(self)._base_manager.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk).values_list(
+                        "author_id", "publisher_id", "approved").first())
+            super().save(*args, **kwargs)
+        self._remember_text(
+            [name for name in ("title", "content")
+             if update_fields is None or name in update_fields])
+
+    def counted_state(self):
+        """
+        (author_id, publisher_id, approved): what the publisher and
+        journalist counters count this article as. None if one of them
+        is deferred.
+        """
+        values = self.__dict__
+        if not all(name in values
+                   for name in ("author_id", "publisher_id", "approved")):
+            return None
+        return values["author_id"], values["publisher_id"], values["approved"]
+
+    @property
+    def is_independent(self) -> bool:
+        return self.publisher_id is None
+
+    @property
+    def reading_minutes(self) -> int:
+        return reading_minutes(self.word_count)
+
+    def __str__(self):
+        scope = self.publisher.name if self.publisher else "Independent"
+        return f"{self.title} ({scope})"
+
+
+class SearchDocumentField(models.TextField):
+    """
+    The hidden column of an SQLite FTS5 table, named like the table
+    itself: the left operand of MATCH and first argument of bm25().
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class ArticleSearchEntry(models.Model):
+    """
+    Copy of an article's title and content in the SQLite FTS5 table
+    behind full-text search, under the article id (the FTS rowid).
+
+    The table is created by migration 0015 on SQLite only and written
+    with raw SQL by functions.search; this unmanaged model just lets
+    article queries join it (article.search_entry).
+    """
+    article = models.OneToOneField(
+        Article,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_entry",
+    )
+    title = models.TextField()
+    content = models.TextField()
+    document = SearchDocumentField(db_column="news_app_article_fts")
+
+    class Meta:
+        managed = False
+        db_table = "news_app_article_fts"
+
+    def __str__(self):
+        return f"Search entry of {self.article_id}"
+
+
+class Newsletter(models.Model):
+    """
+    Newsletter model: curated collection of articles, created by journalists.
+
+    Required fields:
+    - title, description, created_at, author
+    - many-to-many to Article
+    """
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="newsletters",
+        limit_choices_to={"role": CustomUser.ROLE_JOURNALIST},
+    )
+
+    articles = models.ManyToManyField(Article, blank=True,
+                                      related_name="newsletters")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"],
+                         name="newsletter_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.title} by {self.author.username}"
+
+
+class AudienceIndex(models.Model):
+    """
+    Precomputed audience of a journalist or publisher.
+
+    members holds the subscribed reader ids as a sorted array of
+    little-endian int64 values (see functions.audience), so resolving an
+    approval audience reads one row per target instead of joining the
+    subscription tables. Rows are kept current by m2m_changed receivers.
+    """
+    KIND_JOURNALIST = "journalist"
+    KIND_PUBLISHER = "publisher"
+
+    KIND_CHOICES = (
+        (KIND_JOURNALIST, "Journalist"),
+        (KIND_PUBLISHER, "Publisher"),
+    )
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    target_id = models.BigIntegerField()
+    members = models.BinaryField(default=bytes)
+    size = models.PositiveIntegerField(default=0)
+    # Set once the target's audience outgrew TIMELINE_MAX_AUDIENCE: its
+    # articles are no longer copied into timelines, so its subscribers
+    # read the subscribed feed from the article table.
+    fanout_on_read = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "target_id"],
+                                    name="audience_index_target_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.target_id} ({self.size} subscribers)"
+
+
+class TimelineEntry(models.Model):
+    """
+    One approved article in a reader's subscribed feed.
+
+    Rows are written when an article is approved (one per subscriber, in
+    the approving transaction) and when a reader subscribes, and pruned
+    when they unsubscribe, so the subscribed feed is a range scan over
+    (reader, created_at, article) instead of an OR of subqueries across
+    every article. created_at is copied from the article. See
+    functions.timeline.
+    """
+    reader = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["reader", "article"],
+                                    name="timeline_reader_article_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["reader", "created_at", "article"],
+                         name="timeline_reader_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} in timeline of {self.reader_id}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Durable queue of pending subscriber notifications.
+
+    A row is written in the same transaction that approves an article (or
+    a batch of articles), so the approval itself never waits on SMTP or X.
+    The run_outbox management command drains due rows, retrying failures
+    with exponential backoff.
+    """
+    KIND_ARTICLE_APPROVED = "article_approved"
+    KIND_ARTICLES_APPROVED = "articles_approved"
+
+    KIND_CHOICES = (
+        (KIND_ARTICLE_APPROVED, "Article approved"),
+        (KIND_ARTICLES_APPROVED, "Articles approved in bulk"),
+    )
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES,
+                            default=KIND_ARTICLE_APPROVED)
+    # Single approvals reference the article; bulk approvals list the
+    # approved ids in article_ids instead.
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="outbox_entries",
+    )
+    article_ids = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES,
+                              default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Channels (email, x, ...) that already succeeded; retries skip them.
+    completed_channels = models.JSONField(default=list, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"],
+                         name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        target = self.article_id or ", ".join(map(str, self.article_ids))
+        return f"{self.kind} #{target} ({self.status})"
@@ -0,0 +1,213 @@
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from .functions.fieldsets import VIEWS
+from .models import Publisher, Article, Newsletter
+
+User = get_user_model()
+
+
+class SparseFieldsMixin:
+    """
+    Lets a serializer be built with fields=(...) to output only those
+    fields (write-only input fields are always kept). Fields named in
+    Meta.optional_fields are left out unless asked for.
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            fields = set(self.fields) - set(
+                getattr(self.Meta, "optional_fields", ()))
+        for name in list(self.fields):
+            if name not in fields and not self.fields[name].write_only:
+                self.fields.pop(name)
+
+
+class UserPublicSerializer(serializers.ModelSerializer):
+    """
+    Public serializer for user info in API responses.
+    """
+    class Meta:
+        model = User
+        fields = ["id", "username", "role"]
+
+
+class PublisherSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Publisher serializer.
+
+    The article and subscriber counters are only included when asked for
+    with fields=(...), so publishers nested in articles stay small.
+    """
+    class Meta:
+        model = Publisher
+        fields = ["id", "name", "description", "created_at",
+                  "approved_article_count", "pending_article_count",
+                  "subscriber_count"]
+        optional_fields = ["approved_article_count",
+                           "pending_article_count", "subscriber_count"]
+        read_only_fields = optional_fields
+
+
+class ArticleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Article serializer.
+
+    excerpt is only included when asked for with fields=(...).
+    """
+    author = UserPublicSerializer(read_only=True)
+    publisher = PublisherSerializer(read_only=True)
+
+    publisher_id = serializers.PrimaryKeyRelatedField(
+        source="publisher",
+        queryset=Publisher.objects.all(),
+        allow_null=True,
+        required=False,
+        write_only=True,
+    )
+
+    image = serializers.ImageField(required=False, allow_null=True)
+
+    class Meta:
+        model = Article
+        fields = [
+            "id", "title", "content", "excerpt",
+            "author", "publisher", "publisher_id",
+            "image",
+            "created_at", "approved",
+        ]
+        optional_fields = ["excerpt"]
+
+
+class NewsletterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Newsletter serializer.
+
+    Note: articles are nested for readability. A context["article_fields"]
+    tuple restricts the fields of the nested articles.
+    """
+    author = UserPublicSerializer(read_only=True)
+    articles = ArticleSerializer(many=True, read_only=True)
+
+    article_ids = serializers.PrimaryKeyRelatedField(
+        source="articles",
+        queryset=Article.objects.all(),
+        many=True,
+        required=False,
+        write_only=True,
+    )
+
+    class Meta:
+        model = Newsletter
+        fields = ["id", "title", "description", "created_at", "author",
+                  "articles", "article_ids"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        article_fields = self.context.get("article_fields")
+        if article_fields is not None and "articles" in self.fields:
+            self.fields["articles"] = ArticleSerializer(
+                many=True, read_only=True, fields=article_fields)
+
+
+class ArticleListSerializer:
+    """
+    Read-only, flat fast path for article listings.
+
+    Produces exactly what ArticleSerializer(many=True, fields=fields)
+    does, but from .values_list() tuples instead of model instances: no
+    nested serializer per row, no field introspection, and image URLs
+    built from a media prefix computed once per call. Only the columns
+    the fieldset needs are selected. Use prepare(qs) to select them, then
+    to_representation(rows).
+    """
+    # Columns selected per output field; id and created_at are always
+    # selected since keyset pagination reads them.
+    columns = {
+        "id": (),
+        "title": ("title",),
+        "content": ("content",),
+        "excerpt": ("excerpt",),
+        "author": ("author_id", "author__username", "author__role"),
+        "publisher": ("publisher_id", "publisher__name",
+                      "publisher__description", "publisher__created_at"),
+        "image": ("image",),
+        "created_at": (),
+        "approved": ("approved",),
+    }
+
+    def __init__(self, context=None, fields=None):
+        self.context = context or {}
+        self.fields = tuple(fields or VIEWS["full"])
+        self._datetime = serializers.DateTimeField()
+
+    def prepare(self, qs, extra=()):
+        """
+        The queryset as values_list() rows with just the columns
+        to_representation needs. Pagination still reads created_at/id,
+        plus any other sort key given in extra (e.g. a search rank).
+        """
+        selected = ["id", "created_at", *extra]
+        for name in self.fields:
+            selected += [c for c in self.columns[name] if c not in selected]
+        return qs.values_list(*selected, named=True)
+
+    def _datetime_plan(self):
+        if api_settings.DATETIME_FORMAT != ISO_8601:
+            return self._datetime.to_representation
+        tz = self._datetime.default_timezone()
+
+        def represent(value):
+            if value is None:
+                return None
+            if tz is not None:
+                value = value.astimezone(tz)
+            value = value.isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+        return represent
+
+    def _image_plan(self):
+        request = self.context.get("request")
+        storage = Article._meta.get_field("image").storage
+        if not api_settings.UPLOADED_FILES_USE_URL:
+            return lambda name: name or None
+
+        if isinstance(storage, FileSystemStorage):
+            prefix = storage.base_url
+            if request is not None:
+                prefix = request.build_absolute_uri(prefix)
+            return lambda name: (prefix + filepath_to_uri(name)
+                                 if name else None)
+
+        def represent(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+        return represent
+
+    def to_representation(self, rows) -> list[dict]:
+        when = self._datetime_plan()
+        image = self._image_plan()
+        plan = {
+            "id": lambda row: row.id,
+            "title": lambda row: row.title,
+            "content": lambda row: row.content,
+            "excerpt": lambda row: row.excerpt,
+            "author": lambda row: {"id": row.author_id,
+                                   "username": row.author__username,
+                                   "role": row.author__role},
+            "publisher": lambda row: None if row.publisher_id is None else {
+                "id": row.publisher_id,
+                "name": row.publisher__name,
+                "description": row.publisher__description,
+                "created_at": when(row.publisher__created_at),
+            },
+            "image": lambda row: image(row.image),
+            "created_at": lambda row: when(row.created_at),
+            "approved": lambda row: row.approved,
+        }
+        steps = [(name, plan[name]) for name in self.fields]
+        return [{name: step(row) for name, step in steps} for row in rows]
@@ -0,0 +1,292 @@
+from django.db.models.signals import (pre_save, post_save, pre_delete,
+                                      post_delete, m2m_changed)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Article, CustomUser, Newsletter, Publisher
+from .functions import audience, counters, feed_cache, search, timeline
+from .functions.outbox import enqueue_approval
+
+
+@receiver(pre_save, sender=Article)
+def track_previous_approval(sender, instance: Article, **kwargs):
+    """
+    Detect the approval transition False -> True before saving.
+
+    The previous value comes from the state captured in Article.from_db,
+    so ordinary saves cost no extra query. When a save does approve the
+    article, the transition is claimed with a compare-and-set UPDATE
+    (WHERE approved = false); only the save that wins it notifies, so two
+    concurrent approvals cannot both send notifications. A save that
+    loses it keeps the approval time already on the row.
+    """
+    instance._approval_won = False
+
+    if instance._state.adding:
+        instance._approval_won = instance.approved
+        if instance.approved and instance.approved_at is None:
+            instance.approved_at = timezone.now()
+        return
+
+    if not instance.approved:
+        return
+
+    # None means the instance was not loaded from the database (or
+    # approved was deferred); the CAS below is the source of truth then.
+    if not getattr(instance, "_loaded_approved", None):
+        now = timezone.now()
+        instance._approval_won = Article.objects.filter(
+            pk=instance.pk, approved=False).update(
+            approved=True, approved_at=now, updated_at=now) == 1
+        if instance._approval_won:
+            instance.approved_at = now
+        else:
+            # Approved elsewhere since this instance was loaded: keep the
+            # row's approval time, which digests select on, instead of
+            # writing the stale one back.
+            instance.approved_at = Article.objects.filter(
+                pk=instance.pk).values_list("approved_at", flat=True).first()
+
+
+@receiver(post_save, sender=Article)
+def on_article_saved(sender, instance: Article, created: bool, **kwargs):
+    """
+    On article save, if this save approved the article,
+    queue a notification in the outbox.
+
+    The outbox row, and the subscribers' timeline rows (TIMELINE_ENABLED),
+    are written inside the saving transaction (see Article.save).
+    Emailing subscribers and posting to X happen later in the run_outbox
+    worker.
+
+    Saving an article that is (or was) in the approved feed invalidates
+    the cached feed pages.
+
+    The journalist and publisher counters follow the change of the
+    article's counted state (see _count_article_save), and the search
+    index follows changes to the title or content.
+    """
+    if instance._approval_won:
+        enqueue_approval(instance.pk)
+        if timeline.enabled():
+            timeline.fan_out([instance])
+    if instance.approved or getattr(instance, "_loaded_approved", None):
+        feed_cache.invalidate()
+    _count_article_save(instance, created)
+    update_fields = kwargs.get("update_fields")
+    written = [name for name in ("title", "content")
+               if update_fields is None or name in update_fields]
+    if created or instance.text_changed(written):
+        search.articles_saved([instance.pk], using=kwargs["using"])
+    instance._approval_won = False
+    instance._loaded_approved = instance.approved
+    instance._loaded_counted = instance.counted_state()
+
+
+def _count_article_save(instance: Article, created: bool):
+    """
+    Update the counters from the state the row held before this save to
+    the state just saved. Article.save reads that state from the locked
+    row into _loaded_counted before writing, so a stale instance moves
+    the counters from what the row really held, and only the save that
+    won the approval CAS counts the approval. A row that vanished
+    meanwhile has no known previous state, so its journalist and
+    publisher are recounted.
+    """
+    new = instance.counted_state()
+    if created:
+        counters.article_changed(None, new)
+        return
+    old = getattr(instance, "_loaded_counted", None)
+    if old is None or new is None:
+        counters.recount_article_owners(instance.author_id,
+                                        instance.publisher_id)
+        return
+    counters.article_changed(old, new)
+
+
+@receiver(pre_delete, sender=Article)
+def read_counted_state(sender, instance: Article, **kwargs):
+    """
+    Read what the counters count the article as from the row itself;
+    the instance being deleted may be stale.
+    """
+    instance._deleted_counted = Article.objects.filter(
+        pk=instance.pk).values_list(
+        "author_id", "publisher_id", "approved").first()
+
+
+@receiver(post_delete, sender=Article)
+def on_article_deleted(sender, instance: Article, **kwargs):
+    if instance.approved:
+        feed_cache.invalidate()
+    counters.article_changed(
+        getattr(instance, "_deleted_counted", None), None)
+    search.articles_deleted([instance.pk], using=kwargs["using"])
+
+
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+def on_publisher_changed(sender, instance: Publisher, **kwargs):
+    """
+    Publishers are embedded in every feed article; drop cached pages.
+    """
+    feed_cache.invalidate()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def on_author_changed(sender, instance: CustomUser, **kwargs):
+    """
+    Authors are embedded in feed articles too. Readers and editors never
+    appear in the feed, and login bookkeeping does not change it; a
+    journalist who is demoted (the role as loaded, see
+    CustomUser.from_db) still does.
+    """
+    roles = {instance.role, getattr(instance, "_loaded_role", None)}
+    if CustomUser.ROLE_JOURNALIST not in roles:
+        return
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+    feed_cache.invalidate()
+
+
+@receiver(pre_delete, sender=CustomUser)
+def read_user_subscriptions(sender, instance: CustomUser, **kwargs):
+    """
+    Read what the user subscribes to while the subscription rows still
+    exist; the delete cascades them without m2m_changed.
+    """
+    instance._audience_subscribed = audience.subscriptions(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def on_user_deleted(sender, instance: CustomUser, **kwargs):
+    """
+    Take a deleted user out of the audience index, as subscriber and as
+    journalist.
+    """
+    audience.user_deleted(instance.pk,
+                          getattr(instance, "_audience_subscribed", {}))
+
+
+@receiver(post_delete, sender=Publisher)
+def on_publisher_deleted(sender, instance: Publisher, **kwargs):
+    audience.drop(audience.PUBLISHER, instance.pk)
+
+
+def _sync_audience(kind: str, forward_accessor: str, instance, action: str,
+                   reverse: bool, pk_set):
+    """
+    Mirror a subscription m2m change into the audience index.
+
+    Forward changes (reader.subscribed_x.add(...)) touch one row per
+    target; reverse changes (target.subscribers.add(...)) touch the
+    target's row only. For clear() the affected targets are captured in
+    pre_clear, before the subscription rows disappear.
+    """
+    if action == "post_add":
+        if reverse:
+            audience.add_subscribers(kind, [instance.pk], pk_set)
+        else:
+            audience.add_subscribers(kind, pk_set, [instance.pk])
+    elif action == "post_remove":
+        if reverse:
+            audience.remove_subscribers(kind, [instance.pk], pk_set)
+        else:
+            audience.remove_subscribers(kind, pk_set, [instance.pk])
+    elif action == "pre_clear" and not reverse:
+        instance._audience_cleared = list(getattr(
+            instance, forward_accessor).values_list("pk", flat=True))
+    elif action == "post_clear":
+        if reverse:
+            audience.rebuild(kind, instance.pk)
+        else:
+            audience.remove_subscribers(
+                kind, getattr(instance, "_audience_cleared", []),
+                [instance.pk])
+
+
+def _sync_timeline(kind: str, forward_accessor: str, instance, action: str,
+                   reverse: bool, pk_set):
+    """
+    Backfill or prune reader timelines after a subscription change.
+
+    Runs after _sync_audience, whose pre_clear capture it reuses for
+    forward clears; reverse clears capture the affected readers here.
+    """
+    if not timeline.enabled():
+        return
+    if action == "post_add":
+        if reverse:
+            timeline.backfill(kind, [instance.pk], pk_set)
+        else:
+            timeline.backfill(kind, pk_set, [instance.pk])
+    elif action == "post_remove":
+        if reverse:
+            timeline.prune(kind, [instance.pk], pk_set)
+        else:
+            timeline.prune(kind, pk_set, [instance.pk])
+    elif action == "pre_clear" and reverse:
+        instance._timeline_cleared = list(CustomUser.objects.filter(
+            **{forward_accessor: instance}).values_list("pk", flat=True))
+    elif action == "post_clear":
+        if reverse:
+            timeline.prune(kind, [instance.pk],
+                           getattr(instance, "_timeline_cleared", []))
+        else:
+            timeline.prune(kind,
+                           getattr(instance, "_audience_cleared", []),
+                           [instance.pk])
+
+
+@receiver(m2m_changed, sender=CustomUser.subscribed_journalists.through)
+def on_journalist_subscriptions_changed(sender, instance, action, reverse,
+                                        pk_set, **kwargs):
+    """
+    Keep journalist audiences in the audience index, and reader
+    timelines, current.
+    """
+    _sync_audience(audience.JOURNALIST, "subscribed_journalists", instance,
+                   action, reverse, pk_set)
+    _sync_timeline(audience.JOURNALIST, "subscribed_journalists", instance,
+                   action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=CustomUser.subscribed_publishers.through)
+def on_publisher_subscriptions_changed(sender, instance, action, reverse,
+                                       pk_set, **kwargs):
+    """
+    Keep publisher audiences in the audience index, and reader timelines,
+    current.
+    """
+    _sync_audience(audience.PUBLISHER, "subscribed_publishers", instance,
+                   action, reverse, pk_set)
+    _sync_timeline(audience.PUBLISHER, "subscribed_publishers", instance,
+                   action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Newsletter.articles.through)
+def on_newsletter_articles_changed(sender, instance, action, reverse,
+                                   pk_set, **kwargs):
+    """
+    Newsletters embed their articles: bump updated_at of every newsletter
+    whose article set changed, so its conditional GET validators change.
+    For a reverse clear() the newsletters are captured in pre_clear.
+    """
+    if action == "pre_clear" and reverse:
+        instance._newsletters_cleared = list(
+            instance.newsletters.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action != "post_clear" and not pk_set:
+        return
+    if not reverse:
+        newsletter_ids = [instance.pk]
+    elif action == "post_clear":
+        newsletter_ids = getattr(instance, "_newsletters_cleared", [])
+    else:
+        newsletter_ids = pk_set
+    Newsletter.objects.filter(pk__in=newsletter_ids).update(
+        updated_at=timezone.now())
@@ -0,0 +1,1663 @@
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, router, transaction
+from django.http import HttpResponse
+from django.test import (RequestFactory, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+
+from .functions import audience
+from .functions import channels
+from .functions import feed_cache
+from .functions import search
+from .functions.bench import seed_articles
+from .functions.digest import send_digests
+from .functions.fanout import send_fanout
+from .functions.outbox import approve, approve_many
+from .functions.x_post import (CircuitBreaker, PostResult, XClient,
+                               post_to_x)
+from .functions.notify import _subscriber_emails
+from .functions.query_plans import hot_queries, plan_problems
+from .functions.replica import (PIN_COOKIE, PRIMARY, REPLICA,
+                                ReplicaMiddleware, primary_reads,
+                                replica_configured)
+from .functions.text import build_excerpt
+from .models import Publisher, Article, Newsletter, NotificationOutbox
+from .views import ensure_groups_and_permissions
+
+User = get_user_model()
+
+
+class _StubSMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP dialogue: accepts every message and records recipients.
+    """
+    def _reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self._reply("220 stub")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            verb = line[:4].upper()
+            if not line or verb == "QUIT":
+                self._reply("221 bye")
+                return
+            if verb == "EHLO":
+                self._reply("250 stub")
+            elif verb == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                self.server.recipients.append(address)
+                self._reply("250 ok")
+            elif verb == "DATA":
+                self._reply("354 go ahead")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                self.server.messages += 1
+                self._reply("250 queued")
+            else:
+                self._reply("250 ok")
+
+
+class _StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StubSMTPHandler)
+        self.recipients = []
+        self.messages = 0
+
+
+class _StubXHandler(BaseHTTPRequestHandler):
+    """
+    Replays server.responses as (status, headers) and records payloads.
+    """
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.posts.append((self.headers["Authorization"],
+                                  json.loads(body)))
+        status, headers = (self.server.responses.pop(0)
+                           if self.server.responses else (201, {}))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubXServer(HTTPServer):
+    def __init__(self, responses=()):
+        super().__init__(("127.0.0.1", 0), _StubXHandler)
+        self.responses = list(responses)
+        self.posts = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/2/tweets"
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    DEFAULT_FROM_EMAIL="no-reply@test.local",
+    SITE_BASE_URL="http://testserver",
+    OUTBOX_BACKOFF_SECONDS=60,
+    OUTBOX_MAX_ATTEMPTS=2,
+    # TestCase data is uncommitted, so channel worker threads (with their
+    # own DB connections) could not see it; run channels inline.
+    NOTIFY_CHANNEL_WORKERS=0,
+)
+class NewsAppTests(TestCase):
+    """
+    Automated tests for the News Application.
+
+    Covers:
+    - Token-authenticated API access per role.
+    - Reader subscription filtering.
+    - Journalist article/newsletter creation.
+    - Editor approval queues an outbox row; the worker sends email + X.
+    - Publisher and Newsletter API endpoints.
+    """
+
+    def setUp(self):
+        self.reader = User.objects.create_user(
+            username="reader1", password="pass123",
+            email="reader@test.com", role="reader"
+        )
+        self.editor = User.objects.create_user(
+            username="editor1", password="pass123",
+            email="editor@test.com", role="editor"
+        )
+        self.journalist = User.objects.create_user(
+            username="journo1", password="pass123",
+            email="journo@test.com", role="journalist"
+        )
+        self.journalist2 = User.objects.create_user(
+            username="journo2", password="pass123",
+            email="journo2@test.com", role="journalist"
+        )
+
+        self.publisher = Publisher.objects.create(
+            name="Daily Planet", description="Metropolis")
+        self.publisher.journalists.add(self.journalist)
+        self.publisher.editors.add(self.editor)
+
+        self.approved = Article.objects.create(
+            title="Approved A1",
+            content="Hello world " * 50,
+            author=self.journalist,
+            publisher=self.publisher,
+            approved=True,
+        )
+        self.pending = Article.objects.create(
+            title="Pending A2",
+            content="Pending content " * 50,
+            author=self.journalist,
+            publisher=self.publisher,
+            approved=False,
+        )
+
+        self.reader.subscribed_publishers.add(self.publisher)
+        self.reader.subscribed_journalists.add(self.journalist)
+
+        self.newsletter = Newsletter.objects.create(
+            title="Weekly Roundup",
+            description="Best stories this week",
+            author=self.journalist,
+        )
+        self.newsletter.articles.add(self.approved, self.pending)
+
+        self.api = APIClient()
+        cache.clear()
+
+    def _auth(self, user):
+        """
+        Attach token authentication to the API client.
+        """
+        token, _ = Token.objects.get_or_create(user=user)
+        self.api.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return token.key
+
+    def test_api_articles_returns_only_approved(self):
+        self._auth(self.reader)
+        resp = self.api.get("/api/articles/")
+        self.assertEqual(resp.status_code, 200)
+        titles = [a["title"] for a in resp.json()]
+        self.assertIn("Approved A1", titles)
+        self.assertNotIn("Pending A2", titles)
+
+    def test_api_articles_subscribed_reader_only(self):
+        self._auth(self.reader)
+        resp = self.api.get("/api/articles/subscribed/")
+        self.assertEqual(resp.status_code, 200)
+        titles = [a["title"] for a in resp.json()]
+        self.assertIn("Approved A1", titles)
+
+        self._auth(self.journalist)
+        resp2 = self.api.get("/api/articles/subscribed/")
+        self.assertEqual(resp2.status_code, 403)
+
+    def test_journalist_can_create_article(self):
+        self._auth(self.journalist)
+        resp = self.api.post(
+            "/api/articles/",
+            {"title": "New Draft", "content": "Draft...",
+             "publisher_id": self.publisher.id},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertFalse(resp.data["approved"])
+
+    def test_reader_cannot_create_article(self):
+        self._auth(self.reader)
+        resp = self.api.post("/api/articles/", {
+            "title": "Nope", "content": "Nope"}, format="json")
+        self.assertEqual(resp.status_code, 403)
+
+    def test_publishers_endpoints(self):
+        self._auth(self.reader)
+        list_resp = self.api.get("/api/publishers/")
+        self.assertEqual(list_resp.status_code, 200)
+        self.assertGreaterEqual(len(list_resp.json()), 1)
+
+        detail_resp = self.api.get(f"/api/publishers/{self.publisher.id}/")
+        self.assertEqual(detail_resp.status_code, 200)
+        self.assertEqual(detail_resp.json()["name"], "Daily Planet")
+
+    def test_newsletters_endpoints_reader_filters_unapproved_articles(self):
+        self._auth(self.reader)
+        resp = self.api.get("/api/newsletters/")
+        self.assertEqual(resp.status_code, 200)
+
+        n = resp.json()[0]
+        nested_titles = [a["title"] for a in n.get("articles", [])]
+        self.assertIn("Approved A1", nested_titles)
+        self.assertNotIn("Pending A2", nested_titles)
+
+    def test_journalist_can_create_newsletter(self):
+        self._auth(self.journalist)
+        resp = self.api.post(
+            "/api/newsletters/",
+            {"title": "New Letter", "description": "Desc",
+             "article_ids": [self.approved.id]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json()["title"], "New Letter")
+
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_editor_approval_triggers_signal_email_and_x(self, _mock_x):
+        """
+        Approving an article should:
+        - queue an outbox row without sending anything inline
+        - once drained: email excerpt+link to subscribers
+        - once drained: attempt an X post (mocked)
+        """
+        from django.core import mail
+
+        _, editors, _ = ensure_groups_and_permissions()
+        self.editor.groups.add(editors)
+
+        self.client.login(username="editor1", password="pass123")
+        resp = self.client.get(reverse(
+            "approve_article",
+            kwargs={"article_id": self.pending.id}), follow=True)
+        self.assertEqual(resp.status_code, 200)
+
+        self.pending.refresh_from_db()
+        self.assertTrue(self.pending.approved)
+
+        self.assertEqual(len(mail.outbox), 0)
+        entry = NotificationOutbox.objects.get(article=self.pending)
+        self.assertEqual(entry.status, NotificationOutbox.STATUS_PENDING)
+
+        call_command("run_outbox", "--once", stdout=StringIO())
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, NotificationOutbox.STATUS_SENT)
+        self.assertGreaterEqual(len(mail.outbox), 1)
+        self.assertIn("Excerpt:", mail.outbox[0].body)
+        self.assertIn("Read more:", mail.outbox[0].body)
+
+    def test_outbox_retries_with_backoff_then_fails(self):
+        """
+        A failing delivery is rescheduled with backoff and marked failed
+        after OUTBOX_MAX_ATTEMPTS attempts.
+        """
+        self.pending.approved = True
+        self.pending.save()
+        entry = NotificationOutbox.objects.get(article=self.pending)
+
+        with patch("news_app.functions.outbox.notify_on_approval",
+                   side_effect=ConnectionError("smtp down")):
+            call_command("run_outbox", "--once", stdout=StringIO())
+
+            entry.refresh_from_db()
+            self.assertEqual(entry.status, NotificationOutbox.STATUS_PENDING)
+            self.assertEqual(entry.attempts, 1)
+            self.assertIn("smtp down", entry.last_error)
+            self.assertGreater(entry.next_attempt_at, entry.created_at)
+
+            NotificationOutbox.objects.filter(id=entry.id).update(
+                next_attempt_at=entry.created_at)
+            call_command("run_outbox", "--once", stdout=StringIO())
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, NotificationOutbox.STATUS_FAILED)
+        self.assertEqual(entry.attempts, 2)
+
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_unapproved_articles_are_never_notified(self, mock_x):
+        from django.core import mail
+
+        NotificationOutbox.objects.all().delete()
+        self._auth(self.journalist)
+        for value in ("true", "on"):
+            resp = self.api.put(f"/api/articles/{self.pending.id}/",
+                                {"approved": value}, format="multipart")
+            self.assertEqual(resp.status_code, 403)
+        self.pending.refresh_from_db()
+        self.assertFalse(self.pending.approved)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+        # Rows whose articles were unapproved before delivery notify
+        # nobody.
+        NotificationOutbox.objects.create(
+            kind=NotificationOutbox.KIND_ARTICLE_APPROVED,
+            article=self.pending)
+        NotificationOutbox.objects.create(
+            kind=NotificationOutbox.KIND_ARTICLES_APPROVED,
+            article_ids=[self.pending.id])
+        call_command("run_outbox", "--once", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+        mock_x.assert_not_called()
+
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_approval_email_is_sent_per_recipient(self, _mock_x):
+        from django.core import mail
+
+        for i in range(4):
+            extra = User.objects.create_user(
+                username=f"fan{i}", password="pass123",
+                email=f"fan{i}@test.com", role="reader")
+            extra.subscribed_publishers.add(self.publisher)
+
+        NotificationOutbox.objects.all().delete()
+        self.pending.approved = True
+        self.pending.save()
+        with self.settings(EMAIL_FANOUT_CHUNK_SIZE=2):
+            call_command("run_outbox", "--once", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertTrue(all(len(m.to) == 1 for m in mail.outbox))
+        self.assertEqual({m.to[0] for m in mail.outbox},
+                         {"reader@test.com"} | {
+                             f"fan{i}@test.com" for i in range(4)})
+
+    def test_fanout_over_stub_smtp_server_with_parallel_connections(self):
+        server = _StubSMTPServer()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        recipients = (f"user{i}@test.com" for i in range(25))
+        with self.settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST="127.0.0.1",
+                EMAIL_PORT=server.server_address[1]):
+            result = send_fanout(recipients, "Subject", "Body",
+                                 chunk_size=10, workers=3)
+
+        self.assertEqual(result.sent, 25)
+        self.assertEqual(result.failed, 0)
+        self.assertEqual(result.chunks, 3)
+        self.assertEqual(server.messages, 25)
+        self.assertEqual(len(set(server.recipients)), 25)
+
+    def test_fanout_counts_failures_when_smtp_unreachable(self):
+        with self.settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST="127.0.0.1", EMAIL_PORT=1, EMAIL_TIMEOUT=1):
+            result = send_fanout(["a@test.com", "b@test.com"], "S", "B")
+        self.assertEqual(result.sent, 0)
+        self.assertEqual(result.failed, 2)
+
+    def test_subscriber_emails_single_deduplicated_query(self):
+        """
+        The reader follows both the journalist and the publisher but is
+        resolved once: one audience index read plus one email lookup.
+        Readers without email are skipped.
+        """
+        no_email = User.objects.create_user(
+            username="silent", password="pass123", role="reader")
+        no_email.subscribed_publishers.add(self.publisher)
+
+        with self.assertNumQueries(2):
+            emails = list(_subscriber_emails(self.pending))
+        self.assertEqual(emails, ["reader@test.com"])
+
+    def test_audience_index_follows_subscription_changes(self):
+        other = User.objects.create_user(
+            username="reader2", password="pass123",
+            email="reader2@test.com", role="reader")
+        J, P = audience.JOURNALIST, audience.PUBLISHER
+
+        self.assertEqual(list(audience.members(P, self.publisher.id)),
+                         [self.reader.id])
+
+        self.publisher.subscribers.add(other)
+        other.subscribed_journalists.add(self.journalist,
+                                         self.journalist2)
+        self.assertEqual(list(audience.members(P, self.publisher.id)),
+                         [self.reader.id, other.id])
+        self.assertEqual(list(audience.members(J, self.journalist2.id)),
+                         [other.id])
+        self.assertEqual(list(audience.article_audience(self.pending)),
+                         [self.reader.id, other.id])
+
+        other.subscribed_journalists.clear()
+        self.reader.subscribed_publishers.remove(self.publisher)
+        self.assertEqual(audience.audience_size(J, self.journalist2.id), 0)
+        self.assertEqual(list(audience.members(J, self.journalist.id)),
+                         [self.reader.id])
+        self.assertEqual(list(audience.members(P, self.publisher.id)),
+                         [other.id])
+
+        self.journalist.subscribed_by_readers.clear()
+        self.assertEqual(audience.audience_size(J, self.journalist.id), 0)
+
+    def test_deleted_users_and_publishers_leave_the_audience_index(self):
+        from .models import AudienceIndex
+
+        J, P = audience.JOURNALIST, audience.PUBLISHER
+        other = User.objects.create_user(
+            username="reader2", password="pass123",
+            email="reader2@test.com", role="reader")
+        other.subscribed_publishers.add(self.publisher)
+        other.subscribed_journalists.add(self.journalist2)
+        self.reader.subscribed_journalists.add(self.journalist2)
+
+        other.delete()
+        self.assertEqual(list(audience.members(P, self.publisher.id)),
+                         [self.reader.id])
+        self.assertEqual(list(audience.members(J, self.journalist.id)),
+                         [self.reader.id])
+        self.publisher.refresh_from_db()
+        self.assertEqual(self.publisher.subscriber_count, 1)
+
+        self.journalist2.delete()
+        self.assertFalse(AudienceIndex.objects.filter(
+            kind=J, target_id=self.journalist2.id).exists())
+        self.assertEqual(list(audience.subscriptions(self.reader.id)[J]),
+                         [self.journalist.id])
+
+        publisher_id = self.publisher.id
+        self.publisher.delete()
+        self.assertFalse(AudienceIndex.objects.filter(
+            kind=P, target_id=publisher_id).exists())
+
+    def _stub_x(self, responses=()):
+        server = _StubXServer(responses)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_post_to_x_uses_env_endpoint_and_token(self):
+        server = self._stub_x()
+        env = {"X_BEARER_TOKEN": "t0k", "X_TWEET_ENDPOINT": server.url}
+        with patch.dict(os.environ, env):
+            self.assertTrue(post_to_x("x" * 300))
+            self.assertTrue(post_to_x("again"))
+        self.assertEqual(server.posts[0][0], "Bearer t0k")
+        self.assertEqual(len(server.posts[0][1]["text"]), 280)
+
+        with patch.dict(os.environ, {"X_BEARER_TOKEN": ""}):
+            self.assertFalse(post_to_x("no token"))
+        self.assertEqual(len(server.posts), 2)
+
+    def test_x_client_retries_server_errors(self):
+        server = self._stub_x([(503, {}), (502, {}), (201, {})])
+        client = XClient("t", server.url, max_retries=2, backoff=0)
+        self.assertTrue(client.post("hello"))
+        self.assertEqual(len(server.posts), 3)
+
+    def test_x_client_circuit_breaker_skips_calls_while_open(self):
+        server = self._stub_x([(500, {})] * 4)
+        client = XClient("t", server.url, max_retries=1, backoff=0,
+                         breaker=CircuitBreaker(threshold=2,
+                                                reset_timeout=60))
+        self.assertFalse(client.post("a"))
+        self.assertFalse(client.post("b"))
+        self.assertTrue(client.breaker.is_open)
+
+        self.assertFalse(client.post("c"))
+        self.assertEqual(len(server.posts), 4)
+
+        client.breaker.reset_timeout = 0
+        self.assertTrue(client.post("d"))
+        self.assertFalse(client.breaker.is_open)
+
+    def test_x_client_waits_for_rate_limit_reset(self):
+        reset = str(int(time.time()) + 60)
+        server = self._stub_x([(429, {"x-rate-limit-remaining": "0",
+                                      "x-rate-limit-reset": reset})])
+        client = XClient("t", server.url, backoff=0)
+        self.assertFalse(client.post("a"))
+        self.assertFalse(client.post("b"))
+        self.assertEqual(len(server.posts), 1)
+        self.assertFalse(client.breaker.is_open)
+
+    def test_save_reads_counted_state_only_when_writing_it(self):
+        article = Article.objects.get(pk=self.pending.pk)
+        # Not title or content, which the search index would follow.
+        article.image = "article_images/cover.jpg"
+        # Locked read of the counted state, UPDATE.
+        with self.assertNumQueries(2):
+            article.save()
+        with self.assertNumQueries(1):
+            article.save(update_fields=["image"])
+
+    def test_concurrent_approvals_notify_once(self):
+        """
+        Two stale copies both approving: only the compare-and-set winner
+        queues a notification.
+        """
+        first = Article.objects.get(pk=self.pending.pk)
+        second = Article.objects.get(pk=self.pending.pk)
+        NotificationOutbox.objects.all().delete()
+
+        first.approved = True
+        first.save()
+        second.approved = True
+        second.save()
+        first.title = "Edited after approval"
+        first.save()
+
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        self.assertFalse(approve(self.pending.pk))
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_approve_writes_without_reading(self):
+        NotificationOutbox.objects.all().delete()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(approve(self.pending.pk))
+        statements = [q["sql"].split()[0] for q in ctx.captured_queries
+                      if "SAVEPOINT" not in q["sql"]]
+        # approval CAS, journalist and publisher counters, outbox row
+        self.assertEqual(statements, ["UPDATE", "UPDATE", "UPDATE",
+                                      "INSERT"])
+        self.assertEqual(NotificationOutbox.objects.get().article_id,
+                         self.pending.pk)
+
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_bulk_approve_api_sends_one_combined_email(self, mock_x):
+        from django.core import mail
+
+        second = Article.objects.create(
+            title="Pending B", content="Other body " * 40,
+            author=self.journalist2, approved=False)
+        follower = User.objects.create_user(
+            username="follower2", password="pass123",
+            email="follower2@test.com", role="reader")
+        follower.subscribed_journalists.add(self.journalist2)
+        self.reader.subscribed_journalists.add(self.journalist2)
+        NotificationOutbox.objects.all().delete()
+
+        self._auth(self.reader)
+        resp = self.api.post("/api/articles/approve/",
+                             {"ids": [self.pending.id]}, format="json")
+        self.assertEqual(resp.status_code, 403)
+
+        self._auth(self.editor)
+        resp = self.api.post(
+            "/api/articles/approve/",
+            {"ids": [self.pending.id, second.id, self.approved.id, 9999]},
+            format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["approved"],
+                         sorted([self.pending.id, second.id]))
+        self.assertEqual(resp.json()["skipped"],
+                         sorted([self.approved.id, 9999]))
+
+        with self.assertNumQueries(1):  # token
+            resp = self.api.post("/api/articles/approve/",
+                                 {"ids": list(range(1, 102))}, format="json")
+        self.assertEqual(resp.status_code, 400)
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.kind,
+                         NotificationOutbox.KIND_ARTICLES_APPROVED)
+        call_command("run_outbox", "--once", stdout=StringIO())
+
+        by_recipient = {m.to[0]: m for m in mail.outbox}
+        self.assertEqual(len(mail.outbox), 2)
+        combined = by_recipient["reader@test.com"]
+        self.assertIn("Pending A2", combined.body)
+        self.assertIn("Pending B", combined.body)
+        self.assertNotIn("Pending A2",
+                         by_recipient["follower2@test.com"].body)
+        self.assertEqual(mock_x.call_count, 2)
+
+    def test_editor_queue_bulk_approve_form(self):
+        _, editors, _ = ensure_groups_and_permissions()
+        self.editor.groups.add(editors)
+        self.client.login(username="editor1", password="pass123")
+
+        queue = self.client.get(reverse("editor_queue"))
+        self.assertContains(queue, 'name="article_ids"')
+
+        resp = self.client.post(reverse("approve_articles"),
+                                {"article_ids": [self.pending.id]})
+        self.assertRedirects(resp, reverse("editor_queue"))
+        self.pending.refresh_from_db()
+        self.assertTrue(self.pending.approved)
+
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_digest_readers_get_one_email_per_digest(self, _mock_x):
+        from django.core import mail
+
+        from django.utils import timezone
+
+        self.reader.delivery_mode = User.DELIVERY_DAILY
+        self.reader.last_digest_at = timezone.now()
+        self.reader.save()
+        other = User.objects.create_user(
+            username="digest2", password="pass123",
+            email="digest2@test.com", role="reader",
+            delivery_mode=User.DELIVERY_DAILY,
+            last_digest_at=self.reader.last_digest_at)
+        other.subscribed_publishers.add(self.publisher)
+
+        extra = Article.objects.create(
+            title="Pending A3", content="More " * 40,
+            author=self.journalist, publisher=self.publisher)
+        NotificationOutbox.objects.all().delete()
+        approve(self.pending.id)
+        approve(extra.id)
+        call_command("run_outbox", "--once", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+
+        with self.assertNumQueries(3):
+            stats = send_digests(User.DELIVERY_DAILY)
+        self.assertEqual(stats["readers"], 2)
+        self.assertEqual(stats["digests"], 1)
+        self.assertEqual(stats["sent"], 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn("Pending A2", mail.outbox[0].body)
+        self.assertIn("Pending A3", mail.outbox[0].body)
+        self.assertNotIn("Approved A1", mail.outbox[0].body)
+
+        self.assertEqual(send_digests(User.DELIVERY_DAILY)["readers"], 0)
+        self.assertEqual(send_digests(User.DELIVERY_HOURLY)["readers"], 0)
+
+    def test_digest_survives_lost_approval_race_and_smtp_outage(self):
+        from django.core import mail
+
+        stale = Article.objects.get(pk=self.pending.pk)
+        approve(self.pending.id)
+        approved_at = Article.objects.get(pk=self.pending.pk).approved_at
+        stale.approved = True
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.approved_at, approved_at)
+
+        last_digest_at = approved_at - timedelta(minutes=1)
+        self.reader.delivery_mode = User.DELIVERY_DAILY
+        self.reader.last_digest_at = last_digest_at
+        self.reader.save()
+        with patch("django.core.mail.backends.locmem.EmailBackend"
+                   ".send_messages", side_effect=OSError("smtp down")):
+            self.assertEqual(send_digests(User.DELIVERY_DAILY)["failed"], 1)
+        self.reader.refresh_from_db()
+        self.assertEqual(self.reader.last_digest_at, last_digest_at)
+
+        self.assertEqual(send_digests(User.DELIVERY_DAILY)["sent"], 1)
+        self.assertIn("Pending A2", mail.outbox[0].body)
+        self.assertEqual(send_digests(User.DELIVERY_DAILY)["readers"], 0)
+
+    def test_digest_cursor_starts_at_switch_and_outlives_failures(self):
+        """
+        Switching to a digest starts the reader's window; failed digests
+        leave it open however long the outage lasts.
+        """
+        from django.core import mail
+        from django.utils import timezone
+
+        readers, _, _ = ensure_groups_and_permissions()
+        self.reader.groups.add(readers)
+        self.client.login(username="reader1", password="pass123")
+        self.client.post(reverse("subscriptions"), {
+            "publishers": [self.publisher.id],
+            "journalists": [self.journalist.id],
+            "delivery_mode": User.DELIVERY_DAILY})
+        self.reader.refresh_from_db()
+        switched_at = self.reader.last_digest_at
+        self.assertIsNotNone(switched_at)
+
+        approve(self.pending.id)
+        later = timezone.now() + timedelta(days=3)
+        with patch("django.core.mail.backends.locmem.EmailBackend"
+                   ".send_messages", side_effect=OSError("smtp down")):
+            self.assertEqual(
+                send_digests(User.DELIVERY_DAILY, now=later)["failed"], 1)
+        self.reader.refresh_from_db()
+        self.assertEqual(self.reader.last_digest_at, switched_at)
+
+        much_later = later + timedelta(days=3)
+        stats = send_digests(User.DELIVERY_DAILY, now=much_later)
+        self.assertEqual(stats["sent"], 1)
+        self.assertIn("Pending A2", mail.outbox[-1].body)
+        self.assertNotIn("Approved A1", mail.outbox[-1].body)
+        self.reader.refresh_from_db()
+        self.assertEqual(self.reader.last_digest_at, much_later)
+
+        self.reader.delivery_mode = User.DELIVERY_HOURLY
+        self.reader.save(update_fields=["delivery_mode"])
+        self.reader.refresh_from_db()
+        self.assertEqual(self.reader.last_digest_at, much_later)
+
+    def test_channels_run_concurrently_with_own_time_budgets(self):
+        def slow(articles):
+            time.sleep(0.3)
+            return "slow done"
+
+        def hung(articles):
+            time.sleep(2)
+
+        def broken(articles):
+            raise ConnectionError("down")
+
+        registry = {"slow": (slow, 5), "hung": (hung, 0.4),
+                    "broken": (broken, 5)}
+        with patch.dict(channels._registry, registry, clear=True), \
+                self.settings(NOTIFY_CHANNEL_WORKERS=4):
+            started = time.perf_counter()
+            results = channels.run_channels([self.pending])
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1.0)
+        self.assertTrue(results["slow"].ok)
+        self.assertEqual(results["slow"].detail, "slow done")
+        self.assertFalse(results["hung"].ok)
+        self.assertIn("Timed out", results["hung"].error)
+        self.assertTrue(results["hung"].unknown)
+        self.assertFalse(results["broken"].ok)
+        self.assertIn("down", results["broken"].error)
+        self.assertFalse(results["broken"].unknown)
+
+    def test_timed_out_channels_are_cancelled_or_not_retried(self):
+        ran = []
+
+        def hung(articles):
+            time.sleep(0.6)
+
+        def queued(articles):
+            ran.append("queued")
+
+        registry = {"hung": (hung, 0.3), "queued": (queued, 0.1)}
+        pool = ThreadPoolExecutor(max_workers=1)
+        with patch.dict(channels._registry, registry, clear=True), \
+                patch.object(channels, "_pool", pool), \
+                self.settings(NOTIFY_CHANNEL_WORKERS=1):
+            results = channels.run_channels([self.pending])
+        pool.shutdown(wait=True)
+
+        # Still queued when its budget ran out: cancelled, safe to retry.
+        self.assertFalse(results["queued"].unknown)
+        self.assertEqual(ran, [])
+        # Already running: may still deliver, so it must not run again.
+        self.assertTrue(results["hung"].unknown)
+
+        NotificationOutbox.objects.all().delete()
+        approve(self.pending.id)
+        outcome = {"email": channels.ChannelResult("email", True, 0.1),
+                   "x": results["hung"]}
+        with patch("news_app.functions.outbox.notify_on_approval",
+                   return_value=outcome):
+            call_command("run_outbox", "--once", stdout=StringIO())
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.STATUS_SENT)
+        self.assertEqual(entry.completed_channels, ["email", "x"])
+
+    def test_x_budget_covers_every_post_with_retries(self):
+        from .functions.notify import _x_budget
+
+        client = XClient("t", timeout=5, max_retries=2, backoff=0.5)
+        self.assertEqual(client.worst_case_seconds(), 31.5)
+        with patch("news_app.functions.notify.get_client",
+                   return_value=client):
+            self.assertGreater(_x_budget([self.pending] * 3), 3 * 31.5)
+
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_outbox_retry_only_reruns_failed_channels(self, mock_x):
+        from django.core import mail
+
+        NotificationOutbox.objects.all().delete()
+        approve(self.pending.id)
+        with patch("news_app.functions.notify.send_fanout",
+                   side_effect=OSError("smtp down")):
+            call_command("run_outbox", "--once", stdout=StringIO())
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.completed_channels, ["x"])
+        self.assertIn("email: OSError: smtp down", entry.last_error)
+
+        NotificationOutbox.objects.update(next_attempt_at=entry.created_at)
+        call_command("run_outbox", "--once", stdout=StringIO())
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, NotificationOutbox.STATUS_SENT)
+        self.assertEqual(mock_x.call_count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_x_rejections_are_final_and_rate_limits_wait(self):
+        """
+        A post X rejects is reported and never retried; a rate-limited
+        post is retried once X says the limit resets, not after backoff.
+        """
+        from django.utils import timezone
+
+        NotificationOutbox.objects.all().delete()
+        approve(self.pending.id)
+        rejected = PostResult(False, error="rejected (403)")
+        with patch("news_app.functions.notify.post_to_x",
+                   return_value=rejected) as mock_x:
+            call_command("run_outbox", "--once", stdout=StringIO())
+            entry = NotificationOutbox.objects.get()
+            self.assertEqual(entry.status, NotificationOutbox.STATUS_SENT)
+            self.assertIn("x", entry.completed_channels)
+            self.assertEqual(mock_x.call_count, 1)
+
+        NotificationOutbox.objects.all().delete()
+        second = Article.objects.create(
+            title="Pending B", content="Other body " * 40,
+            author=self.journalist, approved=False)
+        approve(second.id)
+        limited = PostResult(False, transient=True, retry_after=600,
+                             error="rate limited (429)")
+        before = timezone.now()
+        with patch("news_app.functions.notify.post_to_x",
+                   return_value=limited):
+            call_command("run_outbox", "--once", stdout=StringIO())
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, NotificationOutbox.STATUS_PENDING)
+        self.assertNotIn("x", entry.completed_channels)
+        self.assertIn("rate limited", entry.last_error)
+        self.assertGreaterEqual(entry.next_attempt_at,
+                                before + timedelta(seconds=600))
+
+    def test_bench_notify_reports_stage_timings(self):
+        NotificationOutbox.objects.all().delete()
+        out = StringIO()
+        with self.settings(EMAIL_FANOUT_CHUNK_SIZE=4, EMAIL_FANOUT_WORKERS=2):
+            call_command("bench_notify", "--subscribers", "10", stdout=out)
+        stats = json.loads(out.getvalue())
+
+        self.assertEqual(stats["emails"], 10)
+        self.assertEqual(stats["x_posts"], 1)
+        self.assertEqual(stats["outbox"],
+                         {"sent": 1, "retried": 0, "failed": 0})
+        # approval CAS, two counter updates, outbox row
+        self.assertEqual(stats["approve"]["queries"], 4)
+        self.assertIn("peak_bytes", stats["deliver"])
+        # Chunks sent on fan-out worker threads still reach the collector.
+        self.assertEqual(stats["stages"]["smtp"]["calls"], 3)
+        for name in ("audience", "x", "channel.email", "channel.x"):
+            self.assertIn(name, stats["stages"])
+        self.assertFalse(User.objects.filter(
+            username__startswith="bench-").exists())
+
+    def test_api_articles_keyset_pagination(self):
+        base = self.approved.created_at
+        extra = [Article.objects.create(
+            title=f"Page {i}", content="...", author=self.journalist,
+            publisher=self.publisher, approved=True,
+            created_at=base - timedelta(minutes=i))
+            for i in range(1, 5)]
+        # Same timestamp as Page 1: ties are broken by id.
+        extra.append(Article.objects.create(
+            title="Page 1b", content="...", author=self.journalist,
+            approved=True, created_at=extra[0].created_at))
+        self._auth(self.reader)
+
+        seen, url = [], "/api/articles/?limit=2"
+        while url:
+            resp = self.api.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertLessEqual(len(resp.json()), 2)
+            seen += [a["title"] for a in resp.json()]
+            cursor = resp.headers.get("X-Next-Cursor")
+            url = cursor and f"/api/articles/?limit=2&cursor={cursor}"
+        self.assertEqual(seen, ["Approved A1", "Page 1b", "Page 1",
+                                "Page 2", "Page 3", "Page 4"])
+        self.assertIn('rel="prev"', resp.headers["Link"])
+
+        prev = self.api.get(
+            f"/api/articles/?limit=2&cursor={resp.headers['X-Prev-Cursor']}")
+        self.assertEqual([a["title"] for a in prev.json()],
+                         ["Page 1", "Page 2"])
+
+        resp = self.api.get("/api/articles/?cursor=bogus")
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.api.get("/api/newsletters/?limit=1")
+        self.assertEqual(len(resp.json()), 1)
+
+    def test_api_articles_stream_whole_archive(self):
+        for i in range(3):
+            Article.objects.create(
+                title=f"Old {i}", content="...", author=self.journalist,
+                approved=True,
+                created_at=self.approved.created_at - timedelta(days=i + 1))
+        self._auth(self.reader)
+
+        with self.settings(STREAM_CHUNK_SIZE=2):
+            resp = self.api.get("/api/articles/?stream=json&limit=1")
+            self.assertTrue(resp.streaming)
+            body = json.loads(b"".join(resp.streaming_content))
+            self.assertEqual([a["title"] for a in body],
+                             ["Approved A1", "Old 0", "Old 1", "Old 2"])
+
+            resp = self.api.get("/api/articles/subscribed/?stream=ndjson")
+            self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+            lines = b"".join(resp.streaming_content).decode().splitlines()
+            self.assertEqual(json.loads(lines[0])["title"], "Approved A1")
+
+        resp = self.api.get("/api/articles/?stream=xml")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_conditional_get_returns_304_until_data_changes(self):
+        self._auth(self.reader)
+        urls = ["/api/articles/", f"/api/articles/{self.approved.id}/",
+                "/api/publishers/", f"/api/publishers/{self.publisher.id}/",
+                "/api/newsletters/"]
+        etags = {}
+        for url in urls:
+            resp = self.api.get(url)
+            self.assertEqual(resp.status_code, 200)
+            etags[url] = resp["ETag"]
+            self.assertIn("Last-Modified", resp)
+
+            with patch("news_app.api_views.ArticleSerializer") as ser, \
+                    patch("news_app.api_views.PublisherSerializer") as pser:
+                resp = self.api.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(resp.status_code, 304, url)
+            ser.assert_not_called()
+            pser.assert_not_called()
+
+        approve(self.pending.id)
+        self.approved.title = "Approved A1 (edited)"
+        self.approved.save()
+        for url in urls[:2] + urls[4:]:
+            resp = self.api.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(resp.status_code, 200, url)
+
+        resp = self.api.get("/api/articles/?limit=1",
+                            HTTP_IF_NONE_MATCH=etags["/api/articles/"])
+        self.assertEqual(resp.status_code, 200)
+
+    def test_conditional_get_follows_embedded_data(self):
+        self._auth(self.reader)
+        urls = ["/api/articles/", f"/api/articles/{self.approved.id}/",
+                "/api/newsletters/"]
+
+        def assert_changed(change):
+            etags = {url: self.api.get(url)["ETag"] for url in urls}
+            time.sleep(0.01)
+            change()
+            for url in urls:
+                resp = self.api.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(resp.status_code, 200, url)
+
+        def rename_publisher():
+            self.publisher.name = "Daily Bugle"
+            self.publisher.save()
+
+        def rename_author():
+            self.journalist.username = "journo1-renamed"
+            self.journalist.save()
+
+        assert_changed(rename_publisher)
+        assert_changed(rename_author)
+
+        older = Article.objects.create(
+            title="Older", content="...", author=self.journalist,
+            approved=True, created_at=self.approved.created_at
+            - timedelta(days=1))
+        Article.objects.filter(pk=older.pk).update(
+            updated_at=older.created_at)
+        etag = self.api.get("/api/newsletters/")["ETag"]
+        for change in (lambda: self.newsletter.articles.add(older),
+                       lambda: self.newsletter.articles.remove(older),
+                       lambda: older.newsletters.add(self.newsletter),
+                       lambda: older.newsletters.clear()):
+            time.sleep(0.01)
+            change()
+            resp = self.api.get("/api/newsletters/",
+                                HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 200)
+            etag = resp["ETag"]
+
+    def test_list_validators_read_only_the_served_page(self):
+        self._auth(self.reader)
+        older = Article.objects.create(
+            title="Older", content="...", author=self.journalist,
+            approved=True, created_at=self.approved.created_at
+            - timedelta(days=1))
+        self.newsletter.articles.add(older)
+
+        for url in ("/api/articles/?limit=1", "/api/newsletters/?limit=1"):
+            etag = self.api.get(url)["ETag"]
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 304, url)
+            sql = " ".join(q["sql"] for q in ctx.captured_queries)
+            self.assertNotIn("COUNT(", sql)
+            self.assertNotIn("MAX(", sql)
+
+        etag = self.api.get("/api/articles/?limit=1")["ETag"]
+        older.title = "Older (edited)"
+        older.save()
+        resp = self.api.get("/api/articles/?limit=1",
+                            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        older.delete()
+        self.assertNotIn("X-Next-Cursor",
+                         self.api.get("/api/articles/?limit=1"))
+        resp = self.api.get("/api/articles/?limit=1",
+                            HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_feed_cache_hits_until_invalidated(self):
+        self._auth(self.reader)
+        first = self.api.get("/api/articles/")
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with self.assertNumQueries(1):  # token lookup only
+            again = self.api.get("/api/articles/")
+        self.assertEqual(again["X-Cache"], "HIT")
+        self.assertEqual(again.json(), first.json())
+        self.assertEqual(again["ETag"], first["ETag"])
+
+        with self.assertNumQueries(1):
+            resp = self.api.get("/api/articles/",
+                                HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(resp.status_code, 304)
+
+        approve(self.pending.id)
+        resp = self.api.get("/api/articles/")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertIn("Pending A2", [a["title"] for a in resp.json()])
+
+        self.publisher.name = "Daily Bugle"
+        self.publisher.save()
+        resp = self.api.get("/api/articles/")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.json()[0]["publisher"]["name"], "Daily Bugle")
+
+        self.journalist.username = "renamed"
+        self.journalist.save()
+        self.reader.save()  # readers are not in the feed
+        self.assertEqual(self.api.get("/api/articles/")["X-Cache"], "MISS")
+        self.assertEqual(self.api.get("/api/articles/")["X-Cache"], "HIT")
+
+        demoted = User.objects.get(pk=self.journalist.pk)
+        demoted.role = User.ROLE_READER
+        demoted.save()
+        resp = self.api.get("/api/articles/")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.json()[0]["author"]["role"], "reader")
+
+        self.approved.delete()
+        resp = self.api.get("/api/articles/")
+        self.assertNotIn("Approved A1", [a["title"] for a in resp.json()])
+
+        self.assertEqual(feed_cache.stats()["hits"], 3)
+        out = StringIO()
+        call_command("feed_cache_stats", "--reset", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["misses"], 6)
+        self.assertEqual(feed_cache.stats()["hits"], 0)
+
+    def test_fast_list_serializer_matches_article_serializer(self):
+        from rest_framework.test import APIRequestFactory
+        from .serializers import ArticleListSerializer, ArticleSerializer
+
+        Article.objects.create(title="Indie", content="...",
+                               author=self.journalist2, approved=True)
+        Article.objects.filter(id=self.approved.id).update(
+            image="article_images/front page é.jpg")
+        request = APIRequestFactory().get("/api/articles/")
+        qs = Article.objects.order_by("id")
+
+        for context in ({"request": request}, {}):
+            expected = ArticleSerializer(
+                qs.select_related("author", "publisher"), many=True,
+                context=context).data
+            fast = ArticleListSerializer(context=context)
+            actual = fast.to_representation(fast.prepare(qs))
+            self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_sparse_fieldsets_are_pushed_into_sql(self):
+        self._auth(self.reader)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.api.get("/api/articles/?fields=id,title")
+        self.assertEqual(list(resp.json()[0]), ["id", "title"])
+        self.assertFalse(any('"news_app_article"."content"' in q["sql"]
+                             for q in ctx.captured_queries))
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.api.get("/api/articles/?view=summary")
+        row = resp.json()[0]
+        self.assertNotIn("content", row)
+        self.assertEqual(row["excerpt"],
+                         build_excerpt(self.approved.content, limit=240))
+        self.assertFalse(any('"news_app_article"."content"' in q["sql"]
+                             for q in ctx.captured_queries))
+
+        resp = self.api.get("/api/articles/?exclude=content,publisher")
+        self.assertNotIn("publisher", resp.json()[0])
+        self.assertIn("title", resp.json()[0])
+        self.assertEqual(
+            self.api.get("/api/articles/?fields=bogus").status_code, 400)
+        self.assertEqual(
+            self.api.get("/api/articles/?view=huge").status_code, 400)
+
+        resp = self.api.get(
+            f"/api/articles/{self.approved.id}/?view=summary&exclude=image")
+        self.assertEqual(resp.json()["excerpt"], row["excerpt"])
+        self.assertNotIn("image", resp.json())
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.api.get("/api/newsletters/?fields=id,title")
+        self.assertEqual(list(resp.json()[0]), ["id", "title"])
+        # No nested articles requested, so none are loaded.
+        self.assertFalse(any('"news_app_article"."title"' in q["sql"]
+                             for q in ctx.captured_queries))
+
+        resp = self.api.get("/api/newsletters/?view=summary")
+        nested = resp.json()[0]["articles"]
+        self.assertEqual([a["title"] for a in nested], ["Approved A1"])
+        self.assertIn("excerpt", nested[0])
+        self.assertNotIn("content", nested[0])
+
+    def test_newsletter_listing_takes_constant_queries(self):
+        for i in range(100):
+            journalist = self.journalist if i % 2 else self.journalist2
+            publisher = Publisher.objects.create(name=f"Press {i}")
+            letter = Newsletter.objects.create(
+                title=f"Letter {i}", author=journalist)
+            letter.articles.add(*[Article.objects.create(
+                title=f"L{i} A{j}", content="...", author=journalist,
+                publisher=publisher, approved=j != 2) for j in range(3)])
+
+        # token, page, nested articles prefetch; validators come from
+        # the page
+        for user in (self.reader, self.editor):
+            self._auth(user)
+            with self.assertNumQueries(3):
+                resp = self.api.get("/api/newsletters/?limit=100")
+            self.assertEqual(len(resp.json()), 100)
+            nested = [a for n in resp.json() for a in n["articles"]]
+            self.assertEqual(len(nested), 200 if user is self.reader
+                             else 300)
+            self.assertTrue(all(a["publisher"]["name"].startswith("Press")
+                                for a in nested))
+
+        self._auth(self.reader)
+        with self.assertNumQueries(3):  # token, newsletter, prefetch
+            resp = self.api.get(f"/api/newsletters/{self.newsletter.id}/")
+        self.assertEqual([a["title"] for a in resp.json()["articles"]],
+                         ["Approved A1"])
+
+    @override_settings(TIMELINE_ENABLED=True)
+    @patch("news_app.functions.notify.post_to_x", return_value=True)
+    def test_subscribed_feed_from_reader_timeline(self, _mock_x):
+        def feed(**params):
+            self._auth(self.reader)
+            titles, cursor = [], None
+            while True:
+                resp = self.api.get("/api/articles/subscribed/",
+                                    {"limit": 1, **params,
+                                     **({"cursor": cursor} if cursor
+                                        else {})})
+                titles += [a["title"] for a in resp.json()]
+                cursor = resp.get("X-Next-Cursor")
+                if not cursor:
+                    return titles
+
+        def timeline_of(reader):
+            return sorted(reader.timeline_entries.values_list(
+                "article__title", flat=True))
+
+        call_command("rebuild_timelines", stdout=StringIO())
+        self.assertEqual(timeline_of(self.reader), ["Approved A1"])
+
+        approve(self.pending.id)
+        self.assertEqual(timeline_of(self.reader),
+                         ["Approved A1", "Pending A2"])
+
+        Article.objects.create(title="Other B1", content="...",
+                               author=self.journalist2, approved=True)
+        self.reader.subscribed_journalists.add(self.journalist2)
+        self.reader.subscribed_publishers.remove(self.publisher)
+        self.assertEqual(timeline_of(self.reader),
+                         ["Approved A1", "Other B1", "Pending A2"])
+        self.assertEqual(feed(), ["Other B1", "Pending A2", "Approved A1"])
+
+        self.journalist2.subscribed_by_readers.clear()
+        self.assertEqual(timeline_of(self.reader),
+                         ["Approved A1", "Pending A2"])
+
+        # Past the audience threshold the target is flagged and its
+        # readers are served from the article table instead.
+        with self.settings(TIMELINE_MAX_AUDIENCE=0):
+            self.reader.subscribed_journalists.add(self.journalist2)
+        self.assertEqual(timeline_of(self.reader),
+                         ["Approved A1", "Pending A2"])
+        self.assertEqual(feed(view="summary"),
+                         ["Other B1", "Pending A2", "Approved A1"])
+
+    @override_settings(TIMELINE_ENABLED=True)
+    def test_approval_fills_timelines_and_skips_deleted_subscribers(self):
+        other = User.objects.create_user(
+            username="reader2", password="pass123",
+            email="reader2@test.com", role="reader")
+        other.subscribed_journalists.add(self.journalist)
+        gone = User.objects.create_user(
+            username="reader3", password="pass123",
+            email="reader3@test.com", role="reader")
+        gone.subscribed_journalists.add(self.journalist)
+        gone_id = gone.id
+        gone.delete()
+        self.assertNotIn(gone_id, audience.members(audience.JOURNALIST,
+                                                   self.journalist.id))
+        # Even a stale id left in the index must not break the insert.
+        audience.add_subscribers(audience.JOURNALIST, [self.journalist.id],
+                                 [gone_id])
+
+        approve(self.pending.id)
+        for reader in (self.reader, other):
+            self.assertTrue(reader.timeline_entries.filter(
+                article=self.pending).exists())
+
+        # Every approval path fills timelines before the outbox runs.
+        second = Article.objects.create(
+            title="Pending B", content="Other body " * 40,
+            author=self.journalist, approved=False)
+        third = Article.objects.create(
+            title="Pending C", content="More " * 40,
+            author=self.journalist, approved=False)
+        second.approved = True
+        second.save()
+        approve_many([third.id])
+        self.assertEqual(other.timeline_entries.filter(article__in=[
+            self.pending, second, third]).count(), 3)
+        self.assertFalse(NotificationOutbox.objects.filter(
+            status=NotificationOutbox.STATUS_SENT).exists())
+
+    def test_reader_newsletter_visibility_uses_exists(self):
+        hidden = Newsletter.objects.create(title="Drafts only",
+                                           author=self.journalist)
+        hidden.articles.add(self.pending)
+        self.newsletter.articles.add(Article.objects.create(
+            title="Approved A3", content="...", author=self.journalist,
+            approved=True))
+
+        self._auth(self.reader)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.api.get("/api/newsletters/")
+        self.assertEqual([n["title"] for n in resp.json()],
+                         ["Weekly Roundup"])
+        page_sql = [q["sql"] for q in ctx.captured_queries
+                    if q["sql"].startswith('SELECT "news_app_newsletter"')][0]
+        self.assertIn("EXISTS", page_sql)
+        self.assertNotIn("DISTINCT", page_sql)
+
+        with self.assertNumQueries(2):  # token, newsletter + EXISTS
+            resp = self.api.get(f"/api/newsletters/{self.newsletter.id}/",
+                                {"fields": "id,title"})
+        self.assertEqual(resp.status_code, 200)
+        resp = self.api.get(f"/api/newsletters/{hidden.id}/")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_batch_fetch_applies_detail_visibility(self):
+        ids = f"{self.pending.id},{self.approved.id},999,{self.approved.id}"
+
+        self._auth(self.reader)
+        with self.assertNumQueries(2):  # token, articles
+            resp = self.api.get("/api/articles/batch/", {"ids": ids})
+        self.assertEqual([a["id"] for a in resp.json()["articles"]],
+                         [self.approved.id])
+        self.assertEqual(resp.json()["missing"], [self.pending.id, 999])
+        detail = self.api.get(f"/api/articles/{self.approved.id}/")
+        self.assertEqual(resp.json()["articles"][0], detail.json())
+
+        self._auth(self.editor)
+        resp = self.api.get("/api/articles/batch/",
+                            {"ids": ids, "fields": "id,title"})
+        self.assertEqual(resp.json()["articles"],
+                         [{"id": self.pending.id, "title": "Pending A2"},
+                          {"id": self.approved.id, "title": "Approved A1"}])
+        self.assertEqual(resp.json()["missing"], [999])
+
+        for bad in ("", "1,x", ",".join(map(str, range(101)))):
+            resp = self.api.get("/api/articles/batch/", {"ids": bad})
+            self.assertEqual(resp.status_code, 400)
+
+    def test_hot_article_queries_use_indexes(self):
+        if connection.vendor not in ("mysql", "sqlite"):
+            self.skipTest("No plan checks for this database.")
+        seed_articles(2000, prefix="plan")
+        for hot in hot_queries(self.reader):
+            with self.subTest(hot.name):
+                self.assertEqual(plan_problems(hot), [], hot.qs.explain())
+
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        self.assertIn("editor_queue: ok", out.getvalue())
+
+    def _counters(self, obj):
+        obj.refresh_from_db()
+        return (obj.approved_article_count, obj.pending_article_count,
+                obj.subscriber_count)
+
+    def test_counters_follow_articles_and_subscriptions(self):
+        self.assertEqual(self._counters(self.publisher), (1, 1, 1))
+        self.assertEqual(self._counters(self.journalist), (1, 1, 1))
+
+        approve(self.pending.pk)
+        other = User.objects.create_user(
+            username="reader2", password="pass123", role="reader")
+        other.subscribed_publishers.add(self.publisher)
+        other.subscribed_journalists.add(self.journalist2)
+        self.assertEqual(self._counters(self.publisher), (2, 0, 2))
+        self.assertEqual(self._counters(self.journalist2), (0, 0, 1))
+
+        article = Article.objects.get(pk=self.approved.pk)
+        article.approved = False
+        article.publisher = None
+        article.save()
+        Article.objects.create(title="B1", content="...",
+                               author=self.journalist2,
+                               publisher=self.publisher)
+        self.pending.delete()
+        self.publisher.subscribers.clear()
+        self.assertEqual(self._counters(self.publisher), (0, 1, 0))
+        self.assertEqual(self._counters(self.journalist), (0, 1, 1))
+        self.assertEqual(self._counters(self.journalist2), (0, 1, 1))
+
+        # A full save of a stale instance must not write counters back.
+        stale = Publisher.objects.get(pk=self.publisher.pk)
+        Article.objects.create(title="B2", content="...",
+                               author=self.journalist2,
+                               publisher=self.publisher, approved=True)
+        stale.description = "Renamed"
+        stale.save()
+        self.assertEqual(self._counters(self.publisher), (1, 1, 0))
+
+        self._auth(self.reader)
+        resp = self.api.get(f"/api/publishers/{self.publisher.id}/")
+        self.assertEqual(resp.json()["approved_article_count"], 1)
+        resp = self.api.get("/api/articles/")
+        self.assertNotIn("subscriber_count", resp.json()[0]["publisher"])
+
+        Publisher.objects.update(approved_article_count=99)
+        User.objects.update(subscriber_count=-3)
+        out = StringIO()
+        call_command("recount", "--chunk-size", "1", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["publishers"],
+                         Publisher.objects.count())
+        self.assertEqual(self._counters(self.publisher), (1, 1, 0))
+        self.assertEqual(self._counters(self.journalist2), (1, 1, 1))
+
+    def test_counters_follow_saves_of_stale_articles(self):
+        def table():
+            articles = Article.objects.filter(publisher=self.publisher)
+            approved = articles.filter(approved=True).count()
+            return approved, articles.count() - approved, 1
+
+        stale = Article.objects.get(pk=self.pending.pk)
+        approve(self.pending.pk)
+        self.assertEqual(self._counters(self.publisher), (2, 0, 1))
+
+        # Writes approved=False back over the approval.
+        stale.title = "Edited while stale"
+        stale.save()
+        self.assertEqual(self._counters(self.publisher), table())
+        self.assertEqual(self._counters(self.publisher), (1, 1, 1))
+
+        loser = Article.objects.get(pk=self.pending.pk)
+        winner = Article.objects.get(pk=self.pending.pk)
+        winner.approved = True
+        winner.save()
+        loser.approved = True
+        loser.save()
+        self.assertEqual(self._counters(self.publisher), (2, 0, 1))
+        self.assertEqual(self._counters(self.journalist), (2, 0, 1))
+
+        # The locked read of the counted state, the article UPDATE and
+        # the counter UPDATE.
+        article = Article.objects.get(pk=self.pending.pk)
+        article.publisher = None
+        with self.assertNumQueries(3):
+            article.save()
+        self.assertEqual(self._counters(self.publisher), (1, 0, 1))
+
+    def test_excerpt_is_stored_and_refreshed_with_content(self):
+        body = "word " * 450
+        article = Article.objects.create(title="Long read", content=body,
+                                         author=self.journalist,
+                                         approved=True)
+        self.assertEqual(article.excerpt, build_excerpt(body, limit=240))
+        self.assertEqual(article.word_count, 450)
+        self.assertEqual(article.reading_minutes, 3)
+
+        # Saves that leave content alone do not rewrite the excerpt.
+        Article.objects.filter(pk=article.pk).update(excerpt="kept")
+        article = Article.objects.get(pk=article.pk)
+        article.title = "Renamed"
+        article.save()
+        article.content = "Short now."
+        article.save(update_fields=["title"])
+        self.assertEqual(Article.objects.get(pk=article.pk).excerpt, "kept")
+
+        article.save(update_fields=["content"])
+        article.refresh_from_db()
+        self.assertEqual((article.excerpt, article.word_count),
+                         ("Short now.", 2))
+
+        self.client.login(username="reader1", password="pass123")
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("article_list"))
+        self.assertContains(resp, "Short now.")
+        self.assertContains(resp, "1 min read")
+        self.assertFalse(any('"news_app_article"."content"' in q["sql"]
+                             for q in ctx.captured_queries))
+
+    def test_article_search_is_ranked_and_filtered_by_role(self):
+        in_title = Article.objects.create(
+            title="Volcano erupts", content="Lava reached the coast.",
+            author=self.journalist, approved=True)
+        in_body = Article.objects.create(
+            title="Island news", content="The volcano was quiet today.",
+            author=self.journalist2, approved=True)
+        pending = Article.objects.create(
+            title="Volcano warning", content="Draft.",
+            author=self.journalist)
+
+        self._auth(self.reader)
+        resp = self.api.get("/api/articles/search/?q=volcano&limit=1")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([a["id"] for a in resp.json()], [in_title.id])
+        resp = self.api.get(f"/api/articles/search/?q=volcano&limit=1"
+                            f"&cursor={resp['X-Next-Cursor']}")
+        self.assertEqual([a["id"] for a in resp.json()], [in_body.id])
+        self.assertNotIn("X-Next-Cursor", resp)
+        for bad in ("", "?q=", "?q=%22-*"):
+            self.assertEqual(self.api.get(
+                f"/api/articles/search/{bad}").status_code, 400)
+
+        # Every word must match, on every backend.
+        resp = self.api.get("/api/articles/search/?q=volcano+lava")
+        self.assertEqual([a["id"] for a in resp.json()], [in_title.id])
+        self.assertEqual(search.MySQLFulltext()._against(
+            search.terms("volcano, -lava*")), "+volcano +lava")
+
+        # The index follows edits and deletes.
+        in_body.content = "Nothing to see."
+        in_body.save()
+        in_title.delete()
+        resp = self.api.get("/api/articles/search/?q=VOLCANOES")
+        self.assertEqual(resp.json(), [])
+
+        self._auth(self.editor)
+        resp = self.api.get("/api/articles/search/?q=volcano&view=summary")
+        self.assertEqual([a["id"] for a in resp.json()], [pending.id])
+        self.assertEqual(resp.json()[0]["excerpt"], "Draft.")
+
+        self.client.login(username="reader1", password="pass123")
+        resp = self.client.get(reverse("article_list"), {"q": "island"})
+        self.assertContains(resp, "Island news")
+        self.assertNotContains(resp, "Volcano warning")
+
+        for i in range(13):
+            Article.objects.create(title=f"Island report {i}",
+                                   content="More island news.",
+                                   author=self.journalist, approved=True)
+        resp = self.client.get(reverse("article_list"), {"q": "island"})
+        first = [a.id for a in resp.context["articles"]]
+        self.assertEqual(len(first), 12)
+        self.assertNotIn("prev_page", resp.context)
+        resp = self.client.get(resp.context["next_page"])
+        second = [a.id for a in resp.context["articles"]]
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+        self.assertContains(resp, 'rel="prev"')
+        self.assertNotContains(resp, 'rel="next"')
+
+
+class ApprovalTransactionTests(TransactionTestCase):
+    """
+    Article.save in autocommit mode, as views call it: the approval and
+    its outbox row must not be committed separately.
+    """
+    def test_failed_enqueue_rolls_back_the_approval(self):
+        journalist = User.objects.create_user(
+            username="journo1", password="pass123", role="journalist")
+        article = Article.objects.create(title="Pending", content="...",
+                                         author=journalist)
+        article = Article.objects.get(pk=article.pk)
+        article.approved = True
+        with patch("news_app.signals.enqueue_approval",
+                   side_effect=ConnectionError("db gone")), \
+                self.assertRaises(ConnectionError):
+            article.save()
+
+        article.refresh_from_db()
+        self.assertFalse(article.approved)
+        self.assertIsNone(article.approved_at)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+
+@override_settings(DB_REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Read-replica routing (functions.replica). Outside TestCase, since
+    reads inside a transaction always go to the primary.
+
+    With a "replica" alias configured (e.g. a second SQLite file mirrored
+    to the test database) real requests are checked too.
+    """
+    databases = "__all__"
+
+    def _serve(self, method="GET", cookies=None, write=False):
+        """
+        Route one request through ReplicaMiddleware; return the read
+        aliases chosen in its view (before and after a write) and the
+        response.
+        """
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(Article))
+            if write:
+                router.db_for_write(Article)
+                seen.append(router.db_for_read(Article))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method.lower())("/")
+        request.COOKIES.update(cookies or {})
+        return seen, ReplicaMiddleware(view)(request)
+
+    def test_safe_requests_read_the_replica_until_they_write(self):
+        with patch("news_app.functions.replica.replica_configured",
+                   return_value=True):
+            seen, resp = self._serve(write=True)
+            self.assertEqual(seen, [REPLICA, PRIMARY])
+            self.assertIn(PIN_COOKIE, resp.cookies)
+
+            seen, resp = self._serve()
+            self.assertEqual(seen, [REPLICA])
+            self.assertNotIn(PIN_COOKIE, resp.cookies)
+
+            self.assertEqual(self._serve("POST")[0], [PRIMARY])
+            self.assertEqual(self._serve(cookies={PIN_COOKIE: "1"})[0],
+                             [PRIMARY])
+            with transaction.atomic():
+                self.assertEqual(self._serve()[0], [PRIMARY])
+
+        self.assertEqual(router.db_for_read(Article), PRIMARY)
+        self.assertEqual(router.db_for_write(Article), PRIMARY)
+        self.assertEqual(self._serve()[0],
+                         [REPLICA if replica_configured() else PRIMARY])
+
+    def test_api_reads_use_the_replica_connection(self):
+        if not replica_configured():
+            self.skipTest("No replica database configured.")
+        journalist = User.objects.create_user(
+            username="journo", password="pass123", role="journalist")
+        article = Article.objects.create(
+            title="Replicated", content="Body.", author=journalist,
+            approved=True)
+        api = APIClient()
+        token = Token.objects.create(user=journalist)
+        api.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica, \
+                CaptureQueriesContext(connections[PRIMARY]) as primary:
+            resp = api.get(f"/api/articles/{article.id}/")
+        self.assertEqual(resp.json()["title"], "Replicated")
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse(primary.captured_queries)
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            resp = api.put(f"/api/articles/{article.id}/",
+                           {"title": "Edited"}, format="multipart")
+            self.assertEqual(resp.json()["title"], "Edited")
+            resp = api.get(f"/api/articles/{article.id}/")
+        self.assertEqual(resp.json()["title"], "Edited")
+        self.assertFalse(replica.captured_queries)
+
+    def test_feed_cache_is_filled_from_the_primary(self):
+        def view(request):
+            with primary_reads():
+                inside = router.db_for_read(Article)
+            return HttpResponse(f"{inside} {router.db_for_read(Article)}")
+
+        with patch("news_app.functions.replica.replica_configured",
+                   return_value=True):
+            resp = ReplicaMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(resp.content.decode(), f"{PRIMARY} {REPLICA}")
+
+        if not replica_configured():
+            self.skipTest("No replica database configured.")
+        journalist = User.objects.create_user(
+            username="journo", password="pass123", role="journalist")
+        Article.objects.create(title="Replicated", content="Body.",
+                               author=journalist, approved=True)
+        api = APIClient()
+        token = Token.objects.create(user=journalist)
+        api.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        cache.clear()
+
+        def article_queries(ctx):
+            return [q for q in ctx.captured_queries
+                    if Article._meta.db_table in q["sql"]]
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica, \
+                CaptureQueriesContext(connections[PRIMARY]) as primary:
+            resp = api.get("/api/articles/")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.json()[0]["title"], "Replicated")
+        self.assertFalse(article_queries(replica))
+        self.assertTrue(article_queries(primary))
+        self.assertTrue(replica.captured_queries)  # token lookup
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica, \
+                CaptureQueriesContext(connections[PRIMARY]) as primary:
+            resp = api.get("/api/articles/")
+        self.assertEqual(resp["X-Cache"], "HIT")
+        self.assertFalse(article_queries(replica) + article_queries(primary))
@@ -0,0 +1,8 @@
+"""
+ASGI config for news_app_project.
+"""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "news_app_project.settings")
+application = get_asgi_application()
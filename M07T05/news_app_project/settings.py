@@ -0,0 +1,211 @@
+"""
+Django settings for news_app_project.
+
+This project implements a News Application with:
+- Custom user model (roles: Reader, Editor, Journalist).
+- Group/permission enforcement.
+- Token-based authentication for the REST API.
+- Signals to notify subscribers when an article is approved (via an outbox).
+"""
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SECRET_KEY = os.getenv("SECRET_KEY", "django-insecure-change-me")
+DEBUG = os.getenv("DEBUG", "0") == "1"
+ALLOWED_HOSTS = [h.strip() for h in os.getenv(
+    "ALLOWED_HOSTS", "127.0.0.1,localhost").split(",")]
+
+# Used by signals to build absolute links for emails/social posts.
+SITE_BASE_URL = os.getenv("SITE_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+
+    # Django REST Framework
+    "rest_framework",
+    "rest_framework.authtoken",
+
+    # News app
+    "news_app.apps.NewsAppConfig",
+]
+
+MIDDLEWARE = [
+    # First, so every database read of a request is routed (see below).
+    "news_app.functions.replica.ReplicaMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "news_app_project.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    }
+]
+
+WSGI_APPLICATION = "news_app_project.wsgi.application"
+ASGI_APPLICATION = "news_app_project.asgi.application"
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.mysql",
+        "NAME": os.getenv("DB_NAME", "news_db"),
+        "USER": os.getenv("DB_USER", "root"),
+        "PASSWORD": os.getenv("DB_PASSWORD", ""),
+        "HOST": os.getenv("DB_HOST", "127.0.0.1"),
+        "PORT": os.getenv("DB_PORT", "3306"),
+        "OPTIONS": {"init_command": "SET sql_mode='STRICT_TRANS_TABLES'"},
+    }
+}
+
+# Optional read replica. With DB_REPLICA_HOST set, reads made while
+# serving GET/HEAD requests go to the "replica" alias; writes, and reads
+# made after a request wrote, go to "default" (news_app.functions.replica).
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "USER": os.getenv("DB_REPLICA_USER", DATABASES["default"]["USER"]),
+        "PASSWORD": os.getenv("DB_REPLICA_PASSWORD",
+                              DATABASES["default"]["PASSWORD"]),
+        "HOST": os.getenv("DB_REPLICA_HOST"),
+        "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        # Tests read the primary's test database through this alias.
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["news_app.functions.replica.ReplicaRouter"]
+# A client whose request wrote keeps reading from the primary for this
+# many seconds (a cookie), so a redirect shows the change despite replica
+# lag. 0 turns it off.
+DB_REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", "5"))
+
+AUTH_PASSWORD_VALIDATORS = [
+    {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
+    {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
+    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator"},
+    {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
+]
+
+LANGUAGE_CODE = "en-us"
+TIME_ZONE = "Africa/Johannesburg"
+USE_I18N = True
+USE_TZ = True
+
+STATIC_URL = "static/"
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Custom user model
+AUTH_USER_MODEL = "news_app.CustomUser"
+
+LOGIN_URL = "/login/"
+LOGIN_REDIRECT_URL = "/articles/"
+LOGOUT_REDIRECT_URL = "/login/"
+
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND",
+    "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@news.local")
+
+# Subscriber emails are sent one per recipient, EMAIL_FANOUT_CHUNK_SIZE
+# messages per SMTP connection, over EMAIL_FANOUT_WORKERS connections.
+EMAIL_FANOUT_CHUNK_SIZE = int(os.getenv("EMAIL_FANOUT_CHUNK_SIZE", "100"))
+EMAIL_FANOUT_WORKERS = int(os.getenv("EMAIL_FANOUT_WORKERS", "1"))
+
+# Notification channels (email, X) run concurrently on this many
+# threads, each within its own time budget in seconds. 0 runs them inline.
+# The X budget follows X_TIMEOUT / X_MAX_RETRIES and the number of
+# articles unless NOTIFY_X_TIMEOUT is set.
+NOTIFY_CHANNEL_WORKERS = int(os.getenv("NOTIFY_CHANNEL_WORKERS", "4"))
+NOTIFY_CHANNEL_TIMEOUTS = {
+    "email": float(os.getenv("NOTIFY_EMAIL_TIMEOUT", "300")),
+}
+if os.getenv("NOTIFY_X_TIMEOUT"):
+    NOTIFY_CHANNEL_TIMEOUTS["x"] = float(os.getenv("NOTIFY_X_TIMEOUT"))
+
+# Notification outbox (drained by `manage.py run_outbox`).
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS",
+                                           "3600"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+# Shared cache. Set REDIS_URL to share it between processes/hosts, or
+# CACHE_DIR for a file-based cache on one host; otherwise each process
+# keeps its own in-memory cache.
+if os.getenv("REDIS_URL"):
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }}
+elif os.getenv("CACHE_DIR"):
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR"),
+    }}
+else:
+    CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }}
+
+# Approved-article feed pages are cached until an article, publisher or
+# author changes, and at most FEED_CACHE_TIMEOUT seconds.
+FEED_CACHE_ALIAS = os.getenv("FEED_CACHE_ALIAS", "default")
+FEED_CACHE_TIMEOUT = int(os.getenv("FEED_CACHE_TIMEOUT", "300"))
+
+# List endpoints return API_PAGE_SIZE items per page unless ?limit= asks
+# for more, up to API_MAX_PAGE_SIZE.
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "50"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "200"))
+# /api/articles/batch/ accepts at most this many ids per request.
+API_BATCH_MAX_IDS = int(os.getenv("API_BATCH_MAX_IDS", "100"))
+# ?stream= exports read and serialize this many rows at a time.
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "500"))
+
+# Materialized reader timelines for /api/articles/subscribed/. Approved
+# articles are copied into each subscriber's timeline, except for
+# journalists/publishers with more than TIMELINE_MAX_AUDIENCE subscribers,
+# whose readers are served by querying articles directly instead.
+TIMELINE_ENABLED = os.getenv("TIMELINE_ENABLED", "0") == "1"
+TIMELINE_MAX_AUDIENCE = int(os.getenv("TIMELINE_MAX_AUDIENCE", "10000"))
+TIMELINE_BATCH_SIZE = int(os.getenv("TIMELINE_BATCH_SIZE", "1000"))
+
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "rest_framework.authentication.TokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+    ),
+    "DEFAULT_PERMISSION_CLASSES": (
+        "rest_framework.permissions.IsAuthenticated",
+    ),
+}
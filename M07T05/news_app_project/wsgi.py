@@ -0,0 +1,8 @@
+"""
+WSGI config for news_app_project.
+"""
+import os
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "news_app_project.settings")
+application = get_wsgi_application()